@@ -2,6 +2,7 @@ from flask import Flask
 from flask_cors import CORS
 from app.extensions import db, migrate, jwt, socketio
 from app.config import Config
+from app.utils.socket_queue import create_client_manager
 
 def create_app():
     app = Flask(__name__)
@@ -14,7 +15,9 @@ def create_app():
     db.init_app(app)
     migrate.init_app(app, db)
     jwt.init_app(app)
-    socketio.init_app(app)
+    socketio.init_app(app, async_mode=app.config.get("ASYNC_MODE", "threading"), client_manager=create_client_manager(
+        app.config.get("SOCKETIO_MESSAGE_QUEUE"), app.config.get("SOCKETIO_CHANNEL", "flask-socketio")
+    ))
 
     # ===== IMPORT BLUEPRINTS =====
     from app.routes.auth import bp as auth_bp
@@ -29,6 +32,7 @@ def create_app():
     from app.routes.employees import employees_bp
     from app.routes.chat import bp as chat_bp
     from app.routes.media import bp as media_bp
+    from app.routes.email import bp as email_bp
 
     # ===== REGISTER BLUEPRINTS =====
     app.register_blueprint(auth_bp)
@@ -43,6 +47,7 @@ def create_app():
     app.register_blueprint(employees_bp)
     app.register_blueprint(chat_bp)
     app.register_blueprint(media_bp)
+    app.register_blueprint(email_bp)
 
     # Initialize database and default admin safely
     # We use a try-except block so that even if DB isn't ready, the app won't crash
@@ -55,4 +60,28 @@ def create_app():
         except Exception as e:
             print(f"⚠ Database init warning: {str(e)}")
 
+    # Background delivery for queued notification emails
+    from app.services.email_queue import start_email_workers
+    from app.services.assignment_notifier import assignment_notifier
+    start_email_workers(app)
+    assignment_notifier.init_app(app)
+
+    # Optional batched persistence for chat messages
+    from app.services.chat_buffer import chat_buffer
+    chat_buffer.init_app(app)
+
+    # Socket presence and email digests for offline chat receivers
+    from app.services.presence import presence
+    from app.services.chat_digest import chat_digest
+    presence.init_app(app)
+    chat_digest.init_app(app)
+
+    # On-disk cache behind the Media Hub thumbnail proxy
+    from app.services.thumbnail_cache import thumbnail_cache
+    thumbnail_cache.init_app(app)
+
+    # Drive rate limit and retry policy, shared by syncs and thumbnail lookups
+    from app.utils.google_drive import configure as configure_drive
+    configure_drive(app.config)
+
     return app
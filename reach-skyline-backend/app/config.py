@@ -1,4 +1,5 @@
 # app/config.py
+import json
 import os
 from datetime import timedelta
 from dotenv import load_dotenv
@@ -8,6 +9,8 @@ from dotenv import load_dotenv
 if os.path.exists(".env"):
     load_dotenv()
 
+DEFAULT_SECRET_KEY = "dev-secret-key-12345"
+
 class Config:
     # ----------------------------------------
     # DATABASE CONFIGURATION
@@ -40,15 +43,136 @@ class Config:
 
     SQLALCHEMY_TRACK_MODIFICATIONS = False
 
+    # ----------------------------------------
+    # CONCURRENCY CONFIGURATION
+    # ----------------------------------------
+    # Worker model for Socket.IO and the process: "threading", "eventlet" or
+    # "gevent". run.py and gunicorn.conf.py monkey-patch / pick the worker
+    # class from the same variable, so PyMySQL, smtplib and the Drive client
+    # yield instead of blocking under the green modes.
+    ASYNC_MODE = os.environ.get("ASYNC_MODE", "threading").lower()
+
+    # Green workers serve many more concurrent requests per process, so they
+    # get a larger pool by default
+    _green = ASYNC_MODE in ("eventlet", "gevent")
+    SQLALCHEMY_ENGINE_OPTIONS = {
+        "pool_pre_ping": True,
+        "pool_recycle": int(os.environ.get("DB_POOL_RECYCLE", 280)),
+    }
+    if not SQLALCHEMY_DATABASE_URI.startswith("sqlite"):
+        SQLALCHEMY_ENGINE_OPTIONS.update({
+            "pool_size": int(os.environ.get("DB_POOL_SIZE", 25 if _green else 10)),
+            "max_overflow": int(os.environ.get("DB_MAX_OVERFLOW", 50 if _green else 20)),
+            "pool_timeout": int(os.environ.get("DB_POOL_TIMEOUT", 30)),
+        })
+
     # ----------------------------------------
     # SECURITY CONFIGURATION
     # ----------------------------------------
-    SECRET_KEY = os.environ.get("SECRET_KEY", "dev-secret-key-12345")
+    # The fallback is public: outside development (FLASK_DEBUG=1) nothing is
+    # signed with it (see app/services/thumbnail_cache.py)
+    SECRET_KEY = os.environ.get("SECRET_KEY", DEFAULT_SECRET_KEY)
     JWT_SECRET_KEY = os.environ.get("JWT_SECRET_KEY", "super-secret-key")
     JWT_ACCESS_TOKEN_EXPIRES = timedelta(hours=1)
     JWT_REFRESH_TOKEN_EXPIRES = timedelta(days=7)
+    # Seconds an employee's role/team/status is cached per process
+    IDENTITY_CACHE_TTL = int(os.environ.get("IDENTITY_CACHE_TTL", 30))
+
+    # ----------------------------------------
+    # ID SEQUENCE CONFIGURATION
+    # ----------------------------------------
+    # Values each process reserves per round-trip to sequence_counters
+    # (client and employee IDs always reserve one so numbering stays dense)
+    SEQUENCE_BLOCK_SIZE = int(os.environ.get("SEQUENCE_BLOCK_SIZE", 20))
 
     # ----------------------------------------
     # UPLOAD CONFIGURATION
     # ----------------------------------------
     UPLOAD_FOLDER = os.path.join(os.getcwd(), 'uploads')
+
+    # ----------------------------------------
+    # GOOGLE DRIVE / MEDIA SYNC CONFIGURATION
+    # ----------------------------------------
+    # Seconds without progress after which a sync job's folder lock is
+    # considered abandoned and a new sync may take it over
+    MEDIA_SYNC_LOCK_TIMEOUT = int(os.environ.get("MEDIA_SYNC_LOCK_TIMEOUT", 600))
+
+    # Folders listed in parallel during a full crawl of the Drive tree
+    DRIVE_CRAWL_WORKERS = int(os.environ.get("DRIVE_CRAWL_WORKERS", 4))
+
+    # Process-wide cap on Drive API calls per second (0 = unlimited) and the
+    # burst allowed above it (default: one second's worth). The limit halves
+    # on every rate-limit response and recovers gradually.
+    DRIVE_REQUESTS_PER_SECOND = float(os.environ.get("DRIVE_REQUESTS_PER_SECOND", 20))
+    DRIVE_BURST = float(os.environ["DRIVE_BURST"]) if os.environ.get("DRIVE_BURST") else None
+
+    # Retries of rate-limited / 5xx / dropped Drive calls, with exponential
+    # backoff and full jitter between base and max delay (seconds)
+    DRIVE_MAX_RETRIES = int(os.environ.get("DRIVE_MAX_RETRIES", 5))
+    DRIVE_RETRY_BASE_DELAY = float(os.environ.get("DRIVE_RETRY_BASE_DELAY", 1.0))
+    DRIVE_RETRY_MAX_DELAY = float(os.environ.get("DRIVE_RETRY_MAX_DELAY", 32.0))
+
+    # JSON list of regexes mapping a folder path to project / day / date
+    # (see app/utils/drive_paths.py); unset uses DEFAULT_PATH_RULES
+    DRIVE_PATH_RULES = json.loads(os.environ["DRIVE_PATH_RULES"]) if os.environ.get("DRIVE_PATH_RULES") else None
+
+    # Thumbnail proxy (GET /api/media/assets/<id>/thumb): on-disk cache
+    # directory and size cap, requested thumbnail width in pixels, and how
+    # many of the newest assets' thumbnails are prefetched after a sync
+    # (0 = none) by how many download threads
+    MEDIA_THUMB_CACHE_DIR = os.environ.get("MEDIA_THUMB_CACHE_DIR", os.path.join(os.getcwd(), 'thumb_cache'))
+    MEDIA_THUMB_CACHE_MAX_MB = int(os.environ.get("MEDIA_THUMB_CACHE_MAX_MB", 512))
+    MEDIA_THUMB_SIZE = int(os.environ.get("MEDIA_THUMB_SIZE", 400))
+    MEDIA_THUMB_PREFETCH_LIMIT = int(os.environ.get("MEDIA_THUMB_PREFETCH_LIMIT", 1000))
+    MEDIA_THUMB_PREFETCH_WORKERS = int(os.environ.get("MEDIA_THUMB_PREFETCH_WORKERS", 4))
+    # Signed thumbnail URLs stay valid for one to two of these windows (seconds)
+    MEDIA_THUMB_URL_TTL = int(os.environ.get("MEDIA_THUMB_URL_TTL", 86400))
+
+    # ----------------------------------------
+    # SOCKET.IO CONFIGURATION
+    # ----------------------------------------
+    # Broker shared by all worker processes so chat/notification emits reach
+    # clients connected to any worker (see app/utils/socket_queue.py).
+    # Unset = in-process, which only works with a single worker.
+    SOCKETIO_MESSAGE_QUEUE = os.environ.get("SOCKETIO_MESSAGE_QUEUE")
+    SOCKETIO_CHANNEL = os.environ.get("SOCKETIO_CHANNEL", "reach-skyline-socketio")
+
+    # Presence registry (app/services/presence.py). With several workers it
+    # must be shared, so it defaults to a Redis message queue when one is set.
+    # Clients heartbeat every 30s; a connection counts as gone PRESENCE_TTL
+    # seconds after its last heartbeat.
+    PRESENCE_URL = os.environ.get("PRESENCE_URL") or (
+        SOCKETIO_MESSAGE_QUEUE if (SOCKETIO_MESSAGE_QUEUE or "").startswith(("redis://", "rediss://")) else None
+    )
+    PRESENCE_TTL = int(os.environ.get("PRESENCE_TTL", 90))
+    # Seconds between email digests of chat messages received while offline (0 = off)
+    CHAT_DIGEST_INTERVAL = int(os.environ.get("CHAT_DIGEST_INTERVAL", 900))
+
+    # Write-behind chat persistence: messages are emitted immediately and
+    # inserted in batches every CHAT_FLUSH_INTERVAL_MS or CHAT_FLUSH_MAX_BATCH
+    # messages. All workers must use the same setting. Message IDs are taken
+    # when the message is sent, so they follow send order. A single worker
+    # reserves them in blocks of CHAT_ID_BLOCK_SIZE. With SOCKETIO_MESSAGE_QUEUE
+    # set, IDs come from one Redis INCRBY at CHAT_ID_URL (default: the queue,
+    # if it is Redis). Without a Redis URL write-behind is turned off: per-worker
+    # blocks would hand out IDs out of send order, which after_id catch-up and
+    # read watermarks rely on, so messages are written as they are sent.
+    CHAT_WRITE_BEHIND = os.environ.get("CHAT_WRITE_BEHIND", "false").lower() == "true"
+    CHAT_FLUSH_INTERVAL_MS = int(os.environ.get("CHAT_FLUSH_INTERVAL_MS", 20))
+    CHAT_FLUSH_MAX_BATCH = int(os.environ.get("CHAT_FLUSH_MAX_BATCH", 200))
+    CHAT_ID_BLOCK_SIZE = int(os.environ.get("CHAT_ID_BLOCK_SIZE", 100))
+    CHAT_ID_URL = os.environ.get("CHAT_ID_URL") or (
+        SOCKETIO_MESSAGE_QUEUE if (SOCKETIO_MESSAGE_QUEUE or "").startswith(("redis://", "rediss://")) else None
+    )
+
+    # ----------------------------------------
+    # EMAIL QUEUE CONFIGURATION
+    # ----------------------------------------
+    EMAIL_QUEUE_ENABLED = os.environ.get("EMAIL_QUEUE_ENABLED", "true").lower() == "true"
+    EMAIL_QUEUE_WORKERS = int(os.environ.get("EMAIL_QUEUE_WORKERS", 1))
+    EMAIL_MAX_ATTEMPTS = int(os.environ.get("EMAIL_MAX_ATTEMPTS", 5))
+    EMAIL_RETRY_BACKOFF = int(os.environ.get("EMAIL_RETRY_BACKOFF", 30))  # seconds, doubled per attempt
+    SMTP_USE_TLS = os.environ.get("SMTP_USE_TLS", "true").lower() == "true"
+    SMTP_IDLE_TIMEOUT = int(os.environ.get("SMTP_IDLE_TIMEOUT", 60))
+    # Seconds to coalesce task assignment emails per employee (0 = send immediately)
+    ASSIGNMENT_DIGEST_WINDOW = int(os.environ.get("ASSIGNMENT_DIGEST_WINDOW", 60))
@@ -7,4 +7,5 @@ from flask_socketio import SocketIO
 db = SQLAlchemy()
 migrate = Migrate()
 jwt = JWTManager()
-socketio = SocketIO(cors_allowed_origins="*", async_mode="threading")
+# async_mode and the message queue are set from Config in create_app()
+socketio = SocketIO(cors_allowed_origins="*")
@@ -27,6 +27,10 @@ class Chat(db.Model):
 
 class ChatMessage(db.Model):
     __tablename__ = "chat_messages"
+    __table_args__ = (
+        # History pages walk one chat by id (newest-N, before_id / after_id)
+        db.Index("ix_chat_messages_chat_id_id", "chat_id", "id"),
+    )
 
     id = db.Column(db.Integer, primary_key=True, autoincrement=True)
     chat_id = db.Column(db.Integer, db.ForeignKey("chats.id"), nullable=True)
@@ -52,3 +56,65 @@ class ChatMessage(db.Model):
             "read_status": self.read_status,
             "task_code": self.task_code
         }
+
+class ChatUnreadCounter(db.Model):
+    """Unread messages per receiver and task code, kept in step with chat_messages."""
+    __tablename__ = "chat_unread_counters"
+
+    receiver_id = db.Column(db.String(20), primary_key=True)
+    task_code = db.Column(db.String(50), primary_key=True)  # "" for messages without a task code
+    unread_count = db.Column(db.Integer, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    def to_dict(self):
+        return {
+            "receiver_id": self.receiver_id,
+            "task_code": self.task_code,
+            "unread_count": self.unread_count,
+            "updated_at": self.updated_at.isoformat() if self.updated_at else None
+        }
+
+class ChatReadWatermark(db.Model):
+    """Last message id each participant has read in a chat."""
+    __tablename__ = "chat_read_watermarks"
+
+    chat_id = db.Column(db.Integer, db.ForeignKey("chats.id"), primary_key=True)
+    reader_id = db.Column(db.String(20), primary_key=True)
+    last_read_message_id = db.Column(db.Integer, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    def to_dict(self):
+        return {
+            "chat_id": self.chat_id,
+            "reader_id": self.reader_id,
+            "last_read_message_id": self.last_read_message_id,
+            "updated_at": self.updated_at.isoformat() if self.updated_at else None
+        }
+
+class ChatPendingNotification(db.Model):
+    """A message that arrived while its receiver was offline, waiting for the email digest."""
+    __tablename__ = "chat_pending_notifications"
+    __table_args__ = (
+        db.Index("ix_chat_pending_notifications_receiver_id_id", "receiver_id", "id"),
+    )
+
+    id = db.Column(db.Integer, primary_key=True, autoincrement=True)
+    receiver_id = db.Column(db.String(20), nullable=False)
+    sender_id = db.Column(db.String(20), nullable=False)
+    chat_id = db.Column(db.Integer, nullable=False)
+    message_id = db.Column(db.Integer, nullable=False)
+    task_code = db.Column(db.String(50))
+    preview = db.Column(db.String(200))
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    def to_dict(self):
+        return {
+            "id": self.id,
+            "receiver_id": self.receiver_id,
+            "sender_id": self.sender_id,
+            "chat_id": self.chat_id,
+            "message_id": self.message_id,
+            "task_code": self.task_code,
+            "preview": self.preview,
+            "created_at": self.created_at.isoformat() if self.created_at else None
+        }
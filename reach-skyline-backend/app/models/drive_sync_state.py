@@ -0,0 +1,44 @@
+# app/models/drive_sync_state.py
+from app.extensions import db
+from datetime import datetime
+
+class DriveSyncState(db.Model):
+    """Where the last Google Drive sync of a folder left off in the changes feed."""
+    __tablename__ = "drive_sync_state"
+
+    folder_id = db.Column(db.String(255), primary_key=True)
+    start_page_token = db.Column(db.String(255))        # Drive changes token; None = full sync next time
+    last_full_sync_at = db.Column(db.DateTime)
+    last_sync_at = db.Column(db.DateTime)
+    # Folder lock: the media_sync_jobs row currently syncing it (stale after MEDIA_SYNC_LOCK_TIMEOUT)
+    lock_job_id = db.Column(db.Integer)
+    locked_at = db.Column(db.DateTime)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    def to_dict(self):
+        return {
+            "folder_id": self.folder_id,
+            "start_page_token": self.start_page_token,
+            "last_full_sync_at": self.last_full_sync_at.isoformat() if self.last_full_sync_at else None,
+            "last_sync_at": self.last_sync_at.isoformat() if self.last_sync_at else None,
+            "lock_job_id": self.lock_job_id
+        }
+
+class DriveFolder(db.Model):
+    """A folder under a synced Drive root, with its path from that root (rebuilt by each full crawl)."""
+    __tablename__ = "drive_folders"
+
+    root_id = db.Column(db.String(255), primary_key=True)
+    id = db.Column(db.String(255), primary_key=True)
+    parent_id = db.Column(db.String(255))
+    name = db.Column(db.String(255))
+    path = db.Column(db.Text)   # "" for the root itself
+
+    def to_dict(self):
+        return {
+            "root_id": self.root_id,
+            "id": self.id,
+            "parent_id": self.parent_id,
+            "name": self.name,
+            "path": self.path
+        }
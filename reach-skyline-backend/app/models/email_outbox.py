@@ -0,0 +1,38 @@
+# app/models/email_outbox.py
+from app.extensions import db
+from datetime import datetime
+
+class EmailOutbox(db.Model):
+    __tablename__ = "email_outbox"
+    __table_args__ = (
+        # Workers poll for the next due message in this order
+        db.Index("ix_email_outbox_status_next_attempt", "status", "next_attempt_at"),
+    )
+
+    id = db.Column(db.Integer, primary_key=True, autoincrement=True)
+    recipient = db.Column(db.String(120), nullable=False)
+    sender = db.Column(db.String(255), nullable=False)   # "Display Name <smtp-user@...>"
+    reply_to = db.Column(db.String(120))
+    subject = db.Column(db.String(255), nullable=False)
+    html_body = db.Column(db.Text, nullable=False)
+    category = db.Column(db.String(50))                  # task_assignment / leave_notification / ...
+    status = db.Column(db.String(20), default="Queued")   # Queued / Sending / Sent / Failed
+    attempts = db.Column(db.Integer, default=0)
+    next_attempt_at = db.Column(db.DateTime, default=datetime.utcnow)
+    last_error = db.Column(db.Text)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    sent_at = db.Column(db.DateTime)
+
+    def to_dict(self):
+        return {
+            "id": self.id,
+            "recipient": self.recipient,
+            "subject": self.subject,
+            "category": self.category,
+            "status": self.status,
+            "attempts": self.attempts,
+            "nextAttemptAt": self.next_attempt_at.isoformat() if self.next_attempt_at else None,
+            "lastError": self.last_error,
+            "createdAt": self.created_at.isoformat() if self.created_at else None,
+            "sentAt": self.sent_at.isoformat() if self.sent_at else None
+        }
@@ -3,12 +3,18 @@ from datetime import datetime
 
 class MediaAsset(db.Model):
     __tablename__ = "media_assets"
+    __table_args__ = (
+        # GET /api/media/assets: the filter set, newest first ...
+        db.Index("ix_media_assets_filters", "project_name", "status", "script_type", "created_at"),
+        # ... and keyset pagination of the unfiltered listing
+        db.Index("ix_media_assets_created_at_id", "created_at", "id"),
+    )
 
     id = db.Column(db.Integer, primary_key=True, autoincrement=True)
     drive_file_id = db.Column(db.String(255), unique=True, nullable=False)
     filename = db.Column(db.String(255), nullable=False)
     mime_type = db.Column(db.String(100))
-    thumbnail_url = db.Column(db.Text)
+    thumbnail_url = db.Column(db.Text)  # Drive thumbnailLink, short-lived; clients use thumb_url
     play_url = db.Column(db.Text)  # drive.google.com/file/d/[ID]/preview
     project_name = db.Column(db.String(100), index=True)
     shoot_date = db.Column(db.Date)
@@ -18,6 +24,8 @@ class MediaAsset(db.Model):
     assigned_reviewer_id = db.Column(db.String(20), db.ForeignKey("employees.id"), nullable=True)
     meta_data = db.Column(db.JSON)  # Stores duration, resolution, etc.
     script_type = db.Column(db.String(50), index=True) # Social Media, Service Promotion, Testimonial, Educational, BTS
+    drive_modified_at = db.Column(db.DateTime)  # Drive modifiedTime, versions the cached thumbnail
+    drive_root_id = db.Column(db.String(255), index=True)  # Synced root folder the file was found under
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
 
     # Relationships
@@ -25,12 +33,14 @@ class MediaAsset(db.Model):
     reviewer = db.relationship('Employee', foreign_keys=[assigned_reviewer_id], backref='reviewed_assets')
 
     def to_dict(self):
+        from app.services.thumbnail_cache import thumbnail_cache
         return {
             "id": self.id,
             "drive_file_id": self.drive_file_id,
             "filename": self.filename,
             "mime_type": self.mime_type,
             "thumbnail_url": self.thumbnail_url,
+            "thumb_url": thumbnail_cache.url_for(self),
             "play_url": self.play_url,
             "project_name": self.project_name,
             "shoot_date": self.shoot_date.isoformat() if self.shoot_date else None,
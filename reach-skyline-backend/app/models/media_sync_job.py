@@ -0,0 +1,44 @@
+# app/models/media_sync_job.py
+from app.extensions import db
+from datetime import datetime
+
+class MediaSyncJob(db.Model):
+    """One background Google Drive -> Media Hub sync and its progress."""
+    __tablename__ = "media_sync_jobs"
+
+    id = db.Column(db.Integer, primary_key=True, autoincrement=True)
+    folder_id = db.Column(db.String(255), nullable=False, index=True)
+    status = db.Column(db.String(20), default="Queued")   # Queued / Running / Completed / Failed
+    mode = db.Column(db.String(20))                       # full / incremental
+    full = db.Column(db.Boolean, default=False)           # full re-list requested
+    pages_fetched = db.Column(db.Integer, default=0)
+    files_received = db.Column(db.Integer, default=0)
+    added = db.Column(db.Integer, default=0)
+    updated = db.Column(db.Integer, default=0)
+    removed = db.Column(db.Integer, default=0)
+    error_count = db.Column(db.Integer, default=0)
+    errors = db.Column(db.JSON)
+    requested_by = db.Column(db.String(20))
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    started_at = db.Column(db.DateTime)
+    finished_at = db.Column(db.DateTime)
+
+    def to_dict(self):
+        return {
+            "id": self.id,
+            "folder_id": self.folder_id,
+            "status": self.status,
+            "mode": self.mode,
+            "full": self.full,
+            "pages_fetched": self.pages_fetched or 0,
+            "files_received": self.files_received or 0,
+            "added": self.added or 0,
+            "updated": self.updated or 0,
+            "removed": self.removed or 0,
+            "error_count": self.error_count or 0,
+            "errors": self.errors or [],
+            "requested_by": self.requested_by,
+            "created_at": self.created_at.isoformat() if self.created_at else None,
+            "started_at": self.started_at.isoformat() if self.started_at else None,
+            "finished_at": self.finished_at.isoformat() if self.finished_at else None
+        }
@@ -0,0 +1,14 @@
+# app/models/sequence_counter.py
+from app.extensions import db
+
+class SequenceCounter(db.Model):
+    __tablename__ = "sequence_counters"
+
+    name = db.Column(db.String(50), primary_key=True)   # activity_code / client_id / employee:B ...
+    value = db.Column(db.BigInteger, nullable=False, default=0)  # last value handed out
+
+    def to_dict(self):
+        return {
+            "name": self.name,
+            "value": self.value
+        }
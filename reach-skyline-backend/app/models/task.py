@@ -1,9 +1,16 @@
 # app/models/task.py
+from datetime import datetime
 from app.extensions import db
+from sqlalchemy import inspect
+from sqlalchemy.orm.attributes import set_committed_value
 import json
 
 class Task(db.Model):
     __tablename__ = "tasks"
+    __table_args__ = (
+        # Keyset pagination for GET /api/tasks?order=updated_at
+        db.Index("ix_tasks_updated_at_id", "updated_at", "id"),
+    )
 
     id = db.Column(db.Integer, primary_key=True, autoincrement=True)
     activity_code = db.Column(db.String(50), unique=True, nullable=False)
@@ -26,22 +33,25 @@ class Task(db.Model):
     manual_attended_calls = db.Column(db.Integer)
     remarks = db.Column(db.Text)
     employee_remark = db.Column(db.Text)
-    updated_at = db.Column(db.DateTime, onupdate=db.func.current_timestamp(), default=db.func.current_timestamp())
+    # Set in Python so SQLite stores one text format ('YYYY-MM-DD HH:MM:SS.ffffff'),
+    # the one bound values use; CURRENT_TIMESTAMP omits the fraction and breaks the keyset
+    updated_at = db.Column(db.DateTime, nullable=False, onupdate=datetime.utcnow, default=datetime.utcnow)
     completed_at = db.Column(db.DateTime) # Track when task is marked Completed
 
     # Relationship to Client
     client = db.relationship("Client", backref="tasks")
 
     def to_dict(self):
+        client = self.client
         return {
             "id": self.id,
             "activityCode": self.activity_code,
             "clientID": self.client_id,
-            "client": self.client.client_name if self.client else "Unknown",
-            "clientSlug": self.client.slug if self.client and hasattr(self.client, 'slug') else None,
-            "phone": self.client.phone if self.client else "N/A",
-            "email": self.client.email if self.client else "N/A",
-            "deliveryDate": str(self.client.delivery_date) if self.client and self.client.delivery_date else "N/A",
+            "client": client.client_name if client else "Unknown",
+            "clientSlug": client.slug if client and hasattr(client, 'slug') else None,
+            "phone": client.phone if client else "N/A",
+            "email": client.email if client else "N/A",
+            "deliveryDate": str(client.delivery_date) if client and client.delivery_date else "N/A",
             "team": self.team,
             "assignedTo": self.employee_id, # Frontend expects assignedTo
             "status": self.status,
@@ -62,3 +72,27 @@ class Task(db.Model):
             "updatedAt": str(self.updated_at) if self.updated_at else None,
             "completedAt": str(self.completed_at) if self.completed_at else None
         }
+
+
+def preload_clients(tasks):
+    """
+    Attaches the related Client to every task with a single IN query.
+    Task.client joins on clients.client_id (not the primary key), so each
+    lazy load is its own SELECT; this avoids one round-trip per row.
+    """
+    from app.models.client import Client
+
+    pending = [t for t in tasks if "client" in inspect(t).unloaded]
+    client_ids = {t.client_id for t in pending if t.client_id}
+    if not client_ids:
+        return tasks
+
+    clients = {c.client_id: c for c in Client.query.filter(Client.client_id.in_(client_ids)).all()}
+    for t in pending:
+        set_committed_value(t, "client", clients.get(t.client_id))
+    return tasks
+
+
+def serialize_tasks(tasks):
+    """Serializes a list of tasks with to_dict() after batch-loading their clients."""
+    return [t.to_dict() for t in preload_clients(tasks)]
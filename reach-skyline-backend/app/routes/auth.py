@@ -61,7 +61,8 @@ def login():
             additional_claims={
                 "role": user.role,
                 "team": user.team,
-                "name": user.name
+                "name": user.name,
+                "status": user.status
             },
             expires_delta=timedelta(hours=8)
         )
@@ -105,7 +106,8 @@ def refresh():
         additional_claims={
             "role": user.role,
             "team": user.team,
-            "name": user.name
+            "name": user.name,
+            "status": user.status
         },
         expires_delta=timedelta(hours=8)
     )
@@ -4,8 +4,13 @@ from app.extensions import db, socketio
 from app.models.chat import Chat, ChatMessage
 from app.models.employee import Employee
 from app.models.task import Task
+from app.services import chat_service
+from app.services.chat_buffer import chat_buffer
+from app.services.chat_digest import chat_digest
+from app.services.presence import presence
+from app.utils.socket_auth import authenticate_socket, current_socket_identity, chat_participants
 from flask_jwt_extended import jwt_required, get_jwt_identity, decode_token
-from flask_socketio import emit, join_room, leave_room
+from flask_socketio import emit, join_room, leave_room, ConnectionRefusedError
 from datetime import datetime
 import os
 from werkzeug.utils import secure_filename
@@ -67,29 +72,64 @@ def init_chat():
         
     return jsonify(chat.to_dict()), 200
 
+HISTORY_PAGE_SIZE = 50
+MAX_HISTORY_PAGE_SIZE = 500
+
 @bp.route("/history/<int:chat_id>", methods=["GET"])
 @jwt_required()
 def get_chat_history(chat_id):
-    messages = ChatMessage.query.filter_by(chat_id=chat_id).order_by(ChatMessage.created_at.asc()).all()
-    return jsonify([m.to_dict() for m in messages]), 200
+    """
+    Without query params returns the whole history (legacy behaviour).
+
+    Paginated mode (any of these params), response {items, hasMore},
+    items always oldest -> newest:
+    - limit: page size (default 50, max 500); alone it returns the newest N
+    - before_id: the N messages just before this id (scroll back)
+    - after_id: the N messages just after this id (catch up on reconnect)
+    """
+    args = request.args
+    if not any(k in args for k in ("limit", "before_id", "after_id")):
+        messages = ChatMessage.query.filter_by(chat_id=chat_id).order_by(ChatMessage.id.asc()).all()
+        return jsonify(chat_service.serialize_messages(messages, chat_id)), 200
+
+    try:
+        limit = min(max(int(args.get("limit", HISTORY_PAGE_SIZE)), 1), MAX_HISTORY_PAGE_SIZE)
+        before_id = int(args["before_id"]) if args.get("before_id") else None
+        after_id = int(args["after_id"]) if args.get("after_id") else None
+    except ValueError:
+        return jsonify({"message": "limit, before_id and after_id must be integers"}), 400
+
+    query = ChatMessage.query.filter(ChatMessage.chat_id == chat_id)
+    if after_id is not None:
+        query = query.filter(ChatMessage.id > after_id).order_by(ChatMessage.id.asc())
+        if before_id is not None:
+            query = query.filter(ChatMessage.id < before_id)
+        messages = query.limit(limit + 1).all()
+        has_more = len(messages) > limit
+        messages = messages[:limit]
+    else:
+        if before_id is not None:
+            query = query.filter(ChatMessage.id < before_id)
+        messages = query.order_by(ChatMessage.id.desc()).limit(limit + 1).all()
+        has_more = len(messages) > limit
+        messages = messages[:limit][::-1]
+
+    return jsonify({"items": chat_service.serialize_messages(messages, chat_id), "hasMore": has_more}), 200
 
 @bp.route("/unread-counts", methods=["GET"])
 @jwt_required()
 def get_unread_counts():
     user_id = get_jwt_identity()
-    counts = db.session.query(
-        ChatMessage.task_code, db.func.count(ChatMessage.id)
-    ).filter_by(receiver_id=user_id, read_status=False).group_by(ChatMessage.task_code).all()
-    
-    return jsonify({tc: count for tc, count in counts}), 200
+    return jsonify(chat_service.get_unread_counts(user_id)), 200
 
 @bp.route("/mark-read/<string:task_code>", methods=["POST"])
 @jwt_required()
 def mark_as_read(task_code):
     user_id = get_jwt_identity()
-    ChatMessage.query.filter_by(task_code=task_code, receiver_id=user_id, read_status=False).update({"read_status": True})
+    chat_service.mark_read(user_id, task_code)
     db.session.commit()
-    socketio.emit('unread_update', {"user_id": user_id}, room=f"user_{user_id}")
+    if presence.is_online(user_id):
+        socketio.emit('unread_update', {"user_id": user_id}, room=f"user_{user_id}")
     return jsonify({"message": "Messages marked as read"}), 200
 
 @bp.route("/upload", methods=["POST"])
@@ -119,13 +159,37 @@ def get_chat_file(filename):
 
 # --- SOCKET.IO HANDLERS ---
 
+@socketio.on('connect')
+def on_connect(auth=None):
+    # The JWT is verified once here; handlers below trust the session identity
+    identity = authenticate_socket(auth)
+    if not identity:
+        raise ConnectionRefusedError("unauthorized")
+    join_room(f"user_{identity['id']}")
+    presence.connect(identity["id"], request.sid)
+    print(f"[DEBUG] Socket authenticated: {identity['id']}")
+
+@socketio.on('disconnect')
+def on_disconnect(reason=None):
+    identity = current_socket_identity()
+    if identity:
+        presence.disconnect(identity["id"], request.sid)
+
+@socketio.on('presence_heartbeat')
+def on_presence_heartbeat(data=None):
+    identity = current_socket_identity()
+    if identity:
+        presence.heartbeat(identity["id"], request.sid)
+
 @socketio.on('join_chat')
 def on_join_chat(data):
     chat_id = data.get('chat_id')
-    if chat_id:
+    if chat_participants(chat_id):
         room = f"chat_{chat_id}"
         join_room(room)
         print(f"[DEBUG] User joined room: {room}")
+    elif chat_id:
+        print(f"[DEBUG] join_chat denied for chat {chat_id}")
 
 @socketio.on('leave_chat')
 def on_leave_chat(data):
@@ -136,14 +200,20 @@ def on_leave_chat(data):
 
 @socketio.on('send_message')
 def handle_send_message(data):
-    # In Flask-SocketIO, the 'request' headers usually contain the same ones 
-    # as the initial handshake. If JWT is in 'auth', it's harder to get here
-    # without a custom wrapper. For reliability in this specific task, 
-    # we use the IDs passed in the data, but we'll print debug info.
-    
-    sender_id = data.get('sender_id')
+    # Sender comes from the authenticated socket session, never the payload
+    identity = current_socket_identity()
     chat_id = data.get('chat_id')
-    receiver_id = data.get('receiver_id')
+    participants = chat_participants(chat_id)
+    if not identity or not participants:
+        print(f"[DEBUG] Send message denied for chat {chat_id}")
+        return
+
+    sender_id = identity["id"]
+    if sender_id in participants:
+        receiver_id = participants[1] if sender_id == participants[0] else participants[0]
+    else:
+        # Supervisors posting into someone else's chat address one participant
+        receiver_id = data.get('receiver_id') if data.get('receiver_id') in participants else participants[0]
     message_text = data.get('message')
     task_code = data.get('task_code')
     attachment_path = data.get('file_path')
@@ -153,33 +223,46 @@ def handle_send_message(data):
         return
 
     try:
-        new_msg = ChatMessage(
-            chat_id=chat_id,
-            sender_id=sender_id,
-            receiver_id=receiver_id,
-            message_text=message_text,
-            attachment_path=attachment_path,
-            task_code=task_code,
-            read_status=False
-        )
-        db.session.add(new_msg)
-        db.session.commit()
+        receiver_online = presence.is_online(receiver_id)
+        if chat_buffer.enabled:
+            # Write-behind: persisted by the buffer's next batch insert
+            payload = chat_buffer.add(chat_id, sender_id, receiver_id, message_text, attachment_path, task_code,
+                                      receiver_offline=not receiver_online)
+        else:
+            new_msg = ChatMessage(
+                chat_id=chat_id,
+                sender_id=sender_id,
+                receiver_id=receiver_id,
+                message_text=message_text,
+                attachment_path=attachment_path,
+                task_code=task_code,
+                read_status=False
+            )
+            db.session.add(new_msg)
+            chat_service.increment_unread(receiver_id, task_code)
+            if not receiver_online:
+                db.session.flush()
+                chat_digest.record(receiver_id, sender_id, chat_id, new_msg.id, task_code, message_text)
+            db.session.commit()
+            payload = new_msg.to_dict()
 
         # Emit to the chat room - CRITICAL: Everyone in the room (TL and Employee) gets this
-        payload = new_msg.to_dict()
         emit('new_message', payload, room=f"chat_{chat_id}")
         
-        # Also notify the receiver directly for the badge - CRITICAL
-        emit('notification', {"task_code": task_code, "message": message_text}, room=f"user_{receiver_id}")
+        # Also notify the receiver directly for the badge; offline receivers get the email digest instead
+        if receiver_online:
+            emit('notification', {"task_code": task_code, "message": message_text}, room=f"user_{receiver_id}")
         
         print(f"[DEBUG] Message sent from {sender_id} to {receiver_id} in chat {chat_id}")
     except Exception as e:
+        db.session.rollback()
         print(f"[ERROR] send_message error: {str(e)}")
 
 @socketio.on('connect_user')
-def on_connect_user(data):
-    user_id = data.get('user_id')
-    if user_id:
-        room = f"user_{user_id}"
+def on_connect_user(data=None):
+    # Kept for older clients; the user room is already joined on connect
+    identity = current_socket_identity()
+    if identity:
+        room = f"user_{identity['id']}"
         join_room(room)
         print(f"[DEBUG] User connected to notification room: {room}")
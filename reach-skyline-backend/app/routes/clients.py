@@ -2,6 +2,7 @@ from flask import Blueprint, request, jsonify
 from app.extensions import db
 from app.models.client import Client
 from app.utils.auth_decorators import role_required
+from app.services.sequence_service import next_client_id
 import json
 from datetime import datetime
 
@@ -44,8 +45,7 @@ def create_client():
             return jsonify({"success": False, "message": "clientName required"}), 400
 
         # Auto-generate client ID
-        last = Client.query.order_by(Client.id.desc()).first()
-        new_id = f"C{(last.id + 1) if last else 1:03}"
+        new_id = next_client_id()
 
         delivery_date = None
         if data.get("deliveryDate"):
@@ -100,7 +100,7 @@ def create_client():
 @bp.route("/slug/<string:slug>", methods=["GET"])
 @role_required('Admin', 'Manager')
 def get_client_by_slug(slug):
-    from app.models.task import Task
+    from app.models.task import Task, serialize_tasks
     # Requirement: Match the slug exactly as stored. No lowercase or replacement during lookup.
     client = Client.query.filter_by(slug=slug).first()
     if not client:
@@ -132,7 +132,7 @@ def get_client_by_slug(slug):
     
     client_dict['scope_status'] = scope_status
     # Include tasks for timeline view in export
-    client_dict['tasks'] = [t.to_dict() for t in tasks]
+    client_dict['tasks'] = serialize_tasks(tasks)
 
     # Fetch media assets associated with this client
     # Assuming project_name in MediaAsset corresponds to client_name
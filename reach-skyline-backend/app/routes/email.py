@@ -0,0 +1,40 @@
+# app/routes/email.py
+from flask import Blueprint, request, jsonify
+from app.models.email_outbox import EmailOutbox
+from app.services.email_queue import get_outbox_stats
+from app.utils.auth_decorators import role_required
+
+bp = Blueprint("email", __name__, url_prefix="/api/email")
+
+
+# -----------------------------
+# OUTBOX STATUS
+# Admin and Manager can inspect queued / failed notifications
+# -----------------------------
+@bp.route("/outbox", methods=["GET"])
+@role_required('Admin', 'Manager')
+def list_outbox():
+    status = request.args.get('status')
+    try:
+        limit = min(max(int(request.args.get('limit', 50)), 1), 500)
+    except ValueError:
+        return jsonify({"message": "Invalid limit"}), 400
+
+    query = EmailOutbox.query
+    if status:
+        query = query.filter(EmailOutbox.status == status)
+
+    entries = query.order_by(EmailOutbox.id.desc()).limit(limit).all()
+    return jsonify({
+        "stats": get_outbox_stats(),
+        "items": [e.to_dict() for e in entries]
+    }), 200
+
+
+@bp.route("/outbox/<int:entry_id>", methods=["GET"])
+@role_required('Admin', 'Manager')
+def get_outbox_entry(entry_id):
+    entry = EmailOutbox.query.get(entry_id)
+    if not entry:
+        return jsonify({"message": "Outbox entry not found"}), 404
+    return jsonify(entry.to_dict()), 200
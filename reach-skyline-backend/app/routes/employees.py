@@ -1,7 +1,8 @@
 from flask import Blueprint, jsonify, request
 from app.models.employee import Employee
 from app.extensions import db
-from app.utils.auth_decorators import role_required, team_access_required
+from app.utils.auth_decorators import role_required, team_access_required, get_current_identity
+from app.services.sequence_service import TEAM_PREFIXES, next_employee_id, peek_employee_id
 from flask_jwt_extended import jwt_required, get_jwt_identity
 
 # Define Blueprint WITHOUT prefix to avoid routing ambiguity
@@ -46,44 +47,25 @@ def get_next_employee_id():
     if not team:
         return jsonify({"message": "Team is required"}), 400
     
-    prefix_map = {
-        'Branding': 'B',
-        'Website': 'W',
-        'SEO': 'S',
-        'Telecaller': 'T',
-        'Campaign': 'C'
-    }
-    prefix = prefix_map.get(team)
+    prefix = TEAM_PREFIXES.get(team)
     if not prefix:
         return jsonify({"message": f"Invalid team: {team}"}), 400
 
-    # Find the last ID for this team
-    last_emp = Employee.query.filter(Employee.id.like(f"{prefix}%")).order_by(Employee.id.desc()).first()
-    
-    next_num = 1
-    if last_emp:
-        try:
-            # Extract number from ID (e.g., 'B001' -> 1)
-            num_part = last_emp.id[len(prefix):]
-            if num_part.isdigit():
-                next_num = int(num_part) + 1
-        except Exception:
-            next_num = 1
-            
-    next_id = f"{prefix}{next_num:03d}"
+    # Preview only; the ID is allocated when the employee is created
+    next_id = peek_employee_id(prefix)
     return jsonify({"next_id": next_id}), 200
 
 @employees_bp.route("/api/employees", methods=["POST"], strict_slashes=False)
 @jwt_required()
 def create_employee():
     current_user_id = get_jwt_identity()
-    current_user = Employee.query.get(current_user_id)
+    current_user = get_current_identity()
     
     if not current_user:
         return jsonify({"message": "Unauthorized"}), 401
     
     # RBAC: Only Team Lead or Admin can create employees
-    if current_user.role not in ['Team Lead', 'Admin']:
+    if current_user["role"] not in ['Team Lead', 'Admin']:
         return jsonify({"message": "Access Forbidden: Only Team Leaders or Admins can create employees"}), 403
         
     data = request.get_json()
@@ -100,43 +82,27 @@ def create_employee():
         return jsonify({"message": "Missing required fields"}), 400
         
     # Department restriction for Team Leaders
-    if current_user.role == 'Team Lead' and team != current_user.team:
-        return jsonify({"message": f"You can only create employees for your own department ({current_user.team})"}), 403
+    if current_user["role"] == 'Team Lead' and team != current_user["team"]:
+        return jsonify({"message": f"You can only create employees for your own department ({current_user['team']})"}), 403
 
-    # Generate Employee ID
-    prefix_map = {'Branding': 'B', 'Website': 'W', 'SEO': 'S', 'Telecaller': 'T', 'Campaign': 'C'}
-    prefix = prefix_map.get(team)
+    # Employee IDs are allocated per department prefix
+    prefix = TEAM_PREFIXES.get(team)
     if not prefix:
         return jsonify({"message": "Invalid team specified"}), 400
 
-    last_emp = Employee.query.filter(Employee.id.like(f"{prefix}%")).order_by(Employee.id.desc()).first()
-    next_num = 1
-    if last_emp:
-        try:
-            num_part = last_emp.id[len(prefix):]
-            if num_part.isdigit():
-                next_num = int(num_part) + 1
-        except:
-            pass
-    emp_id = f"{prefix}{next_num:03d}"
-
-    # Ensure uniqueness
-    while Employee.query.get(emp_id):
-        next_num += 1
-        emp_id = f"{prefix}{next_num:03d}"
-
     # Check if email already exists
     if Employee.query.filter_by(email=email).first():
         return jsonify({"message": f"Email {email} already exists"}), 400
 
     try:
+        emp_id = next_employee_id(prefix)
         new_emp = Employee(
             id=emp_id,
             name=name,
             email=email,
             role=role,
             team=team,
-            team_leader_id=current_user.id if current_user.role == 'Team Lead' else None,
+            team_leader_id=current_user["id"] if current_user["role"] == 'Team Lead' else None,
             created_by=current_user_id,
             status="Active"
         )
@@ -153,8 +119,7 @@ def create_employee():
 @employees_bp.route("/api/employees/<string:emp_id>", methods=["GET"])
 @jwt_required()
 def get_employee_by_id(emp_id):
-    current_user_id = get_jwt_identity()
-    current_user = Employee.query.get(current_user_id)
+    current_user = get_current_identity()
     
     if not current_user:
         return jsonify({"message": "Unauthorized"}), 401
@@ -164,8 +129,8 @@ def get_employee_by_id(emp_id):
         return jsonify({"message": "Employee not found"}), 404
     
     # Authorization check
-    is_management = current_user.role in ['Admin', 'Manager', 'Team Lead']
-    is_self = current_user.id == emp_id
+    is_management = current_user["role"] in ['Admin', 'Manager', 'Team Lead']
+    is_self = current_user["id"] == emp_id
     
     if not (is_management or is_self):
         return jsonify({"message": "Access Forbidden"}), 403
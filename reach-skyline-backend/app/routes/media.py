@@ -1,38 +1,161 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, redirect, send_file
 from app.extensions import db
 from app.models.media_asset import MediaAsset
 from app.models.employee import Employee
 from flask_jwt_extended import jwt_required, get_jwt_identity
-from app.utils.google_drive import get_drive_service, sync_folder
+from app.utils.auth_decorators import get_current_identity
+from app.utils.google_drive import get_drive_service, drive_client, resolve_folder_id, is_rate_limited
+from app.utils.helpers import encode_cursor, decode_cursor
+from app.models.media_sync_job import MediaSyncJob
+from app.services.media_sync_jobs import start_sync_job
+from app.services.thumbnail_cache import thumbnail_cache, thumbnail_version
 from google_auth_oauthlib.flow import Flow
+from google.auth.exceptions import RefreshError
+from googleapiclient.errors import HttpError
+from sqlalchemy.orm import selectinload
 import os
 import json
+import time
 from datetime import datetime
 
 bp = Blueprint('media', __name__, url_prefix='/api/media')
 
+MAX_PAGE_SIZE = 500
+
+
+def _filtered_assets(args, script_type=True):
+    """MediaAsset query narrowed by the listing filters in `args`."""
+    query = MediaAsset.query
+    if args.get('project'):
+        query = query.filter(MediaAsset.project_name == args['project'])
+    if args.get('status'):
+        query = query.filter(MediaAsset.status == args['status'])
+    if args.get('shoot_day'):
+        query = query.filter(MediaAsset.shoot_day == args['shoot_day'])
+    if script_type and args.get('script_type'):
+        query = query.filter(MediaAsset.script_type == args['script_type'])
+    if args.get('media_type') in ('image', 'video'):
+        query = query.filter(MediaAsset.mime_type.like(f"{args['media_type']}/%"))
+    return query
+
+
 @bp.route('/assets', methods=['GET'])
 @jwt_required()
 def get_assets():
-    """Fetch all media assets with optional filtering."""
-    project = request.args.get('project')
-    status = request.args.get('status')
-    shoot_day = request.args.get('shoot_day')
-    script_type = request.args.get('script_type')
-    
-    query = MediaAsset.query
-    
-    if project:
-        query = query.filter(MediaAsset.project_name == project)
-    if status:
-        query = query.filter(MediaAsset.status == status)
-    if shoot_day:
-        query = query.filter(MediaAsset.shoot_day == shoot_day)
-    if script_type:
-        query = query.filter(MediaAsset.script_type == script_type)
+    """
+    Fetch media assets, newest first, with optional filtering
+    (project, status, shoot_day, script_type, media_type).
+
+    Pagination is opt-in: passing `limit` or `cursor` returns
+    {"items": [...], "nextCursor": "..." | null} instead of a bare list,
+    keyset-paginated on (created_at, id).
+    """
+    query = _filtered_assets(request.args)
         
-    assets = query.order_by(MediaAsset.created_at.desc()).all()
-    return jsonify([asset.to_dict() for asset in assets]), 200
+    query = query.options(selectinload(MediaAsset.crew_member), selectinload(MediaAsset.reviewer))
+
+    paginate = 'limit' in request.args or 'cursor' in request.args
+    if not paginate:
+        assets = query.order_by(MediaAsset.created_at.desc(), MediaAsset.id.desc()).all()
+        return jsonify([asset.to_dict() for asset in assets]), 200
+
+    try:
+        limit = min(max(int(request.args.get('limit', 100)), 1), MAX_PAGE_SIZE)
+        cursor = decode_cursor(request.args['cursor']) if request.args.get('cursor') else None
+        if cursor:
+            cursor = {"c": datetime.fromisoformat(cursor["c"]), "id": int(cursor["id"])}
+    except (ValueError, TypeError, KeyError):
+        return jsonify({"msg": "Invalid limit or cursor"}), 400
+
+    if cursor:
+        query = query.filter(db.or_(
+            MediaAsset.created_at < cursor["c"],
+            db.and_(MediaAsset.created_at == cursor["c"], MediaAsset.id < cursor["id"])
+        ))
+    assets = query.order_by(MediaAsset.created_at.desc(), MediaAsset.id.desc()).limit(limit + 1).all()
+    has_more = len(assets) > limit
+    assets = assets[:limit]
+
+    next_cursor = None
+    if has_more:
+        last = assets[-1]
+        next_cursor = encode_cursor({"c": last.created_at.isoformat(), "id": last.id})
+    return jsonify({"items": [asset.to_dict() for asset in assets], "nextCursor": next_cursor}), 200
+
+@bp.route('/assets/counts', methods=['GET'])
+@jwt_required()
+def get_asset_counts():
+    """
+    Asset counts for the filters get_assets takes, so pages showing one
+    page of assets can still show totals:
+    {"total": n, "script_types": {type: n, "Unassigned": n}, "media_types": {"image": n, "video": n}}.
+
+    script_type is ignored: the counts are per script type.
+    """
+    query = _filtered_assets(request.args, script_type=False)
+    script_type = db.func.coalesce(MediaAsset.script_type, 'Unassigned')
+    media_type = db.case(
+        (MediaAsset.mime_type.like('image/%'), 'image'),
+        (MediaAsset.mime_type.like('video/%'), 'video'),
+        else_='other'
+    )
+
+    script_types = dict(query.with_entities(script_type, db.func.count()).group_by(script_type).all())
+    media_types = {'image': 0, 'video': 0}
+    for name, count in query.with_entities(media_type, db.func.count()).group_by(media_type):
+        media_types[name] = count
+    return jsonify({
+        "total": sum(script_types.values()),
+        "script_types": script_types,
+        "media_types": media_types
+    }), 200
+
+@bp.route('/assets/<int:asset_id>/thumb', methods=['GET'])
+def get_asset_thumbnail(asset_id):
+    """
+    Cached thumbnail of an asset. Authorized by the signature in the
+    thumb_url from to_dict() rather than a JWT, since <img> tags cannot
+    send one; the URL changes with the Drive version, so it is immutable
+    until it expires.
+    """
+    version = request.args.get('v', '')
+    expires = request.args.get('e', '')
+    if not thumbnail_cache.verify(asset_id, version, expires, request.args.get('sig')):
+        return jsonify({"msg": "Invalid or expired thumbnail signature"}), 403
+
+    asset = db.session.get(MediaAsset, asset_id)
+    if not asset:
+        return jsonify({"msg": "Asset not found"}), 404
+    if thumbnail_version(asset.drive_modified_at) != version:
+        # The file changed in Drive since this URL was handed out
+        return redirect(thumbnail_cache.url_for(asset))
+
+    etag = thumbnail_cache.etag(asset.drive_file_id, version)
+    cache_control = f"private, max-age={max(int(expires) - int(time.time()), 0)}, immutable"
+    if request.if_none_match.contains(etag):
+        return "", 304, {"ETag": f'"{etag}"', "Cache-Control": cache_control}
+
+    try:
+        path, fresh_link = thumbnail_cache.fetch(asset.drive_file_id, version, asset.thumbnail_url)
+    except HttpError as e:
+        # Gone from Drive or no longer shared with us; anything else is Drive having trouble
+        if e.resp.status == 404 or (e.resp.status == 403 and not is_rate_limited(e)):
+            return jsonify({"msg": "Thumbnail not available"}), 404
+        print(f"[ERROR] Drive error fetching thumbnail for asset {asset_id}: {e}")
+        return jsonify({"msg": "Google Drive is unavailable, try again later"}), 503
+    except (RefreshError, RuntimeError, ConnectionError, TimeoutError) as e:
+        print(f"[ERROR] Drive error fetching thumbnail for asset {asset_id}: {e}")
+        return jsonify({"msg": "Google Drive is unavailable, try again later"}), 503
+    if fresh_link:
+        asset.thumbnail_url = fresh_link
+        db.session.commit()
+    if not path:
+        return jsonify({"msg": "Thumbnail not available"}), 404
+
+    response = send_file(path, etag=False, conditional=False)
+    response.set_etag(etag)
+    response.headers["Cache-Control"] = cache_control
+    return response
 
 @bp.route('/assets/<int:asset_id>/status', methods=['PATCH'])
 @jwt_required()
@@ -87,10 +210,9 @@ def update_asset_project(asset_id):
 @jwt_required()
 def update_asset_script(asset_id):
     """Update the script type of a media asset. Only for Admin/Manager."""
-    current_user_id = get_jwt_identity()
-    current_user = Employee.query.get(current_user_id)
+    current_user = get_current_identity()
     
-    if not current_user or current_user.role not in ['Admin', 'Manager']:
+    if not current_user or current_user["role"] not in ['Admin', 'Manager']:
         return jsonify({"msg": "Forbidden: Only Admins and Managers can update script types"}), 403
         
     data = request.json
@@ -110,10 +232,9 @@ def update_asset_script(asset_id):
 @jwt_required()
 def bulk_update_script():
     """Bulk update script type. Only for Admin/Manager."""
-    current_user_id = get_jwt_identity()
-    current_user = Employee.query.get(current_user_id)
+    current_user = get_current_identity()
     
-    if not current_user or current_user.role not in ['Admin', 'Manager']:
+    if not current_user or current_user["role"] not in ['Admin', 'Manager']:
         return jsonify({"msg": "Forbidden: Only Admins and Managers can update script types"}), 403
         
     data = request.json
@@ -218,6 +339,7 @@ def oauth_callback():
     # Save the token
     with open('token.json', 'w') as token_file:
         token_file.write(credentials.to_json())
+    drive_client.reset()
         
     return "<h1>Authorization Successful!</h1><p>You can close this window and return to the dashboard.</p>", 200
 
@@ -230,34 +352,29 @@ def sync_with_drive():
         return jsonify({"msg": "Google Drive not authorized. Please visit /auth-url first."}), 401
     
     folder_id = os.getenv("GOOGLE_DRIVE_FOLDER_ID", "root")
+    # ?full=true re-crawls the whole folder tree instead of reading the changes feed
+    full = request.args.get('full', 'false').lower() == 'true'
     try:
-        drive_files = sync_folder(service, folder_id)
-        new_count = 0
-        
-        for file in drive_files:
-            # Check if already exists
-            existing = MediaAsset.query.filter_by(drive_file_id=file['id']).first()
-            if not existing:
-                # Basic parsing of project/day from filename or parent folder logic
-                # For now, we assume simple file mapping
-                new_asset = MediaAsset(
-                    drive_file_id=file['id'],
-                    filename=file['name'],
-                    mime_type=file['mimeType'],
-                    thumbnail_url=file.get('thumbnailLink'),
-                    play_url=f"https://drive.google.com/file/d/{file['id']}/preview",
-                    project_name="Unassigned",
-                    shoot_day=1,
-                    meta_data=file.get('videoMediaMetadata', {})
-                )
-                db.session.add(new_asset)
-                new_count += 1
-        
-        db.session.commit()
-        return jsonify({"msg": f"Sync complete. Added {new_count} new assets.", "total_received": len(drive_files)}), 200
+        # The lock is keyed on the real ID, like the sync state ('root' is an alias)
+        folder_id = resolve_folder_id(service, folder_id)
+        # googleapiclient services are not thread-safe: the job builds its own
+        job, running_job_id = start_sync_job(lambda: get_drive_service()[0], folder_id,
+                                             requested_by=get_jwt_identity(), full=full)
     except Exception as e:
+        db.session.rollback()
         return jsonify({"msg": f"Sync failed: {str(e)}"}), 500
 
+    if not job:
+        return jsonify({"msg": "A sync of this folder is already running.", "job_id": running_job_id}), 409
+    return jsonify({"msg": "Sync started.", "job_id": job.id, "job": job.to_dict()}), 202
+
+@bp.route('/sync/<int:job_id>', methods=['GET'])
+@jwt_required()
+def get_sync_job(job_id):
+    """Progress of a background sync: pages fetched, rows written, errors."""
+    job = MediaSyncJob.query.get_or_404(job_id)
+    return jsonify(job.to_dict()), 200
+
 @bp.route('/projects', methods=['GET'])
 @jwt_required()
 def get_projects():
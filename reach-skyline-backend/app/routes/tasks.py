@@ -1,15 +1,18 @@
 from flask import Blueprint, request, jsonify, send_from_directory, current_app
 from app.extensions import db
-from app.models.task import Task
-from app.models.employee import Employee
-from app.utils.auth_decorators import role_required
+from app.models.task import Task, preload_clients, serialize_tasks
+from app.models.client import Client
+from app.utils.auth_decorators import role_required, get_current_identity, get_current_user
 from flask_jwt_extended import jwt_required, get_jwt_identity
 import json
 import os
 import uuid
+from datetime import datetime, timedelta
 from werkzeug.utils import secure_filename
 from app.models.task_log import TaskStatusLog
 from app.services.email_service import send_leave_notification_email
+from app.services.sequence_service import next_activity_codes
+from app.utils.helpers import encode_cursor, decode_cursor
 
 
 bp = Blueprint("tasks", __name__, url_prefix="/api/tasks")
@@ -71,8 +74,8 @@ def update_task(task_id):
         
     # Authorization: Only the assigned employee or management can update
     is_assigned = task.employee_id == current_user_id
-    current_user = Employee.query.get(current_user_id)
-    is_management = current_user and current_user.role in ['Admin', 'Manager', 'Team Lead']
+    current_user = get_current_identity()
+    is_management = current_user and current_user["role"] in ['Admin', 'Manager', 'Team Lead']
     
     if not (is_assigned or is_management):
         return jsonify({"message": "Access Forbidden"}), 403
@@ -135,13 +138,13 @@ def update_active_status(task_id):
     # If Leave, update task status to "Leave"
     if new_active_status == "Leave":
         task.status = "Leave"
+        # Commit changes first so they stand even if queueing the email fails
+        db.session.commit()
+
         # Send Email with validation
-        employee = Employee.query.get(current_user_id)
+        employee = get_current_user()
         email_result = send_leave_notification_email(employee, task)
         
-        # Commit changes even if email fails
-        db.session.commit()
-        
         # Return response based on email result
         if email_result and email_result.get("success"):
             return jsonify({
@@ -212,117 +215,292 @@ def serve_upload(filename):
     upload_folder = current_app.config['UPLOAD_FOLDER']
     return send_from_directory(upload_folder, filename)
 
+MAX_PAGE_SIZE = 500
+FINISHED_STATUSES = ["Completed", "Call Completed", "Done"]
+
+
+def _next_day(date_str):
+    return (datetime.strptime(date_str, '%Y-%m-%d') + timedelta(days=1)).strftime('%Y-%m-%d')
+
+
+def _filtered_task_query(args, today_str):
+    """Applies the GET /api/tasks filters to a Task query."""
+    query = Task.query
+    if args.get('employee_id'):
+        query = query.filter(Task.employee_id == args['employee_id'])
+    if args.get('team'):
+        query = query.filter(Task.team == args['team'])
+    if args.get('client_id'):
+        query = query.filter(Task.client_id == args['client_id'])
+    if args.get('status'):
+        query = query.filter(Task.status.in_(args['status'].split(',')))
+
+    # team_sent_at is stored as "YYYY-MM-DD | hh:mm AM", so date bounds are
+    # plain string comparisons on its prefix.
+    date_from = args.get('date_from')
+    date_to = args.get('date_to')
+    if args.get('is_today') == 'true':
+        date_from = date_to = today_str
+    if date_from:
+        query = query.filter(Task.team_sent_at >= date_from)
+    if date_to:
+        query = query.filter(Task.team_sent_at < _next_day(date_to))
+    return query
+
+
+def _task_rows(tasks, today_str, fields):
+    results = []
+    for td in serialize_tasks(tasks):
+        sent_date = td["teamSentAt"].split(' | ')[0] if td["teamSentAt"] else ""
+        td["isToday"] = (sent_date == today_str)
+        if fields:
+            td = {k: v for k, v in td.items() if k in fields}
+        results.append(td)
+    return results
+
+
+def _group_rows(tasks, today_str, fields):
+    preload_clients(tasks)
+    grouped = {}
+    for t in tasks:
+        cid = t.client_id
+        if cid not in grouped:
+            grouped[cid] = {
+                "client": t.client.client_name if t.client else "Unknown",
+                "clientID": cid,
+                "clientSlug": t.client.slug if t.client and hasattr(t.client, 'slug') else None,
+                "tasks": [],
+                "count": 0,
+                "teamSentAt": t.team_sent_at,
+                "deliveryDate": str(t.client.delivery_date) if t.client and t.client.delivery_date else "N/A",
+                "isToday": False
+            }
+        grouped[cid]["tasks"].append(t)
+
+    results = []
+    for g in grouped.values():
+        group_tasks = g["tasks"]
+        g["tasks"] = _task_rows(group_tasks, today_str, fields)
+        g["count"] = len(group_tasks)
+        g["isToday"] = any(
+            (t.team_sent_at.split(' | ')[0] if t.team_sent_at else "") == today_str for t in group_tasks
+        )
+
+        # Status: Completed only if all tasks are finished
+        all_completed = all(t.status in FINISHED_STATUSES for t in group_tasks)
+        g["status"] = "Completed" if group_tasks and all_completed else "In Progress"
+
+        # Representative activity type for display
+        if group_tasks:
+            g["activityType"] = group_tasks[0].content_type
+            if len(group_tasks) > 1:
+                types = set(t.content_type for t in group_tasks if t.content_type)
+                if len(types) > 1:
+                    g["activityType"] = "Multiple"
+
+        results.append(g)
+    return results
+
+
 @bp.route("", methods=["GET"])
 @jwt_required()
 def get_tasks():
-    employee_id = request.args.get('employee_id')
-    team = request.args.get('team')
-    group_by_client = request.args.get('group_by_client') == 'true'
-    
-    query = Task.query
-    if employee_id:
-        query = query.filter_by(employee_id=employee_id)
-    if team:
-        query = query.filter_by(team=team)
-    
-    tasks = query.all()
-    from datetime import datetime
+    """
+    List tasks, optionally grouped by client.
+
+    Filters: employee_id, team, client_id, status (comma-separated),
+    date_from / date_to (YYYY-MM-DD, on the team sent date), is_today=true.
+    fields: comma-separated list of task keys to return (e.g. id,status,client).
+
+    Pagination is opt-in: passing `limit` or `cursor` returns
+    {"items": [...], "nextCursor": "..." | null} instead of a bare list.
+    Plain listings are keyset-paginated on id (order=id, default) or on
+    (updatedAt, id) newest first (order=updated_at). With
+    group_by_client=true, pages are made of whole client groups keyed on
+    clientID.
+    """
+    args = request.args
+    group_by_client = args.get('group_by_client') == 'true'
+    fields = set(f for f in args.get('fields', '').split(',') if f)
     today_str = datetime.now().strftime('%Y-%m-%d')
-    
+
+    try:
+        for key in ('date_from', 'date_to'):
+            if args.get(key):
+                datetime.strptime(args[key], '%Y-%m-%d')
+    except ValueError:
+        return jsonify({"message": "Invalid date_from or date_to (expected YYYY-MM-DD)"}), 400
+
+    query = _filtered_task_query(args, today_str)
+
+    paginate = 'limit' in args or 'cursor' in args
+    if not paginate:
+        tasks = query.order_by(Task.id).all()
+        if group_by_client:
+            return jsonify(_group_rows(tasks, today_str, fields)), 200
+        return jsonify(_task_rows(tasks, today_str, fields)), 200
+
+    try:
+        limit = min(max(int(args.get('limit', 100)), 1), MAX_PAGE_SIZE)
+        cursor = decode_cursor(args['cursor']) if args.get('cursor') else None
+        if cursor is not None:
+            # A cursor only fits the listing mode that issued it
+            if group_by_client:
+                cursor = {"c": str(cursor["c"])}
+            elif args.get('order') == 'updated_at':
+                cursor = {"u": datetime.fromisoformat(cursor["u"]), "id": int(cursor["id"])}
+            else:
+                cursor = {"id": int(cursor["id"])}
+    except (ValueError, TypeError, KeyError):
+        return jsonify({"message": "Invalid limit or cursor"}), 400
+
     if group_by_client:
-        grouped = {}
-        for t in tasks:
-            cid = t.client_id
-            if cid not in grouped:
-                grouped[cid] = {
-                    "client": t.client.client_name if t.client else "Unknown",
-                    "clientID": cid,
-                    "clientSlug": t.client.slug if t.client and hasattr(t.client, 'slug') else None,
-                    "tasks": [],
-                    "count": 0,
-                    "teamSentAt": t.team_sent_at,
-                    "deliveryDate": str(t.client.delivery_date) if t.client and t.client.delivery_date else "N/A",
-                    "isToday": False
-                }
-            task_dict = t.to_dict()
-            sent_date = t.team_sent_at.split(' | ')[0] if t.team_sent_at else ""
-            task_dict["isToday"] = (sent_date == today_str)
-            
-            grouped[cid]["tasks"].append(task_dict)
-            grouped[cid]["count"] += 1
-            if task_dict["isToday"]:
-                grouped[cid]["isToday"] = True
-            
-        results = []
-        for g in grouped.values():
-            # Status: Completed only if all tasks are finished
-            all_completed = all(tk["status"] in ["Completed", "Call Completed", "Done"] for tk in g["tasks"])
-            g["status"] = "Completed" if g["tasks"] and all_completed else "In Progress"
-            
-            # Representative activity type for display
-            if g["tasks"]:
-                g["activityType"] = g["tasks"][0].get("activityType", "N/A")
-                if len(g["tasks"]) > 1:
-                    types = set(tk.get("activityType") for tk in g["tasks"] if tk.get("activityType"))
-                    if len(types) > 1:
-                        g["activityType"] = "Multiple"
-            
-            results.append(g)
-        return jsonify(results), 200
+        id_query = query.with_entities(Task.client_id).distinct()
+        if cursor:
+            id_query = id_query.filter(Task.client_id > cursor["c"])
+        client_ids = [row[0] for row in id_query.order_by(Task.client_id).limit(limit + 1).all()]
+        has_more = len(client_ids) > limit
+        client_ids = client_ids[:limit]
+
+        tasks = query.filter(Task.client_id.in_(client_ids)).order_by(Task.client_id, Task.id).all() if client_ids else []
+        next_cursor = encode_cursor({"c": client_ids[-1]}) if has_more else None
+        return jsonify({"items": _group_rows(tasks, today_str, fields), "nextCursor": next_cursor}), 200
+
+    if args.get('order') == 'updated_at':
+        if cursor:
+            query = query.filter(db.or_(
+                Task.updated_at < cursor["u"],
+                db.and_(Task.updated_at == cursor["u"], Task.id < cursor["id"])
+            ))
+        query = query.order_by(Task.updated_at.desc(), Task.id.desc())
+    else:
+        if cursor:
+            query = query.filter(Task.id > cursor["id"])
+        query = query.order_by(Task.id)
+
+    tasks = query.limit(limit + 1).all()
+    has_more = len(tasks) > limit
+    tasks = tasks[:limit]
+
+    next_cursor = None
+    if has_more:
+        last = tasks[-1]
+        values = {"id": last.id}
+        if args.get('order') == 'updated_at':
+            values["u"] = last.updated_at.isoformat()
+        next_cursor = encode_cursor(values)
+
+    return jsonify({"items": _task_rows(tasks, today_str, fields), "nextCursor": next_cursor}), 200
+
+BULK_CHUNK_SIZE = 1000
+
+
+def _chunks(items, size=BULK_CHUNK_SIZE):
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+
+def _existing_values(column, values):
+    """Subset of values already present in column, using one IN query per chunk."""
+    found = set()
+    for chunk in _chunks(list(values)):
+        found.update(v for (v,) in db.session.query(column).filter(column.in_(chunk)))
+    return found
+
+
+def _resolve_code_conflicts(codes):
+    """
+    Maps each requested code to a code that is unused both in the table and
+    within the batch. Clashes get the legacy "-1", "-2", ... suffixes; each
+    round checks every remaining candidate with one IN query.
+    """
+    taken = _existing_values(Task.activity_code, set(codes))
+    resolved = [None] * len(codes)
+    pending = []   # (row index, base code, next suffix)
+    for i, code in enumerate(codes):
+        if code in taken:
+            pending.append((i, code, 1))
+        else:
+            resolved[i] = code
+            taken.add(code)
+
+    while pending:
+        taken |= _existing_values(Task.activity_code, {f"{base}-{n}" for _, base, n in pending})
+        retry = []
+        for i, base, n in pending:
+            candidate = f"{base}-{n}"
+            if candidate in taken:
+                retry.append((i, base, n + 1))
+            else:
+                resolved[i] = candidate
+                taken.add(candidate)
+        pending = retry
+    return resolved
 
-    results = []
-    for t in tasks:
-        td = t.to_dict()
-        sent_date = t.team_sent_at.split(' | ')[0] if t.team_sent_at else ""
-        td["isToday"] = (sent_date == today_str)
-        results.append(td)
-    return jsonify(results), 200
 
 @bp.route("/bulk", methods=["POST"])
 @role_required('Admin', 'Manager')
 def create_tasks_bulk():
+    """
+    Creates many tasks in one transaction.
+
+    Codes that are missing or "PENDING" come from the activity code
+    sequence in one reservation, clashing codes are suffixed, and all valid rows are written with a single
+    executemany INSERT. Each input row gets an entry in "results":
+    {"index", "status": "created" | "renamed" | "failed", "activityCode", "message"?}.
+    """
     try:
         tasks_data = request.get_json(force=True)
         if not isinstance(tasks_data, list):
             return jsonify({"success": False, "message": "Expected a list of tasks"}), 400
-        
-        created_tasks = []
-        for data in tasks_data:
-            activity_code = data.get("activityCode")
-            
-            # IMPROVEMENT: If activityCode is "PENDING" or missing, generate a unique one
-            if not activity_code or activity_code == "PENDING":
-                last_task = Task.query.order_by(Task.id.desc()).first()
-                next_id = (last_task.id + 1) if last_task else 1
-                activity_code = f"ACT-{next_id:04}"
-
-            # Check if this activity_code already exists to avoid Unique Constraint violation
-            existing = Task.query.filter_by(activity_code=activity_code).first()
-            if existing:
-                # If it already exists, increment until unique
-                count = 1
-                base_code = activity_code
-                while Task.query.filter_by(activity_code=activity_code).first():
-                    activity_code = f"{base_code}-{count}"
-                    count += 1
-
-            task = Task(
-                activity_code=activity_code,
-                client_id=data.get("clientID"),
-                team=data.get("team"),
-                status=data.get("status", "Pending"),
-                content_type=data.get("serviceType"),
-                amount=data.get("amount", 0),
-                minutes=data.get("minutes", 0),
-                is_web_work=data.get("isWebWork", False),
-                web_completion_json=json.dumps(data.get("webCompletionStatus") or {}),
-                client_sent_at=data.get("clientSentAt")
-            )
-            db.session.add(task)
-            created_tasks.append(task)
-            
+
+        results = [{"index": i} for i in range(len(tasks_data))]
+        valid = []
+        for i, data in enumerate(tasks_data):
+            if not isinstance(data, dict) or not data.get("clientID") or not data.get("team"):
+                results[i].update(status="failed", message="Missing required fields")
+            else:
+                valid.append((i, data))
+
+        known_clients = _existing_values(Client.client_id, {data["clientID"] for _, data in valid})
+        rows = []
+        for i, data in valid:
+            if data["clientID"] not in known_clients:
+                results[i].update(status="failed", message=f"Unknown client {data['clientID']}")
+            else:
+                rows.append((i, data))
+
+        requested = [data.get("activityCode") for _, data in rows]
+        generated = iter(next_activity_codes(sum(1 for c in requested if not c or c == "PENDING")))
+        requested = [next(generated) if not c or c == "PENDING" else c for c in requested]
+        codes = _resolve_code_conflicts(requested)
+
+        values = []
+        for (i, data), wanted, code in zip(rows, requested, codes):
+            values.append({
+                "activity_code": code,
+                "client_id": data["clientID"],
+                "team": data["team"],
+                "status": data.get("status", "Pending"),
+                "content_type": data.get("serviceType"),
+                "amount": data.get("amount", 0),
+                "minutes": data.get("minutes", 0),
+                "is_web_work": data.get("isWebWork", False),
+                "web_completion_json": json.dumps(data.get("webCompletionStatus") or {}),
+                "client_sent_at": data.get("clientSentAt")
+            })
+            results[i].update(status="created" if code == wanted else "renamed", activityCode=code)
+
+        for chunk in _chunks(values):
+            db.session.execute(Task.__table__.insert(), chunk)
         db.session.commit()
-        return jsonify({"success": True, "count": len(created_tasks)}), 201
+
+        return jsonify({
+            "success": True,
+            "count": len(values),
+            "failed": len(tasks_data) - len(values),
+            "results": results
+        }), 201
     except Exception as e:
         db.session.rollback()
         return jsonify({"success": False, "message": f"Bulk creation failed: {str(e)}"}), 500
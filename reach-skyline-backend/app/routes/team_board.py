@@ -0,0 +1,191 @@
+# app/routes/team_board.py
+from flask import Blueprint, jsonify, request
+from sqlalchemy import case
+from app.models.task import Task, serialize_tasks
+from app.models.client import Client
+from app.extensions import db
+from flask_jwt_extended import get_jwt_identity
+from app.utils.auth_decorators import team_access_required
+from app.models.employee import Employee
+from app.services.assignment_notifier import assignment_notifier
+
+
+def _count_where(condition):
+    return db.func.sum(case((condition, 1), else_=0))
+
+
+def _aggregate_status(row):
+    """
+    Priority: Leave > In Progress > Assigned > Completed > Unassigned
+    (Completed only wins when every task in the group is Completed).
+    """
+    if row.leave_count:
+        return "Leave"
+    if row.completed_count == row.count:
+        return "Completed"
+    if row.in_progress_count:
+        return "In Progress"
+    if row.assigned_count:
+        return "Assigned"
+    return "Unassigned"
+
+
+def get_board_summary(team):
+    """
+    Per-client task counts and aggregate status for a team board,
+    computed in one GROUP BY instead of loading every task row.
+    """
+    summary = db.session.query(
+        Task.client_id.label("client_id"),
+        db.func.min(Task.id).label("first_id"),
+        db.func.count(Task.id).label("count"),
+        _count_where(Task.status == "Leave").label("leave_count"),
+        _count_where(Task.status == "Completed").label("completed_count"),
+        _count_where(Task.status == "In Progress").label("in_progress_count"),
+        db.func.count(Task.employee_id).label("assigned_count"),
+        db.func.min(Task.client_sent_at).label("client_sent_at"),
+    ).filter(Task.team == team).group_by(Task.client_id).subquery()
+
+    rows = db.session.query(
+        summary, Client.client_name, Client.delivery_date
+    ).outerjoin(
+        Client, Client.client_id == summary.c.client_id
+    ).order_by(summary.c.first_id).all()
+
+    return [{
+        "client": row.client_name or "Unknown",
+        "clientID": row.client_id,
+        "team": team,
+        "count": row.count,
+        "clientSentAt": row.client_sent_at,
+        "deliveryDate": str(row.delivery_date) if row.delivery_date else "N/A",
+        "status": _aggregate_status(row)
+    } for row in rows]
+
+
+def get_board_tasks(team, client_ids=None):
+    """Serialized task rows for a team board, grouped by client ID."""
+    query = Task.query.filter(Task.team == team)
+    if client_ids is not None:
+        if not client_ids:
+            return {}
+        query = query.filter(Task.client_id.in_(client_ids))
+
+    grouped = {}
+    for td in serialize_tasks(query.order_by(Task.id).all()):
+        grouped.setdefault(td["clientID"], []).append(td)
+    return grouped
+
+
+def create_team_blueprint(name, team):
+    """
+    Builds the /api/<name> blueprint shared by every team page:
+    board listing, single assignment and bulk assignment.
+    """
+    bp = Blueprint(name, __name__, url_prefix=f"/api/{name}")
+
+    @bp.route("/tasks", methods=["GET"], endpoint=f"get_{name}_tasks")
+    @team_access_required
+    def get_team_tasks(authorized_team=None):
+        """
+        Board summaries, one per client, each with a `tasks` list.
+
+        Query params:
+        - expand: 'none' (default) leaves every `tasks` empty — the pages
+          load a group's rows from /tasks/client/<client_id> when it is
+          opened; 'all' fills them in for every group, or a
+          comma-separated list of client IDs for just those groups.
+        """
+        if authorized_team and authorized_team != team:
+            return jsonify({"message": f"Access Forbidden: You are not a {team} Team Lead"}), 403
+
+        results = get_board_summary(team)
+
+        expand = request.args.get("expand", "none")
+        grouped = {}
+        if expand != "none":
+            client_ids = None if expand == "all" else [c for c in expand.split(",") if c]
+            grouped = get_board_tasks(team, client_ids)
+        for g in results:
+            g["tasks"] = grouped.get(g["clientID"], [])
+
+        return jsonify(results), 200
+
+    @bp.route("/tasks/client/<string:client_id>", methods=["GET"], endpoint=f"get_{name}_client_tasks")
+    @team_access_required
+    def get_team_client_tasks(client_id, authorized_team=None):
+        if authorized_team and authorized_team != team:
+            return jsonify({"message": f"Access Forbidden: You are not a {team} Team Lead"}), 403
+
+        grouped = get_board_tasks(team, [client_id])
+        return jsonify(grouped.get(client_id, [])), 200
+
+    @bp.route("/tasks/<int:task_id>/assign", methods=["PUT"], endpoint=f"assign_{name}")
+    @team_access_required
+    def assign_task(task_id, authorized_team=None):
+        if authorized_team and authorized_team != team:
+            return jsonify({"message": f"Access Forbidden: You are not a {team} Team Lead"}), 403
+
+        data = request.get_json() or {}
+        t = Task.query.get(task_id)
+        if not t: return jsonify({"error":"Task not found"}), 404
+
+        emp_id = data.get("employee_id")
+
+        # Check if reassignment is allowed
+        if t.employee_id and t.employee_id != emp_id and t.active_status != "Leave":
+            return jsonify({"error": "Cannot reassign a task while current employee is 'Working'. Status must be 'Leave'."}), 403
+
+        is_new_assignment = str(t.employee_id) != str(emp_id) if emp_id else False
+
+        t.employee_id = emp_id
+        if data.get("teamSentAt"):
+            t.team_sent_at = data.get("teamSentAt")
+        db.session.commit()
+
+        if is_new_assignment and emp_id:
+            # Buffered: rapid one-by-one assignments go out as a single digest email
+            assignment_notifier.notify(emp_id, [t.id], get_jwt_identity())
+
+        return jsonify({"message":"Assigned"}), 200
+
+    @bp.route("/assign-bulk", methods=["POST"], endpoint=f"assign_{name}_bulk")
+    @team_access_required
+    def assign_bulk(authorized_team=None):
+        if authorized_team and authorized_team != team:
+            return jsonify({"message": "Access Forbidden"}), 403
+
+        data = request.get_json() or {}
+        task_ids = data.get("task_ids", [])
+        emp_id = data.get("employee_id")
+        time_stamp = data.get("teamSentAt")
+
+        if not task_ids or not emp_id:
+            return jsonify({"message": "Missing task_ids or employee_id"}), 400
+
+        employee = Employee.query.get(emp_id)
+        if not employee:
+            return jsonify({"message": "Employee not found"}), 404
+
+        tasks_to_notify = []
+        for t in Task.query.filter(Task.id.in_(task_ids)).order_by(Task.id).all():
+            is_new = str(t.employee_id) != str(emp_id)
+
+            # Skip if currently Working by someone else
+            if t.employee_id and is_new and t.active_status != "Leave":
+                continue
+
+            t.employee_id = emp_id
+            if time_stamp:
+                t.team_sent_at = time_stamp
+            if is_new:
+                tasks_to_notify.append(t)
+
+        db.session.commit()
+
+        if tasks_to_notify:
+            assignment_notifier.notify(emp_id, [t.id for t in tasks_to_notify], get_jwt_identity())
+
+        return jsonify({"message": f"Successfully assigned {len(task_ids)} tasks"}), 200
+
+    return bp
@@ -0,0 +1,87 @@
+# app/services/assignment_notifier.py
+"""
+Coalesces task assignment notifications.
+
+Instead of one email per assign click, assignment events are buffered per
+(employee, team leader) for ASSIGNMENT_DIGEST_WINDOW seconds and then sent
+as a single send_task_email() digest covering every task in the window.
+"""
+import atexit
+import threading
+from app.extensions import db
+
+
+class AssignmentNotifier:
+
+    def __init__(self, app=None):
+        self.app = None
+        self.window = 60
+        self._pending = {}   # (employee_id, team_leader_id) -> ordered list of task ids
+        self._timers = {}
+        self._lock = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        if self.app is None:
+            atexit.register(self.flush_all)
+        self.app = app
+        self.window = app.config.get("ASSIGNMENT_DIGEST_WINDOW", 60)
+
+    def notify(self, employee_id, task_ids, team_leader_id=None):
+        """Records that task_ids were assigned to employee_id by team_leader_id."""
+        if not employee_id or not task_ids:
+            return
+        if self.app is None or self.window <= 0:
+            self._send(employee_id, list(task_ids), team_leader_id)
+            return
+
+        key = (employee_id, team_leader_id)
+        with self._lock:
+            pending = self._pending.setdefault(key, [])
+            pending.extend(tid for tid in task_ids if tid not in pending)
+            if key not in self._timers:
+                timer = threading.Timer(self.window, self.flush, args=(key,))
+                timer.daemon = True
+                self._timers[key] = timer
+                timer.start()
+
+    def flush(self, key):
+        with self._lock:
+            task_ids = self._pending.pop(key, None)
+            timer = self._timers.pop(key, None)
+        if timer:
+            timer.cancel()
+        if not task_ids:
+            return
+        with self.app.app_context():
+            try:
+                self._send(key[0], task_ids, key[1])
+            finally:
+                db.session.remove()
+
+    def flush_all(self):
+        """Sends every buffered digest now (used on shutdown)."""
+        with self._lock:
+            keys = list(self._pending.keys())
+        for key in keys:
+            self.flush(key)
+
+    def _send(self, employee_id, task_ids, team_leader_id):
+        from app.models.employee import Employee
+        from app.models.task import Task, preload_clients
+        from app.services.email_service import send_task_email
+
+        employee = Employee.query.get(employee_id)
+        if not employee:
+            return False
+        team_leader = Employee.query.get(team_leader_id) if team_leader_id else None
+
+        # Skip tasks that were reassigned to someone else before the digest went out
+        tasks = Task.query.filter(Task.id.in_(task_ids), Task.employee_id == employee_id).order_by(Task.id).all()
+        if not tasks:
+            return False
+        return send_task_email(employee, preload_clients(tasks), team_leader)
+
+
+assignment_notifier = AssignmentNotifier()
@@ -0,0 +1,213 @@
+# app/services/chat_buffer.py
+"""
+Optional write-behind persistence for chat messages (CHAT_WRITE_BEHIND).
+
+handle_send_message takes the message id from the sequence allocator,
+emits straight away and hands the row to this buffer. A background thread
+writes buffered rows to chat_messages with one multi-row INSERT (plus the
+matching unread-counter upserts and offline-digest entries) every CHAT_FLUSH_INTERVAL_MS or as soon
+as CHAT_FLUSH_MAX_BATCH rows are waiting. Failed batches are retried, and
+everything still buffered is flushed on shutdown.
+"""
+import atexit
+import threading
+from collections import Counter
+from datetime import datetime
+from app.extensions import db
+from app.models.chat import ChatMessage
+
+
+class ChatWriteBuffer:
+
+    # Consecutive failed batch inserts before falling back to row-by-row
+    MAX_BATCH_FAILURES = 3
+
+    def __init__(self, app=None):
+        self.app = None
+        self.enabled = False
+        self.interval = 0.02
+        self.max_batch = 200
+        self.id_block_size = 100
+        self._ids = None            # shared RedisSequence when several workers send
+        self._rows = []
+        self._offline_ids = set()   # buffered messages whose receiver was offline
+        self._failures = 0
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stop_event = threading.Event()
+        self._thread = None
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.app = app
+        self.enabled = app.config.get("CHAT_WRITE_BEHIND", False)
+        self.interval = app.config.get("CHAT_FLUSH_INTERVAL_MS", 20) / 1000
+        self.max_batch = app.config.get("CHAT_FLUSH_MAX_BATCH", 200)
+        self.id_block_size = app.config.get("CHAT_ID_BLOCK_SIZE", 100)
+        self._ids = None
+        if self.enabled and app.config.get("SOCKETIO_MESSAGE_QUEUE"):
+            # Several workers: blocks held per process would interleave out of
+            # send order, breaking after_id catch-up and the read watermarks
+            if app.config.get("CHAT_ID_URL"):
+                from app.services.sequence_service import chat_message_sequence
+                self._ids = chat_message_sequence(app.config["CHAT_ID_URL"])
+            else:
+                print("⚠ Chat buffer warning: SOCKETIO_MESSAGE_QUEUE is set but CHAT_ID_URL is not; "
+                      "write-behind is disabled and messages are written as they are sent")
+                self.enabled = False
+        if not self.enabled or self._thread is not None:
+            return
+
+        from app.services.sequence_service import allocator
+        with app.app_context():
+            try:
+                # Rows inserted while write-behind was off used database IDs
+                last_id = db.session.query(db.func.coalesce(db.func.max(ChatMessage.id), 0)).scalar()
+                if self._ids is not None:
+                    self._ids.advance_to(last_id)
+                else:
+                    allocator.advance_to("chat_message", last_id)
+            except Exception as e:
+                db.session.rollback()
+                print(f"⚠ Chat buffer warning: {str(e)}")
+            finally:
+                db.session.remove()
+
+        self._thread = threading.Thread(target=self._run, daemon=True, name="chat-write-behind")
+        self._thread.start()
+        atexit.register(self.stop)
+
+    def add(self, chat_id, sender_id, receiver_id, message_text, attachment_path=None, task_code=None,
+            receiver_offline=False):
+        """
+        Assigns an id, buffers the row and returns it in ChatMessage.to_dict()
+        form. receiver_offline also queues the message for the email digest.
+        """
+        from app.services.sequence_service import next_chat_message_ids
+
+        row = {
+            "id": self._ids.allocate(1)[0] if self._ids is not None else next_chat_message_ids(1, self.id_block_size)[0],
+            "chat_id": chat_id,
+            "sender_id": sender_id,
+            "receiver_id": receiver_id,
+            "message_text": message_text,
+            "attachment_path": attachment_path,
+            "created_at": datetime.utcnow(),
+            "read_status": False,
+            "task_code": task_code
+        }
+        with self._lock:
+            self._rows.append(row)
+            if receiver_offline:
+                self._offline_ids.add(row["id"])
+            full = len(self._rows) >= self.max_batch
+        if full:
+            self._wakeup.set()
+        return {**row, "created_at": row["created_at"].isoformat()}
+
+    def pending(self):
+        with self._lock:
+            return len(self._rows)
+
+    def flush(self):
+        """Writes every buffered row now. Returns how many were written."""
+        with self._flush_lock:
+            with self._lock:
+                rows, self._rows = self._rows, []
+            if not rows:
+                return 0
+            try:
+                self._write(rows)
+                self._failures = 0
+                return len(rows)
+            except Exception:
+                db.session.rollback()
+                self._failures += 1
+                if self._failures < self.MAX_BATCH_FAILURES:
+                    with self._lock:
+                        # Keep them, in order, ahead of anything buffered meanwhile
+                        self._rows = rows + self._rows
+                    raise
+
+            # The batch keeps failing: write row by row so one bad row can't block the rest
+            self._failures = 0
+            written = 0
+            for row in rows:
+                try:
+                    self._write([row])
+                    written += 1
+                except Exception as e:
+                    db.session.rollback()
+                    print(f"[ERROR] Dropping chat message {row['id']} after repeated failures: {e}")
+                    with self._lock:
+                        self._offline_ids.discard(row["id"])
+            return written
+
+    def _write(self, rows):
+        from app.services import chat_service
+        from app.services.chat_digest import chat_digest
+
+        db.session.execute(ChatMessage.__table__.insert(), rows)
+        unread = Counter((r["receiver_id"], r["task_code"]) for r in rows)
+        for (receiver_id, task_code), count in unread.items():
+            chat_service.increment_unread(receiver_id, task_code, by=count)
+        with self._lock:
+            offline = [r for r in rows if r["id"] in self._offline_ids]
+        for r in offline:
+            chat_digest.record(r["receiver_id"], r["sender_id"], r["chat_id"], r["id"], r["task_code"], r["message_text"])
+        db.session.commit()
+        if offline:
+            with self._lock:
+                self._offline_ids.difference_update(r["id"] for r in offline)
+
+    def _flush_in_context(self):
+        with self.app.app_context():
+            try:
+                return self.flush()
+            except Exception as e:
+                print(f"[ERROR] Chat write-behind flush failed, will retry: {e}")
+                return 0
+            finally:
+                db.session.remove()
+
+    def _run(self):
+        while not self._stop_event.is_set():
+            self._wakeup.wait(self.interval)
+            self._wakeup.clear()
+            self._flush_in_context()
+
+    def stop(self, attempts=5):
+        """Stops the flusher and persists whatever is still buffered."""
+        self._stop_event.set()
+        self._wakeup.set()
+        if self._thread is not None:
+            self._thread.join(5)
+            self._thread = None
+        for _ in range(attempts):
+            if not self.pending():
+                break
+            self._flush_in_context()
+        if self.pending():
+            print(f"[ERROR] Chat write-behind lost {self.pending()} messages on shutdown")
+        self._sync_postgres_sequence()
+
+    def _sync_postgres_sequence(self):
+        # Explicit ids don't advance a Postgres serial; realign it for the synchronous path
+        with self.app.app_context():
+            try:
+                if db.engine.dialect.name == "postgresql":
+                    db.session.execute(db.text(
+                        "SELECT setval(pg_get_serial_sequence('chat_messages', 'id'), "
+                        "(SELECT COALESCE(MAX(id), 1) FROM chat_messages))"
+                    ))
+                    db.session.commit()
+            except Exception as e:
+                db.session.rollback()
+                print(f"⚠ Chat buffer warning: {str(e)}")
+            finally:
+                db.session.remove()
+
+
+chat_buffer = ChatWriteBuffer()
@@ -0,0 +1,125 @@
+# app/services/chat_digest.py
+"""
+Email digest of chat messages received while offline.
+
+When a message's receiver has no live socket (see app/services/presence.py)
+handle_send_message skips the 'notification' emit and records the message
+in chat_pending_notifications instead. Every CHAT_DIGEST_INTERVAL seconds a
+background thread sends each such receiver one email covering everything
+still unread, via send_chat_digest_email(). Receivers who are back online
+by then, or have read the messages, get no email.
+"""
+import threading
+from collections import OrderedDict
+from app.extensions import db
+from app.models.chat import ChatPendingNotification, ChatReadWatermark
+
+PREVIEW_LENGTH = 200
+
+
+class ChatDigest:
+
+    def __init__(self, app=None):
+        self.app = None
+        self.interval = 900
+        self._stop_event = threading.Event()
+        self._thread = None
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.app = app
+        self.interval = app.config.get("CHAT_DIGEST_INTERVAL", 900)
+        if self.interval <= 0 or self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._run, daemon=True, name="chat-digest")
+        self._thread.start()
+
+    def record(self, receiver_id, sender_id, chat_id, message_id, task_code, message_text):
+        """Queues a message for receiver_id's next digest; caller commits."""
+        db.session.add(ChatPendingNotification(
+            receiver_id=receiver_id,
+            sender_id=sender_id,
+            chat_id=chat_id,
+            message_id=message_id,
+            task_code=task_code,
+            preview=(message_text or "")[:PREVIEW_LENGTH]
+        ))
+
+    def send_due(self):
+        """Sends every pending digest now. Returns how many emails were queued."""
+        receivers = [r for (r,) in db.session.query(ChatPendingNotification.receiver_id).distinct()]
+        sent = 0
+        for receiver_id in receivers:
+            try:
+                sent += self._send(receiver_id)
+            except Exception as e:
+                db.session.rollback()
+                print(f"[ERROR] Chat digest for {receiver_id} failed: {e}")
+        return sent
+
+    def _send(self, receiver_id):
+        from app.models.employee import Employee
+        from app.services.email_service import send_chat_digest_email
+        from app.services.presence import presence
+
+        pending = ChatPendingNotification.query.filter_by(receiver_id=receiver_id).order_by(
+            ChatPendingNotification.id
+        ).all()
+        if not pending:
+            return 0
+
+        # Claim the rows: if another worker deleted some first, it owns this digest
+        ids = [p.id for p in pending]
+        claimed = ChatPendingNotification.query.filter(ChatPendingNotification.id.in_(ids)).delete(
+            synchronize_session=False
+        )
+        if claimed != len(ids):
+            db.session.rollback()
+            return 0
+
+        if presence.is_online(receiver_id):
+            # Back online: the unread badges already show these
+            db.session.commit()
+            return 0
+
+        marks = dict(db.session.query(ChatReadWatermark.chat_id, ChatReadWatermark.last_read_message_id).filter(
+            ChatReadWatermark.reader_id == receiver_id,
+            ChatReadWatermark.chat_id.in_({p.chat_id for p in pending})
+        ).all())
+        unread = [p for p in pending if p.message_id > marks.get(p.chat_id, 0)]
+
+        employee = Employee.query.get(receiver_id) if unread else None
+        queued = False
+        if employee:
+            names = dict(db.session.query(Employee.id, Employee.name).filter(
+                Employee.id.in_({p.sender_id for p in unread})
+            ).all())
+            conversations = OrderedDict()
+            for p in unread:
+                c = conversations.setdefault(p.task_code, {"task_code": p.task_code, "senders": [], "count": 0})
+                sender = names.get(p.sender_id, p.sender_id)
+                if sender not in c["senders"]:
+                    c["senders"].append(sender)
+                c["count"] += 1
+                c["latest"] = p.preview
+            queued = send_chat_digest_email(employee, list(conversations.values()), commit=False)
+        db.session.commit()
+        return 1 if queued else 0
+
+    def _run(self):
+        while not self._stop_event.wait(self.interval):
+            with self.app.app_context():
+                try:
+                    self.send_due()
+                except Exception as e:
+                    db.session.rollback()
+                    print(f"[ERROR] Chat digest run failed: {e}")
+                finally:
+                    db.session.remove()
+
+    def stop(self):
+        self._stop_event.set()
+
+
+chat_digest = ChatDigest()
@@ -0,0 +1,241 @@
+# app/services/chat_service.py
+"""
+Unread-message bookkeeping for chat.
+
+chat_read_watermarks stores, per (chat, reader), the id of the last message
+the reader has seen; a message is read when its id is at or below its
+receiver's watermark (or its legacy read_status flag is already set).
+chat_unread_counters holds one row per (receiver, task code). Sending a
+message bumps the receiver's counter and marking a conversation read moves
+the watermark and recounts what is left above it, both inside the caller's
+transaction, so neither operation touches existing chat_messages rows.
+"""
+from datetime import datetime
+from sqlalchemy import case, select, tuple_, update
+from app.extensions import db
+from app.models.chat import Chat, ChatMessage, ChatReadWatermark, ChatUnreadCounter
+from app.models.task import Task
+
+counters = ChatUnreadCounter.__table__
+watermarks = ChatReadWatermark.__table__
+
+
+def _upsert(table, keys, values, changes):
+    """
+    INSERT keys + values, or on key conflict apply `changes` (column ->
+    value or SQL expression). One statement on SQLite, MySQL and Postgres.
+    """
+    row = {**keys, **values}
+    dialect = db.session.get_bind().dialect.name
+
+    if dialect in ("sqlite", "postgresql"):
+        if dialect == "sqlite":
+            from sqlalchemy.dialects.sqlite import insert
+        else:
+            from sqlalchemy.dialects.postgresql import insert
+        stmt = insert(table).values(**row)
+        stmt = stmt.on_conflict_do_update(index_elements=list(keys), set_=changes)
+    elif dialect in ("mysql", "mariadb"):
+        from sqlalchemy.dialects.mysql import insert
+        stmt = insert(table).values(**row).on_duplicate_key_update(**changes)
+    else:
+        conditions = [table.c[k] == v for k, v in keys.items()]
+        if db.session.execute(update(table).where(*conditions).values(**changes)).rowcount:
+            return
+        stmt = table.insert().values(**row)
+    db.session.execute(stmt)
+
+
+# ----------------------------------------------------
+# UNREAD COUNTERS
+# ----------------------------------------------------
+def increment_unread(receiver_id, task_code, by=1):
+    """Adds `by` unread messages for receiver_id; caller commits."""
+    now = datetime.utcnow()
+    _upsert(
+        counters,
+        {"receiver_id": receiver_id, "task_code": task_code or ""},
+        {"unread_count": by, "updated_at": now},
+        {"unread_count": counters.c.unread_count + by, "updated_at": now}
+    )
+
+
+def recount_unread(receiver_id, task_code, read_up_to):
+    """
+    Sets receiver_id's unread count for task_code to the unread messages
+    left in the chats of read_up_to ({chat_id: id every earlier message is
+    read up to}); caller commits. The count is taken inside the UPDATE, so
+    a message sent after read_up_to was read is still counted.
+    """
+    unread = 0
+    if read_up_to:
+        unread = _join_watermarks(db.session.query(db.func.count(ChatMessage.id))).filter(
+            ChatMessage.receiver_id == receiver_id,
+            db.func.coalesce(ChatMessage.task_code, "") == (task_code or ""),
+            # Bounds per chat so the (chat_id, id) index skips the read history
+            db.or_(*(db.and_(ChatMessage.chat_id == chat_id, ChatMessage.id > last_id)
+                     for chat_id, last_id in read_up_to.items())),
+            _unread_filter()
+        ).scalar_subquery()
+    db.session.execute(update(counters).where(
+        counters.c.receiver_id == receiver_id,
+        counters.c.task_code == (task_code or "")
+    ).values(unread_count=unread, updated_at=datetime.utcnow()))
+
+
+def get_unread_counts(receiver_id):
+    """{task_code: unread} for every conversation with unread messages."""
+    rows = db.session.query(counters.c.task_code, counters.c.unread_count).filter(
+        counters.c.receiver_id == receiver_id,
+        counters.c.unread_count > 0
+    ).all()
+    return {task_code: count for task_code, count in rows}
+
+
+# ----------------------------------------------------
+# READ WATERMARKS
+# ----------------------------------------------------
+def advance_watermark(chat_id, reader_id, message_id):
+    """Moves the reader's watermark forward to message_id (never back); caller commits."""
+    now = datetime.utcnow()
+    _upsert(
+        watermarks,
+        {"chat_id": chat_id, "reader_id": reader_id},
+        {"last_read_message_id": message_id, "updated_at": now},
+        {
+            "last_read_message_id": case(
+                (watermarks.c.last_read_message_id < message_id, message_id),
+                else_=watermarks.c.last_read_message_id
+            ),
+            "updated_at": now
+        }
+    )
+
+
+def mark_read(reader_id, task_code):
+    """
+    Marks every chat for task_code that reader_id takes part in as read up
+    to its newest message and resets the unread counter to whatever
+    arrived since; caller commits.
+    """
+    chat_ids = [cid for (cid,) in db.session.query(Chat.id).join(Task, Task.id == Chat.task_id).filter(
+        Task.activity_code == task_code,
+        db.or_(Chat.emp_id == reader_id, Chat.team_leader_id == reader_id)
+    )]
+    read_up_to = dict.fromkeys(chat_ids, 0)
+    if chat_ids:
+        latest = db.session.query(ChatMessage.chat_id, db.func.max(ChatMessage.id)).filter(
+            ChatMessage.chat_id.in_(chat_ids)
+        ).group_by(ChatMessage.chat_id).all()
+        for chat_id, message_id in latest:
+            advance_watermark(chat_id, reader_id, message_id)
+            read_up_to[chat_id] = message_id
+    recount_unread(reader_id, task_code, read_up_to)
+
+
+def get_watermarks(chat_id):
+    """{reader_id: last read message id} for one chat."""
+    rows = db.session.query(watermarks.c.reader_id, watermarks.c.last_read_message_id).filter(
+        watermarks.c.chat_id == chat_id
+    ).all()
+    return {reader_id: last_read for reader_id, last_read in rows}
+
+
+def serialize_messages(messages, chat_id):
+    """to_dict() rows with read_status derived from the receivers' watermarks."""
+    marks = get_watermarks(chat_id)
+    rows = []
+    for m in messages:
+        row = m.to_dict()
+        row["read_status"] = bool(m.read_status) or m.id <= marks.get(m.receiver_id, 0)
+        rows.append(row)
+    return rows
+
+
+def _unread_filter():
+    """Messages above their receiver's watermark that aren't flagged read."""
+    return db.and_(
+        ChatMessage.read_status == False,  # noqa: E712
+        ChatMessage.id > db.func.coalesce(watermarks.c.last_read_message_id, 0)
+    )
+
+
+def _join_watermarks(query):
+    return query.outerjoin(watermarks, db.and_(
+        watermarks.c.chat_id == ChatMessage.chat_id,
+        watermarks.c.reader_id == ChatMessage.receiver_id
+    ))
+
+
+# ----------------------------------------------------
+# MAINTENANCE
+# ----------------------------------------------------
+def backfill_read_status(batch_size=1000):
+    """
+    Lazily copies watermarks into the legacy read_status column, a batch of
+    rows per statement so it never holds long locks. Returns rows updated.
+    """
+    total = 0
+    for chat_id, reader_id, last_read in db.session.query(
+        watermarks.c.chat_id, watermarks.c.reader_id, watermarks.c.last_read_message_id
+    ).all():
+        while True:
+            ids = [mid for (mid,) in db.session.query(ChatMessage.id).filter(
+                ChatMessage.chat_id == chat_id,
+                ChatMessage.receiver_id == reader_id,
+                ChatMessage.id <= last_read,
+                ChatMessage.read_status == False  # noqa: E712
+            ).limit(batch_size)]
+            if not ids:
+                break
+            ChatMessage.query.filter(ChatMessage.id.in_(ids)).update(
+                {"read_status": True}, synchronize_session=False
+            )
+            db.session.commit()
+            total += len(ids)
+    return total
+
+
+def reconcile_unread_counts():
+    """
+    Repairs drift in the counters from chat_messages and the watermarks.
+    Rows are corrected in place by set-based statements that each compute
+    the counts they write, instead of deleting and re-inserting every
+    counter, so sends and reads can carry on while it runs. Returns the
+    number of (receiver, task code) pairs with unread messages.
+    """
+    task_code = db.func.coalesce(ChatMessage.task_code, "")
+    actual = _join_watermarks(db.session.query(
+        ChatMessage.receiver_id.label("receiver_id"),
+        task_code.label("task_code"),
+        db.func.count(ChatMessage.id).label("unread")
+    )).filter(_unread_filter()).group_by(ChatMessage.receiver_id, task_code).subquery()
+    now = datetime.utcnow()
+
+    # Wrong non-zero counts (UPDATE ... FROM the recount) ...
+    db.session.execute(update(counters).where(
+        counters.c.receiver_id == actual.c.receiver_id,
+        counters.c.task_code == actual.c.task_code,
+        counters.c.unread_count != actual.c.unread
+    ).values(unread_count=actual.c.unread, updated_at=now))
+    # ... counters left behind for conversations that are fully read ...
+    db.session.execute(update(counters).where(
+        counters.c.unread_count != 0,
+        tuple_(counters.c.receiver_id, counters.c.task_code).not_in(
+            select(actual.c.receiver_id, actual.c.task_code)
+        )
+    ).values(unread_count=0, updated_at=now))
+    # ... and missing rows. A row a concurrent send created meanwhile is kept.
+    existing = select(counters.c.receiver_id).where(
+        counters.c.receiver_id == actual.c.receiver_id, counters.c.task_code == actual.c.task_code
+    ).exists()
+    missing = db.session.query(actual.c.receiver_id, actual.c.task_code, actual.c.unread).filter(~existing).all()
+    for receiver_id, code, count in missing:
+        _upsert(
+            counters,
+            {"receiver_id": receiver_id, "task_code": code},
+            {"unread_count": count, "updated_at": now},
+            {"updated_at": counters.c.updated_at}
+        )
+    db.session.commit()
+    return db.session.query(db.func.count()).select_from(counters).filter(counters.c.unread_count > 0).scalar()
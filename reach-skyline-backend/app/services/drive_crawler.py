@@ -0,0 +1,78 @@
+# app/services/drive_crawler.py
+"""
+Parallel walk of a Drive folder tree.
+
+Each folder is listed (all pages, subfolders and media together) by a
+worker from a bounded thread pool; subfolders found are queued for the
+pool, and results are handed back to the calling thread one folder at a
+time, so database writes stay on that thread. Every Drive call goes
+through google_drive.execute(), i.e. the process-wide rate limiter.
+
+googleapiclient service objects are not thread-safe, so each worker
+thread builds its own from service_factory().
+"""
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from app.utils.drive_paths import join_path
+from app.utils.google_drive import iter_folder_pages, is_folder, is_media
+
+
+class CrawledFolder:
+    __slots__ = ("id", "parent_id", "name", "path", "files", "pages")
+
+    def __init__(self, id, parent_id, name, path):
+        self.id = id
+        self.parent_id = parent_id
+        self.name = name
+        self.path = path
+        self.files = []
+        self.pages = 0
+
+
+class DriveCrawler:
+
+    def __init__(self, service_factory, root_id, max_workers=4):
+        self.service_factory = service_factory
+        self.root_id = root_id
+        self.max_workers = max(1, max_workers)
+        self._local = threading.local()
+
+    def _service(self):
+        service = getattr(self._local, "service", None)
+        if service is None:
+            service = self._local.service = self.service_factory()
+        return service
+
+    def _list(self, folder):
+        """Runs on a worker: lists one folder; returns (folder, subfolders)."""
+        subfolders = []
+        for page in iter_folder_pages(self._service(), folder.id, include_folders=True):
+            folder.pages += 1
+            for item in page:
+                if is_folder(item):
+                    subfolders.append(item)
+                elif is_media(item):
+                    folder.files.append(item)
+        return folder, subfolders
+
+    def crawl(self):
+        """Yields a CrawledFolder (with its media files) for the root and every folder below it."""
+        visited = {self.root_id}
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="drive-crawl") as pool:
+            pending = {pool.submit(self._list, CrawledFolder(self.root_id, None, None, ""))}
+            try:
+                while pending:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        folder, subfolders = future.result()
+                        for sub in subfolders:
+                            # Shortcuts / multiple parents can revisit a folder
+                            if sub['id'] in visited:
+                                continue
+                            visited.add(sub['id'])
+                            child = CrawledFolder(sub['id'], folder.id, sub['name'], join_path(folder.path, sub['name']))
+                            pending.add(pool.submit(self._list, child))
+                        yield folder
+            finally:
+                for future in pending:
+                    future.cancel()
@@ -0,0 +1,325 @@
+# app/services/drive_sync.py
+"""
+Google Drive -> media_assets sync.
+
+The first sync of a root folder crawls its whole tree (DriveCrawler),
+stores every folder's path in drive_folders and records a Drive changes
+start-page token in drive_sync_state. Later syncs only read the changes
+feed from that token (slim entries; the metadata of files in the tree is
+then fetched in batches): new files are added, renamed or updated files are
+refreshed, and files that were trashed, deleted or moved out of the tree
+are removed. Each asset records the root it was found under
+(drive_root_id), and a sync only ever removes its own root's assets, so
+syncing one root never deletes another's. Changes to the folders
+themselves trigger a full crawl. The
+token is fetched before a crawl, so edits made while it runs are picked
+up by the next sync. Project, shoot day and shoot date come from each
+file's folder path through the DRIVE_PATH_RULES rules. The folder ID is
+resolved first, so an alias such as 'root' is stored under its real ID.
+
+The Drive service is passed in, so the engine runs against any object
+with the files()/changes()/new_batch_http_request() surface of
+googleapiclient (see benchmarks/fake_drive.py and fake_drive_http.py).
+
+Writes are batched per UPSERT_CHUNK_SIZE files: one IN query loads the
+stored metadata, new files go in with one batched INSERT ... ON
+CONFLICT / ON DUPLICATE KEY UPDATE, changed ones with one executemany
+UPDATE by primary key, and removals with one DELETE ... IN. The engine
+commits after every page/chunk (the changes token only moves in the final
+commit, so an interrupted sync is simply redone) and reports progress
+through an optional on_progress(stats) callback before each commit.
+"""
+from datetime import datetime
+from flask import current_app
+from googleapiclient.errors import HttpError
+from sqlalchemy import delete, insert, select, update
+from app.extensions import db
+from app.models.drive_sync_state import DriveFolder, DriveSyncState
+from app.models.media_asset import MediaAsset
+from app.services.drive_crawler import DriveCrawler
+from app.utils.drive_paths import PathRules
+from app.utils.google_drive import (
+    drive_stats, get_files, get_start_page_token, list_changes, is_folder, is_media, resolve_folder_id
+)
+
+# Statuses Drive returns for a start-page token it no longer accepts
+EXPIRED_TOKEN_STATUSES = (404, 410)
+
+UPSERT_CHUNK_SIZE = 1000
+
+# Per-file problems kept in the summary (the rest are only counted)
+MAX_REPORTED_ERRORS = 50
+
+assets = MediaAsset.__table__
+
+# Columns refreshed from Drive on every sync; the rest belong to the Media Hub
+SYNCED_COLUMNS = ("filename", "mime_type", "thumbnail_url", "meta_data", "drive_modified_at", "drive_root_id")
+# Columns derived from the folder path (see app/utils/drive_paths.py)
+DERIVED_COLUMNS = ("project_name", "shoot_day", "shoot_date")
+
+
+def _parse_time(value):
+    """Drive RFC 3339 timestamp (UTC, e.g. 2026-03-14T09:30:00.123Z) -> naive UTC datetime."""
+    return datetime.fromisoformat(value.replace("Z", "+00:00")).replace(tzinfo=None) if value else None
+
+
+def _asset_fields(file, root_id):
+    return {
+        "drive_root_id": root_id,
+        "filename": file['name'],
+        "mime_type": file['mimeType'],
+        "thumbnail_url": file.get('thumbnailLink'),
+        "meta_data": file.get('videoMediaMetadata', {}),
+        "drive_modified_at": _parse_time(file.get('modifiedTime'))
+    }
+
+
+def _new_asset_row(file, root_id):
+    return {
+        "drive_file_id": file['id'],
+        "play_url": f"https://drive.google.com/file/d/{file['id']}/preview",
+        "project_name": "Unassigned",
+        "shoot_day": 1,
+        "shoot_date": None,
+        "status": "RAW",
+        "created_at": datetime.utcnow(),
+        **_asset_fields(file, root_id)
+    }
+
+
+def _chunks(items, size=UPSERT_CHUNK_SIZE):
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+
+def _insert_assets(rows):
+    """
+    INSERT that refreshes the synced columns instead of failing when
+    another sync inserted the same drive_file_id first. Passed as
+    executemany parameters so the statement compiles once; the drivers
+    send it as multi-row VALUES batches.
+    """
+    dialect = db.session.get_bind().dialect.name
+    if dialect in ("sqlite", "postgresql"):
+        if dialect == "sqlite":
+            from sqlalchemy.dialects.sqlite import insert
+        else:
+            from sqlalchemy.dialects.postgresql import insert
+        stmt = insert(assets)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["drive_file_id"],
+            set_={c: stmt.excluded[c] for c in SYNCED_COLUMNS}
+        )
+    elif dialect in ("mysql", "mariadb"):
+        from sqlalchemy.dialects.mysql import insert
+        stmt = insert(assets)
+        stmt = stmt.on_duplicate_key_update({c: stmt.inserted[c] for c in SYNCED_COLUMNS})
+    else:
+        stmt = assets.insert()
+    db.session.execute(stmt, rows)
+
+
+class DriveSyncEngine:
+
+    def __init__(self, service, folder_id, on_progress=None, service_factory=None, rules=None, max_workers=None):
+        self.service = service
+        self.folder_id = folder_id
+        self.on_progress = on_progress
+        self.service_factory = service_factory or (lambda: service)
+        self.rules = rules or PathRules(current_app.config.get("DRIVE_PATH_RULES"))
+        self.max_workers = max_workers or current_app.config.get("DRIVE_CRAWL_WORKERS", 4)
+        self.stats = {
+            "pages_fetched": 0, "folders": 0, "total_received": 0,
+            "added": 0, "updated": 0, "removed": 0,
+            "error_count": 0, "errors": []
+        }
+
+    def sync(self, full=False):
+        """Brings media_assets in line with the folder tree. Returns a summary dict."""
+        drive_io = drive_stats.snapshot()
+        # Parents never name an alias like 'root', so state and paths use the real ID
+        self.folder_id = resolve_folder_id(self.service, self.folder_id)
+        state = DriveSyncState.query.get(self.folder_id)
+        if state is None:
+            state = DriveSyncState(folder_id=self.folder_id)
+            db.session.add(state)
+
+        mode = "full"
+        if state.start_page_token and not full:
+            try:
+                if self._incremental(state):
+                    mode = "incremental"
+                else:
+                    print(f"[DEBUG] Drive folders under {self.folder_id} changed, running a full sync")
+                    self._full(state)
+            except HttpError as e:
+                if e.resp.status not in EXPIRED_TOKEN_STATUSES:
+                    raise
+                print(f"[DEBUG] Drive changes token for {self.folder_id} expired, running a full sync")
+                self._full(state)
+        else:
+            self._full(state)
+
+        state.last_sync_at = datetime.utcnow()
+        self._checkpoint()
+        return {"mode": mode, **self.stats, "drive_io": drive_stats.since(drive_io)}
+
+    def _checkpoint(self):
+        if self.on_progress:
+            self.on_progress(self.stats)
+        db.session.commit()
+
+    def _page_fetched(self, received=0, pages=1):
+        self.stats["pages_fetched"] += pages
+        self.stats["total_received"] += received
+        self._checkpoint()
+
+    def _error(self, message):
+        self.stats["error_count"] += 1
+        if len(self.stats["errors"]) < MAX_REPORTED_ERRORS:
+            self.stats["errors"].append(message)
+
+    def _full(self, state):
+        token = get_start_page_token(self.service)
+        stored = set(db.session.scalars(
+            select(assets.c.drive_file_id).where(assets.c.drive_root_id == self.folder_id)
+        ))
+        seen = set()
+        folders = []
+        batch = []
+        crawler = DriveCrawler(self.service_factory, self.folder_id, self.max_workers)
+        for folder in crawler.crawl():
+            folders.append({
+                "root_id": self.folder_id, "id": folder.id, "parent_id": folder.parent_id,
+                "name": folder.name, "path": folder.path
+            })
+            seen.update(f['id'] for f in folder.files if f.get('id'))
+            batch.extend((f, folder.path) for f in folder.files)
+            self.stats["folders"] += 1
+            self.stats["pages_fetched"] += folder.pages
+            self.stats["total_received"] += len(folder.files)
+            if len(batch) >= UPSERT_CHUNK_SIZE:
+                self._upsert(batch)
+                batch = []
+                self._checkpoint()
+        self._upsert(batch)
+
+        # Whatever the crawl no longer finds under this root was trashed or moved away
+        self._remove(list(stored - seen))
+
+        db.session.execute(delete(DriveFolder).where(DriveFolder.root_id == self.folder_id))
+        for chunk in _chunks(folders):
+            db.session.execute(insert(DriveFolder), chunk)
+
+        state.start_page_token = token
+        state.last_full_sync_at = datetime.utcnow()
+
+    def _incremental(self, state):
+        """
+        Applies the changes feed. Returns False without writing anything if
+        a folder in the tree was added, moved, renamed or removed; paths
+        are then rebuilt by a full crawl.
+        """
+        changes, new_token = list_changes(self.service, state.start_page_token, on_page=self._page_fetched)
+        self.stats["total_received"] = len(changes)
+
+        # Only the latest change per file matters
+        latest = {}
+        for change in changes:
+            latest[change['fileId']] = change
+
+        paths = dict(db.session.query(DriveFolder.id, DriveFolder.path).filter(
+            DriveFolder.root_id == self.folder_id
+        ).all())
+        in_tree, removals = {}, []
+        for drive_id, change in latest.items():
+            file = change.get('file') or {}
+            parents = file.get('parents') or []
+            if drive_id in paths or (is_folder(file) and any(p in paths for p in parents)):
+                return False
+
+            parent = next((p for p in parents if p in paths), None)
+            if not change.get('removed') and not file.get('trashed') and parent and is_media(file):
+                in_tree[drive_id] = paths[parent]
+            else:
+                removals.append(drive_id)
+
+        # Full metadata for the files that stay, batched; gone since -> removed.
+        # A file Drive refuses to describe is reported and left as it is.
+        unreadable = set()
+
+        def on_error(drive_id, error):
+            unreadable.add(drive_id)
+            self._error(f"{drive_id}: {error}")
+
+        files = get_files(self.service, list(in_tree), on_error=on_error) if in_tree else {}
+        removals.extend(drive_id for drive_id in in_tree if drive_id not in files and drive_id not in unreadable)
+        self._upsert([(files[drive_id], path) for drive_id, path in in_tree.items() if drive_id in files])
+        self._remove(removals)
+
+        state.start_page_token = new_token
+        return True
+
+    def _upsert(self, items):
+        """
+        Inserts new files and refreshes changed ones, UPSERT_CHUNK_SIZE at a
+        time. items: (file, folder path) pairs. Project / shoot day / date
+        from the path are set on new assets, and on existing ones that are
+        still Unassigned, never over a manual assignment.
+        """
+        valid = []
+        for file, path in items:
+            missing = [k for k in ('id', 'name', 'mimeType') if not file.get(k)]
+            if missing:
+                self._error(f"{file.get('id', '?')}: missing {', '.join(missing)}")
+            else:
+                valid.append((file, self.rules.derive(path)))
+
+        for chunk in _chunks(valid):
+            stored = {
+                row.drive_file_id: row for row in db.session.execute(
+                    select(assets.c.id, assets.c.drive_file_id,
+                           *(assets.c[c] for c in SYNCED_COLUMNS + DERIVED_COLUMNS))
+                    .where(assets.c.drive_file_id.in_([f['id'] for f, _ in chunk]))
+                )
+            }
+            new_rows, changed_rows = [], []
+            for file, derived in chunk:
+                row = stored.get(file['id'])
+                if row is None:
+                    new_rows.append({**_new_asset_row(file, self.folder_id), **derived})
+                    continue
+                fields = _asset_fields(file, self.folder_id)
+                if derived and row.project_name in (None, "Unassigned"):
+                    fields.update(derived)
+                if any(getattr(row, c) != v for c, v in fields.items()):
+                    changed_rows.append({"id": row.id, **fields})
+
+            if new_rows:
+                _insert_assets(new_rows)
+            if changed_rows:
+                db.session.execute(update(MediaAsset), changed_rows)
+            self.stats["added"] += len(new_rows)
+            self.stats["updated"] += len(changed_rows)
+            if len(valid) > UPSERT_CHUNK_SIZE:
+                self._checkpoint()
+
+    def _remove(self, drive_ids):
+        """Deletes the given files, if they belong to this root."""
+        for chunk in _chunks(drive_ids):
+            self.stats["removed"] += db.session.execute(
+                delete(assets).where(assets.c.drive_file_id.in_(chunk), assets.c.drive_root_id == self.folder_id)
+            ).rowcount
+
+
+def sync_drive_folder(service, folder_id, full=False, on_progress=None, service_factory=None):
+    """
+    Runs one sync of folder_id; rolls back and re-raises on failure.
+    service_factory() builds a service per crawler thread (defaults to
+    sharing `service`, which is only safe for thread-safe fakes).
+    """
+    try:
+        return DriveSyncEngine(service, folder_id, on_progress, service_factory).sync(full=full)
+    except Exception:
+        db.session.rollback()
+        raise
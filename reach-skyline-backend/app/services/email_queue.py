@@ -0,0 +1,267 @@
+# app/services/email_queue.py
+"""
+Persistent outbound email queue.
+
+Request handlers call enqueue_email(), which only writes a row to the
+email_outbox table. Background EmailWorker threads claim due rows, deliver
+them over one long-lived authenticated SMTP connection per worker, and retry
+failures with exponential backoff.
+"""
+import random
+import smtplib
+import threading
+import time
+from datetime import datetime, timedelta
+from email.mime.text import MIMEText
+from email.mime.multipart import MIMEMultipart
+from app.extensions import db
+from app.models.email_outbox import EmailOutbox
+
+# Failures that retrying will not fix
+PERMANENT_ERRORS = (smtplib.SMTPRecipientsRefused, smtplib.SMTPSenderRefused)
+
+_workers = []
+_wakeup = threading.Event()
+
+
+def enqueue_email(recipient, subject, html_body, sender, reply_to=None, category=None, commit=True):
+    """
+    Stores a message in the outbox and wakes the workers.
+    Returns the EmailOutbox row; delivery happens in the background.
+
+    With commit=True the session is committed, so callers commit their own
+    changes first; if the commit fails the session is rolled back and the
+    error re-raised. With commit=False the row joins the caller's transaction.
+    """
+    max_subject = EmailOutbox.subject.type.length
+    if len(subject) > max_subject:
+        subject = subject[:max_subject - 1] + "…"
+    entry = EmailOutbox(
+        recipient=recipient,
+        sender=sender,
+        reply_to=reply_to,
+        subject=subject,
+        html_body=html_body,
+        category=category,
+        status="Queued",
+        attempts=0,
+        next_attempt_at=datetime.utcnow()
+    )
+    db.session.add(entry)
+    if commit:
+        try:
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+    _wakeup.set()
+    return entry
+
+
+def build_message(entry):
+    msg = MIMEMultipart("alternative")
+    msg["Subject"] = entry.subject
+    msg["From"] = entry.sender
+    msg["To"] = entry.recipient
+    if entry.reply_to:
+        msg["Reply-To"] = entry.reply_to
+    msg.attach(MIMEText(entry.html_body, "html"))
+    return msg
+
+
+class SMTPConnection:
+    """
+    A reusable SMTP session. Connects, upgrades with STARTTLS and logs in
+    once, then sends many messages. An idle session is probed with NOOP
+    before reuse and transparently re-established if the server dropped it.
+    """
+
+    def __init__(self, host, port, user=None, password=None, use_tls=True, timeout=10, idle_timeout=60):
+        self.host = host
+        self.port = port
+        self.user = user
+        self.password = password
+        self.use_tls = use_tls
+        self.timeout = timeout
+        self.idle_timeout = idle_timeout
+        self._server = None
+        self._last_used = 0.0
+
+    def _connect(self):
+        server = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+        if self.use_tls:
+            server.starttls()
+        if self.user and self.password:
+            server.login(self.user, self.password)
+        self._server = server
+
+    def _ensure_connected(self):
+        if self._server is not None and time.monotonic() - self._last_used > self.idle_timeout:
+            try:
+                if self._server.noop()[0] != 250:
+                    self.close()
+            except (smtplib.SMTPException, OSError):
+                self._server = None
+        if self._server is None:
+            self._connect()
+
+    def send(self, msg):
+        self._ensure_connected()
+        try:
+            self._server.send_message(msg)
+        except smtplib.SMTPServerDisconnected:
+            # Server closed the session between messages; retry once on a fresh one
+            self._server = None
+            self._connect()
+            self._server.send_message(msg)
+        self._last_used = time.monotonic()
+
+    def close(self):
+        if self._server is not None:
+            try:
+                self._server.quit()
+            except (smtplib.SMTPException, OSError):
+                pass
+            self._server = None
+
+
+class EmailWorker(threading.Thread):
+    """Delivers due outbox rows using a single pooled SMTP connection."""
+
+    def __init__(self, app, connection_factory, batch_size=20, poll_interval=5,
+                 max_attempts=5, backoff_base=30, backoff_max=3600):
+        super().__init__(daemon=True, name="email-worker")
+        self.app = app
+        self.connection = connection_factory()
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self.max_attempts = max_attempts
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self._stop_event = threading.Event()
+
+    def backoff(self, attempts):
+        """Exponential backoff with full jitter, in seconds."""
+        delay = min(self.backoff_base * (2 ** (attempts - 1)), self.backoff_max)
+        return random.uniform(delay / 2, delay)
+
+    def _claim(self, entry_id):
+        # Conditional UPDATE so several workers (or processes) never send the same row
+        # next_attempt_at doubles as the claim time while a row is 'Sending'
+        claimed = EmailOutbox.query.filter_by(id=entry_id, status="Queued").update(
+            {"status": "Sending", "next_attempt_at": datetime.utcnow()}, synchronize_session=False
+        )
+        db.session.commit()
+        return claimed == 1
+
+    def process_once(self):
+        """Sends one batch of due messages. Returns how many were attempted."""
+        now = datetime.utcnow()
+        due_ids = [row[0] for row in db.session.query(EmailOutbox.id).filter(
+            EmailOutbox.status == "Queued",
+            EmailOutbox.next_attempt_at <= now
+        ).order_by(EmailOutbox.next_attempt_at, EmailOutbox.id).limit(self.batch_size).all()]
+
+        attempted = 0
+        for entry_id in due_ids:
+            if not self._claim(entry_id):
+                continue
+            entry = EmailOutbox.query.get(entry_id)
+            attempted += 1
+            entry.attempts = (entry.attempts or 0) + 1
+            try:
+                self.connection.send(build_message(entry))
+                entry.status = "Sent"
+                entry.sent_at = datetime.utcnow()
+                entry.last_error = None
+                print(f"[DEBUG] Outbox email {entry.id} sent to {entry.recipient}")
+            except Exception as e:
+                entry.last_error = str(e)
+                if isinstance(e, PERMANENT_ERRORS) or entry.attempts >= self.max_attempts:
+                    entry.status = "Failed"
+                    print(f"[ERROR] Outbox email {entry.id} failed permanently: {e}")
+                else:
+                    entry.status = "Queued"
+                    entry.next_attempt_at = datetime.utcnow() + timedelta(seconds=self.backoff(entry.attempts))
+                    print(f"[WARNING] Outbox email {entry.id} attempt {entry.attempts} failed, retrying: {e}")
+                if not isinstance(e, PERMANENT_ERRORS):
+                    # The session may be unusable after a transport error
+                    self.connection.close()
+            db.session.commit()
+        return attempted
+
+    def run(self):
+        while not self._stop_event.is_set():
+            attempted = 0
+            with self.app.app_context():
+                try:
+                    attempted = self.process_once()
+                except Exception as e:
+                    db.session.rollback()
+                    print(f"[ERROR] Email worker error: {e}")
+                finally:
+                    db.session.remove()
+            if attempted == 0:
+                _wakeup.wait(self.poll_interval)
+                _wakeup.clear()
+        self.connection.close()
+
+    def stop(self):
+        self._stop_event.set()
+        _wakeup.set()
+
+
+def requeue_stale(stale_after=600):
+    """Returns rows stuck in 'Sending' (e.g. after a crash) to the queue."""
+    cutoff = datetime.utcnow() - timedelta(seconds=stale_after)
+    count = EmailOutbox.query.filter(
+        EmailOutbox.status == "Sending",
+        EmailOutbox.next_attempt_at <= cutoff
+    ).update({"status": "Queued"}, synchronize_session=False)
+    db.session.commit()
+    return count
+
+
+def start_email_workers(app):
+    """Starts the configured number of background email workers (idempotent)."""
+    if _workers or not app.config.get("EMAIL_QUEUE_ENABLED", True):
+        return _workers
+
+    from app.services.email_service import SMTP_SERVER, SMTP_PORT, SMTP_USER, SMTP_PASS
+
+    def connection_factory():
+        return SMTPConnection(
+            SMTP_SERVER, SMTP_PORT, SMTP_USER, SMTP_PASS,
+            use_tls=app.config.get("SMTP_USE_TLS", True),
+            idle_timeout=app.config.get("SMTP_IDLE_TIMEOUT", 60)
+        )
+
+    with app.app_context():
+        try:
+            requeue_stale()
+        except Exception as e:
+            db.session.rollback()
+            print(f"⚠ Email outbox warning: {str(e)}")
+
+    for _ in range(app.config.get("EMAIL_QUEUE_WORKERS", 1)):
+        worker = EmailWorker(
+            app, connection_factory,
+            max_attempts=app.config.get("EMAIL_MAX_ATTEMPTS", 5),
+            backoff_base=app.config.get("EMAIL_RETRY_BACKOFF", 30)
+        )
+        worker.start()
+        _workers.append(worker)
+    return _workers
+
+
+def stop_email_workers(timeout=5):
+    for worker in _workers:
+        worker.stop()
+    for worker in _workers:
+        worker.join(timeout)
+    _workers.clear()
+
+
+def get_outbox_stats():
+    rows = db.session.query(EmailOutbox.status, db.func.count(EmailOutbox.id)).group_by(EmailOutbox.status).all()
+    return {status: count for status, count in rows}
@@ -0,0 +1,35 @@
+# app/services/email_templates.py
+"""
+Email HTML templates.
+
+Templates live in app/templates/email and are compiled once, when this
+module is imported, into a dedicated Jinja2 environment with HTML
+autoescaping on, so employee names, remarks and other user input are
+escaped. Task tables are rendered by a {% for %} loop, which Jinja
+compiles into a generator whose output is joined once.
+"""
+import os
+from jinja2 import Environment, FileSystemLoader, StrictUndefined, select_autoescape
+
+TEMPLATE_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "templates", "email")
+
+_env = Environment(
+    loader=FileSystemLoader(TEMPLATE_DIR),
+    autoescape=select_autoescape(["html"]),
+    undefined=StrictUndefined,
+    trim_blocks=True,
+    lstrip_blocks=True,
+    auto_reload=False
+)
+
+# Compile every template up front so a request never pays the parse cost
+TEMPLATES = {
+    os.path.splitext(name)[0]: _env.get_template(name)
+    for name in sorted(os.listdir(TEMPLATE_DIR))
+    if name.endswith(".html")
+}
+
+
+def render_email(name, **context):
+    """Renders a precompiled email template, e.g. render_email("task_assignment", ...)."""
+    return TEMPLATES[name].render(**context)
@@ -0,0 +1,124 @@
+# app/services/media_sync_jobs.py
+"""
+Background Google Drive syncs for the Media Hub.
+
+POST /api/media/sync records a media_sync_jobs row, takes the folder's lock
+in drive_sync_state and hands the sync to a Socket.IO background task, so
+the request returns immediately. The task runs the drive_sync engine and,
+after every page it writes, stores the counters on the job row and emits
+'media_sync_progress' to the requesting user. A completed sync then
+prefetches thumbnails into the thumbnail cache. A second sync of the same
+folder is refused while the lock is held; a lock whose job has reported
+nothing for MEDIA_SYNC_LOCK_TIMEOUT seconds (e.g. its worker died) is
+taken over.
+"""
+from datetime import datetime, timedelta
+from flask import current_app
+from sqlalchemy import or_, update
+from sqlalchemy.exc import IntegrityError
+from app.extensions import db, socketio
+from app.models.drive_sync_state import DriveSyncState
+from app.models.media_sync_job import MediaSyncJob
+from app.services.drive_sync import sync_drive_folder
+from app.services.thumbnail_cache import thumbnail_cache
+
+
+def _acquire_lock(folder_id, job_id, timeout):
+    """Marks folder_id as being synced by job_id; False if another live job holds it."""
+    try:
+        with db.session.begin_nested():
+            db.session.add(DriveSyncState(folder_id=folder_id))
+    except IntegrityError:
+        pass  # row already exists
+
+    now = datetime.utcnow()
+    return db.session.execute(update(DriveSyncState).where(
+        DriveSyncState.folder_id == folder_id,
+        or_(DriveSyncState.lock_job_id.is_(None), DriveSyncState.locked_at < now - timedelta(seconds=timeout))
+    ).values(lock_job_id=job_id, locked_at=now)).rowcount == 1
+
+
+def _refresh_lock(folder_id, job_id):
+    db.session.execute(update(DriveSyncState).where(
+        DriveSyncState.folder_id == folder_id, DriveSyncState.lock_job_id == job_id
+    ).values(locked_at=datetime.utcnow()))
+
+
+def _release_lock(folder_id, job_id):
+    db.session.execute(update(DriveSyncState).where(
+        DriveSyncState.folder_id == folder_id, DriveSyncState.lock_job_id == job_id
+    ).values(lock_job_id=None, locked_at=None))
+
+
+def _emit(job):
+    from app.services.presence import presence
+    if job.requested_by and presence.is_online(job.requested_by):
+        socketio.emit("media_sync_progress", job.to_dict(), room=f"user_{job.requested_by}")
+
+
+def start_sync_job(service_factory, folder_id, requested_by=None, full=False):
+    """
+    Queues a sync of folder_id. Returns (job, None) when started, or
+    (None, running_job_id) when the folder is already being synced.
+    service_factory() builds a Drive service for the calling thread; the
+    job calls it on its own thread and on every crawler thread.
+    """
+    timeout = current_app.config.get("MEDIA_SYNC_LOCK_TIMEOUT", 600)
+    job = MediaSyncJob(folder_id=folder_id, status="Queued", full=full, requested_by=requested_by, errors=[])
+    db.session.add(job)
+    db.session.flush()
+
+    if not _acquire_lock(folder_id, job.id, timeout):
+        db.session.rollback()
+        running = db.session.query(DriveSyncState.lock_job_id).filter_by(folder_id=folder_id).scalar()
+        return None, running
+    db.session.commit()
+
+    socketio.start_background_task(run_sync_job, current_app._get_current_object(), job.id, service_factory)
+    return job, None
+
+
+def run_sync_job(app, job_id, service_factory):
+    """Background task body: runs the sync and keeps the job row up to date."""
+    with app.app_context():
+        job = MediaSyncJob.query.get(job_id)
+        job.status = "Running"
+        job.started_at = datetime.utcnow()
+        db.session.commit()
+        _emit(job)
+
+        def on_progress(stats):
+            job.pages_fetched = stats["pages_fetched"]
+            job.files_received = stats["total_received"]
+            job.added = stats["added"]
+            job.updated = stats["updated"]
+            job.removed = stats["removed"]
+            job.error_count = stats["error_count"]
+            job.errors = list(stats["errors"])
+            _refresh_lock(job.folder_id, job.id)
+            _emit(job)
+
+        try:
+            # Built here: the requesting thread's service must not be shared
+            service = service_factory()
+            if service is None:
+                raise RuntimeError("Google Drive is not authorized")
+            result = sync_drive_folder(service, job.folder_id, full=job.full,
+                                       on_progress=on_progress, service_factory=service_factory)
+            job.mode = result["mode"]
+            job.status = "Completed"
+            print(f"[DEBUG] Media sync job {job_id} completed: {result}")
+            thumbnail_cache.start_prefetch(app)
+        except Exception as e:
+            db.session.rollback()
+            job = MediaSyncJob.query.get(job_id)
+            job.status = "Failed"
+            job.error_count = (job.error_count or 0) + 1
+            job.errors = (job.errors or []) + [f"Sync failed: {str(e)}"]
+            print(f"[ERROR] Media sync job {job_id} failed: {e}")
+        finally:
+            job.finished_at = datetime.utcnow()
+            _release_lock(job.folder_id, job.id)
+            db.session.commit()
+            _emit(job)
+            db.session.remove()
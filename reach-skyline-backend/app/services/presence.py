@@ -0,0 +1,127 @@
+# app/services/presence.py
+"""
+Which users currently have a live Socket.IO connection.
+
+Each connection is registered under its user id on 'connect', refreshed by
+the client's 'presence_heartbeat' and removed on 'disconnect'. Entries
+expire PRESENCE_TTL seconds after the last heartbeat, so connections lost
+with a crashed worker stop counting on their own. A user is online while
+any of their connections is live.
+
+PRESENCE_URL selects where the registry lives:
+- unset                  this process's memory (single worker)
+- redis://, rediss://    Redis, shared by every worker
+"""
+import threading
+import time
+
+
+class MemoryPresence:
+
+    def __init__(self, ttl):
+        self.ttl = ttl
+        self._sessions = {}   # user_id -> {sid: expires_at}
+        self._lock = threading.Lock()
+
+    def touch(self, user_id, sid):
+        with self._lock:
+            self._sessions.setdefault(user_id, {})[sid] = time.time() + self.ttl
+
+    def remove(self, user_id, sid):
+        with self._lock:
+            sessions = self._sessions.get(user_id)
+            if sessions is not None:
+                sessions.pop(sid, None)
+                if not sessions:
+                    del self._sessions[user_id]
+
+    def is_online(self, user_id):
+        now = time.time()
+        with self._lock:
+            sessions = self._sessions.get(user_id)
+            return bool(sessions) and any(expires > now for expires in sessions.values())
+
+
+class RedisPresence:
+    """One sorted set per user: member = socket sid, score = expiry time."""
+
+    def __init__(self, url, ttl, prefix="presence"):
+        import redis
+        self.ttl = ttl
+        self.prefix = prefix
+        self._redis = redis.Redis.from_url(url)
+
+    def _key(self, user_id):
+        return f"{self.prefix}:{user_id}"
+
+    def touch(self, user_id, sid):
+        key = self._key(user_id)
+        pipe = self._redis.pipeline()
+        pipe.zadd(key, {sid: time.time() + self.ttl})
+        pipe.expire(key, self.ttl)
+        pipe.execute()
+
+    def remove(self, user_id, sid):
+        self._redis.zrem(self._key(user_id), sid)
+
+    def is_online(self, user_id):
+        key = self._key(user_id)
+        now = time.time()
+        pipe = self._redis.pipeline()
+        pipe.zremrangebyscore(key, "-inf", now)
+        pipe.zcard(key)
+        return pipe.execute()[1] > 0
+
+
+class PresenceRegistry:
+
+    def __init__(self, app=None):
+        self.ttl = 90
+        self.authoritative = True
+        self._backend = MemoryPresence(self.ttl)
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.ttl = app.config.get("PRESENCE_TTL", 90)
+        url = app.config.get("PRESENCE_URL")
+        if url:
+            self._backend = RedisPresence(url, self.ttl)
+        else:
+            self._backend = MemoryPresence(self.ttl)
+
+        # With several workers a per-process registry only sees its own
+        # connections; treat everyone as online rather than drop notifications
+        self.authoritative = bool(url) or not app.config.get("SOCKETIO_MESSAGE_QUEUE")
+        if not self.authoritative:
+            print("⚠ Presence warning: SOCKETIO_MESSAGE_QUEUE is set but PRESENCE_URL is not; "
+                  "offline detection is disabled")
+
+    def connect(self, user_id, sid):
+        self._call("touch", user_id, sid)
+
+    def heartbeat(self, user_id, sid):
+        self._call("touch", user_id, sid)
+
+    def disconnect(self, user_id, sid):
+        self._call("remove", user_id, sid)
+
+    def is_online(self, user_id):
+        """False only when the user certainly has no live connection."""
+        if not self.authoritative:
+            return True
+        try:
+            return self._backend.is_online(user_id)
+        except Exception as e:
+            # Registry unreachable: fall back to emitting as before
+            print(f"[ERROR] Presence lookup failed: {e}")
+            return True
+
+    def _call(self, method, user_id, sid):
+        try:
+            getattr(self._backend, method)(user_id, sid)
+        except Exception as e:
+            print(f"[ERROR] Presence {method} failed: {e}")
+
+
+presence = PresenceRegistry()
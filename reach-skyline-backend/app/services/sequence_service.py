@@ -0,0 +1,215 @@
+# app/services/sequence_service.py
+"""
+Central allocator for application-generated IDs (activity codes, client
+IDs, employee IDs and write-behind chat message IDs).
+
+Each sequence is a row in sequence_counters. A reservation is one
+`UPDATE ... SET value = value + n` followed by a SELECT in the same short
+transaction on its own connection, so concurrent processes never hand out
+the same number on SQLite, MySQL or Postgres. Each process may reserve a
+block at a time and serve later calls from memory.
+
+RedisSequence keeps a sequence in Redis instead, for IDs that must follow
+allocation order across processes without a database round trip each.
+"""
+import threading
+from flask import current_app, has_app_context
+from sqlalchemy import select, update, insert
+from sqlalchemy.exc import IntegrityError
+from app.extensions import db
+from app.models.sequence_counter import SequenceCounter
+
+TEAM_PREFIXES = {'Branding': 'B', 'Website': 'W', 'SEO': 'S', 'Telecaller': 'T', 'Campaign': 'C'}
+
+counters = SequenceCounter.__table__
+
+
+def _max_numeric_suffix(column, prefix):
+    """Largest N among values shaped like <prefix><digits>, or 0."""
+    largest = 0
+    for (value,) in db.session.query(column).filter(column.like(f"{prefix}%")):
+        suffix = value[len(prefix):]
+        if suffix.isdigit():
+            largest = max(largest, int(suffix))
+    return largest
+
+
+class SequenceAllocator:
+
+    def __init__(self):
+        self._blocks = {}   # name -> [next value, last reserved value]
+        self._lock = threading.Lock()
+
+    def _block_size(self, block_size):
+        if block_size is not None:
+            return block_size
+        if has_app_context():
+            return current_app.config.get("SEQUENCE_BLOCK_SIZE", 1)
+        return 1
+
+    def _reserve(self, name, count, seed):
+        """Atomically advances the counter by count; returns the last reserved value."""
+        with db.engine.begin() as conn:
+            if conn.execute(update(counters).where(counters.c.name == name)
+                            .values(value=counters.c.value + count)).rowcount == 0:
+                # First use: start after the highest ID the old scheme produced
+                start = seed() if seed else 0
+                try:
+                    with conn.begin_nested():
+                        conn.execute(insert(counters).values(name=name, value=start + count))
+                except IntegrityError:
+                    # Another process seeded it first
+                    conn.execute(update(counters).where(counters.c.name == name)
+                                 .values(value=counters.c.value + count))
+            return conn.execute(select(counters.c.value).where(counters.c.name == name)).scalar_one()
+
+    def allocate(self, name, count=1, seed=None, block_size=None):
+        """
+        Returns `count` unique, increasing integers for sequence `name`.
+        seed() supplies the starting value the first time a sequence is used.
+        """
+        if count <= 0:
+            return []
+        with self._lock:
+            values = []
+            block = self._blocks.get(name)
+            if block:
+                take = min(count, block[1] - block[0] + 1)
+                values.extend(range(block[0], block[0] + take))
+                block[0] += take
+                if block[0] > block[1]:
+                    del self._blocks[name]
+            remaining = count - len(values)
+            if remaining:
+                reserve = max(remaining, self._block_size(block_size))
+                last = self._reserve(name, reserve, seed)
+                first = last - reserve + 1
+                values.extend(range(first, first + remaining))
+                if reserve > remaining:
+                    self._blocks[name] = [first + remaining, last]
+            return values
+
+    def peek(self, name, seed=None):
+        """The value the next allocate() in this process would return (not reserved)."""
+        with self._lock:
+            block = self._blocks.get(name)
+            if block:
+                return block[0]
+        current = db.session.query(SequenceCounter.value).filter_by(name=name).scalar()
+        if current is None:
+            current = seed() if seed else 0
+        return current + 1
+
+    def advance_to(self, name, value):
+        """
+        Makes sure `name` never hands out values <= value (e.g. after rows
+        were inserted with database-generated IDs). Drops this process's block.
+        """
+        with self._lock:
+            self._blocks.pop(name, None)
+            with db.engine.begin() as conn:
+                if conn.execute(update(counters).where(counters.c.name == name, counters.c.value < value)
+                                .values(value=value)).rowcount == 0:
+                    try:
+                        with conn.begin_nested():
+                            conn.execute(insert(counters).values(name=name, value=value))
+                    except IntegrityError:
+                        pass  # already at or past value
+
+    def reset(self):
+        """Forgets blocks reserved by this process."""
+        with self._lock:
+            self._blocks.clear()
+
+
+allocator = SequenceAllocator()
+
+
+class RedisSequence:
+    """
+    One sequence as a Redis integer: each allocate() is a single INCRBY,
+    so values are unique and increasing across every process using it.
+    """
+
+    # Only advances an existing key, so a flushed Redis is reseeded rather than restarting at 1
+    _INCR = "if redis.call('EXISTS', KEYS[1]) == 1 then return redis.call('INCRBY', KEYS[1], ARGV[1]) end"
+    _RAISE = ("local v = tonumber(redis.call('GET', KEYS[1]) or '0') "
+              "if v < tonumber(ARGV[1]) then redis.call('SET', KEYS[1], ARGV[1]) end")
+
+    def __init__(self, url, name, seed=None, prefix="sequence"):
+        import redis
+        self.key = f"{prefix}:{name}"
+        self.seed = seed
+        self._redis = redis.Redis.from_url(url)
+        self._incr = self._redis.register_script(self._INCR)
+        self._raise = self._redis.register_script(self._RAISE)
+
+    def allocate(self, count=1):
+        """Returns `count` unique, increasing integers."""
+        if count <= 0:
+            return []
+        last = self._incr(keys=[self.key], args=[count])
+        if last is None:
+            # First use: start after the highest ID already stored
+            self.advance_to(self.seed() if self.seed else 0)
+            last = self._incr(keys=[self.key], args=[count])
+        return list(range(last - count + 1, last + 1))
+
+    def advance_to(self, value):
+        """Makes sure the sequence never hands out values <= value."""
+        self._raise(keys=[self.key], args=[value])
+
+
+# ----------------------------------------------------
+# SEQUENCES
+# ----------------------------------------------------
+def _activity_code_seed():
+    from app.models.task import Task
+    last_id = db.session.query(db.func.coalesce(db.func.max(Task.id), 0)).scalar()
+    return max(last_id, _max_numeric_suffix(Task.activity_code, "ACT-"))
+
+
+def next_activity_codes(count):
+    """Generated task codes: ACT-0001, ACT-0002, ..."""
+    return [f"ACT-{n:04}" for n in allocator.allocate("activity_code", count, _activity_code_seed)]
+
+
+def _client_id_seed():
+    from app.models.client import Client
+    last_id = db.session.query(db.func.coalesce(db.func.max(Client.id), 0)).scalar()
+    return max(last_id, _max_numeric_suffix(Client.client_id, "C"))
+
+
+def next_client_id():
+    """Client IDs: C001, C002, ... (never pre-reserved, so numbering stays dense)."""
+    return f"C{allocator.allocate('client_id', 1, _client_id_seed, block_size=1)[0]:03}"
+
+
+def _employee_id_seed(prefix):
+    from app.models.employee import Employee
+    return lambda: _max_numeric_suffix(Employee.id, prefix)
+
+
+def next_employee_id(prefix):
+    """Employee IDs per team prefix: B001, W001, ..."""
+    value = allocator.allocate(f"employee:{prefix}", 1, _employee_id_seed(prefix), block_size=1)[0]
+    return f"{prefix}{value:03d}"
+
+
+def peek_employee_id(prefix):
+    return f"{prefix}{allocator.peek(f'employee:{prefix}', _employee_id_seed(prefix)):03d}"
+
+
+def _chat_message_seed():
+    from app.models.chat import ChatMessage
+    return db.session.query(db.func.coalesce(db.func.max(ChatMessage.id), 0)).scalar()
+
+
+def next_chat_message_ids(count, block_size=None):
+    """Primary keys for chat_messages rows written by the write-behind buffer."""
+    return allocator.allocate("chat_message", count, _chat_message_seed, block_size=block_size)
+
+
+def chat_message_sequence(url):
+    """Chat message IDs shared through Redis by several workers."""
+    return RedisSequence(url, "chat_message", _chat_message_seed)
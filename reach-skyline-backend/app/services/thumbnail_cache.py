@@ -0,0 +1,343 @@
+# app/services/thumbnail_cache.py
+"""
+On-disk cache and proxy source for Media Hub thumbnails.
+
+Drive's thumbnailLink expires after a few hours, so the media grid loads
+thumbnails from GET /api/media/assets/<id>/thumb instead. Each thumbnail
+is stored once per (drive_file_id, Drive modifiedTime): a new Drive
+version gets a new key, so cached files never need invalidating and are
+served with a strong ETag and a one-year immutable Cache-Control.
+The directory is capped at MEDIA_THUMB_CACHE_MAX_MB; the least recently
+served files are evicted first (hits touch the file's mtime, so the order
+survives restarts). Every worker process shares the directory: a key
+missing from this process's index is looked up on disk before
+downloading, and the index is rebuilt from the directory before evicting
+and at least every RESCAN_INTERVAL seconds, so the cap holds across
+processes.
+
+<img> tags cannot send the JWT, so to_dict() hands out thumb_url with an
+HMAC of the asset id, version and an expiry time (SECRET_KEY) in place of
+a token. The expiry is the end of the next MEDIA_THUMB_URL_TTL window, so
+a URL stays the same, and browser-cacheable, for a whole window. With the
+built-in default SECRET_KEY, URLs are only signed in development; elsewhere
+thumb_url is None and the client falls back to Drive's link.
+
+After each Drive sync, prefetch() downloads the newest missing thumbnails
+in the background; stale links are refreshed through one batched Drive
+metadata request per 100 files.
+"""
+import hashlib
+import hmac
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+import requests
+from google.auth.exceptions import RefreshError
+from google.auth.transport.requests import AuthorizedSession
+from googleapiclient.errors import HttpError
+from sqlalchemy import update
+from app.config import DEFAULT_SECRET_KEY
+from app.extensions import db, socketio
+from app.models.media_asset import MediaAsset
+from app.utils.google_drive import drive_client, get_drive_service, get_files
+
+DOWNLOAD_TIMEOUT = 15
+# Seconds between directory scans picking up other workers' writes
+RESCAN_INTERVAL = 60
+SIZE_SUFFIX = re.compile(r"=s\d+$")
+
+# Stored file extension per thumbnail Content-Type (send_file derives the type back from it)
+EXTENSIONS = {"image/jpeg": ".jpg", "image/png": ".png", "image/webp": ".webp", "image/gif": ".gif"}
+
+
+def _map_daemon(fn, items, workers):
+    """
+    [fn(item) for item in items] on `workers` daemon threads. Unlike a
+    ThreadPoolExecutor, a server shutdown does not wait for the rest.
+    """
+    results = [None] * len(items)
+    positions = iter(range(len(items)))
+    lock = threading.Lock()
+
+    def work():
+        while True:
+            with lock:
+                i = next(positions, None)
+            if i is None:
+                return
+            results[i] = fn(items[i])
+
+    threads = [threading.Thread(target=work, daemon=True, name="thumb-prefetch") for _ in range(workers)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return results
+
+
+def thumbnail_version(drive_modified_at):
+    """Cache version of an asset: its Drive modifiedTime ("0" until a sync has recorded one)."""
+    return drive_modified_at.strftime("%Y%m%d%H%M%S%f") if drive_modified_at else "0"
+
+
+class ThumbnailCache:
+
+    def __init__(self, app=None):
+        self.directory = None
+        self.max_bytes = 0
+        self.size = 400
+        self.secret = None            # None: nothing is signed (default SECRET_KEY outside development)
+        self.url_ttl = 86400
+        self._lock = threading.Lock()
+        self._index = OrderedDict()   # key -> (bytes, extension), least recently used first
+        self._total = 0
+        self._scanned_at = 0.0
+        self._scan_lock = threading.Lock()
+        self._fetching = {}
+        self._local = threading.local()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.directory = app.config.get("MEDIA_THUMB_CACHE_DIR")
+        self.max_bytes = app.config.get("MEDIA_THUMB_CACHE_MAX_MB", 512) * 1024 * 1024
+        self.size = app.config.get("MEDIA_THUMB_SIZE", 400)
+        self.url_ttl = app.config.get("MEDIA_THUMB_URL_TTL", 86400)
+        self.secret = app.config["SECRET_KEY"].encode()
+        if app.config["SECRET_KEY"] == DEFAULT_SECRET_KEY and not (app.debug or app.testing):
+            print("⚠ Thumbnail cache warning: SECRET_KEY is the built-in default; "
+                  "thumbnail URLs are not signed outside development")
+            self.secret = None
+        os.makedirs(self.directory, exist_ok=True)
+        self._load_index()
+
+    # --- signed URLs ---
+    def signature(self, asset_id, version, expires):
+        return hmac.new(self.secret, f"{asset_id}:{version}:{expires}".encode(), hashlib.sha256).hexdigest()[:32]
+
+    def expiry(self, now=None):
+        """Expiry of URLs handed out at `now`: the end of the next URL_TTL window."""
+        now = time.time() if now is None else now
+        return (int(now) // self.url_ttl + 2) * self.url_ttl
+
+    def verify(self, asset_id, version, expires, signature):
+        if self.secret is None:
+            return False
+        try:
+            expires = int(expires)
+        except (TypeError, ValueError):
+            return False
+        if expires < time.time():
+            return False
+        return hmac.compare_digest(self.signature(asset_id, version, expires), signature or "")
+
+    def url_for(self, asset):
+        if self.secret is None:
+            return None
+        version = thumbnail_version(asset.drive_modified_at)
+        expires = self.expiry()
+        return (f"/api/media/assets/{asset.id}/thumb?v={version}&e={expires}"
+                f"&sig={self.signature(asset.id, version, expires)}")
+
+    # --- cache ---
+    @staticmethod
+    def key(drive_file_id, version):
+        return hashlib.sha256(f"{drive_file_id}:{version}".encode()).hexdigest()
+
+    def etag(self, drive_file_id, version):
+        return self.key(drive_file_id, version)[:32]
+
+    def _path(self, key, ext):
+        return os.path.join(self.directory, key[:2], key + ext)
+
+    def _load_index(self):
+        """Rebuilds the index from the directory, least recently served first."""
+        entries = []
+        for dirpath, _, filenames in os.walk(self.directory):
+            for name in filenames:
+                key, ext = os.path.splitext(name)
+                if ext not in EXTENSIONS.values():
+                    continue   # e.g. a .tmp left by a crashed write
+                try:
+                    stat = os.stat(os.path.join(dirpath, name))
+                except FileNotFoundError:
+                    continue   # evicted by another worker meanwhile
+                entries.append((stat.st_mtime, key, stat.st_size, ext))
+        with self._lock:
+            self._index = OrderedDict((key, (size, ext)) for _, key, size, ext in sorted(entries))
+            self._total = sum(size for size, _ in self._index.values())
+            self._scanned_at = time.monotonic()
+
+    def _find(self, key):
+        """(size, extension) of a file another worker cached under key, or None."""
+        for ext in EXTENSIONS.values():
+            try:
+                return os.stat(self._path(key, ext)).st_size, ext
+            except FileNotFoundError:
+                continue
+        return None
+
+    def get(self, drive_file_id, version):
+        """Path of the cached thumbnail, or None."""
+        key = self.key(drive_file_id, version)
+        with self._lock:
+            entry = self._index.get(key)
+            if entry is not None:
+                self._index.move_to_end(key)
+        if entry is None:
+            entry = self._find(key)
+            if entry is None:
+                return None
+            with self._lock:
+                if key not in self._index:
+                    self._total += entry[0]
+                self._index[key] = entry
+        path = self._path(key, entry[1])
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            # Evicted by another worker process
+            with self._lock:
+                self._total -= self._index.pop(key, (0, None))[0]
+            return None
+        return path
+
+    def put(self, drive_file_id, version, data, ext):
+        key = self.key(drive_file_id, version)
+        path = self._path(key, ext)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
+
+        with self._lock:
+            self._total += len(data) - self._index.pop(key, (0, None))[0]
+            self._index[key] = (len(data), ext)
+            rescan = self._total > self.max_bytes or time.monotonic() - self._scanned_at > RESCAN_INTERVAL
+        # Other workers add, serve and evict files too: size the cap from the directory
+        if rescan and self._scan_lock.acquire(blocking=False):
+            try:
+                self._load_index()
+            finally:
+                self._scan_lock.release()
+
+        evicted = []
+        with self._lock:
+            while self._total > self.max_bytes and len(self._index) > 1:
+                old, (size, old_ext) = self._index.popitem(last=False)
+                self._total -= size
+                evicted.append(self._path(old, old_ext))
+        for old_path in evicted:
+            try:
+                os.remove(old_path)
+            except FileNotFoundError:
+                pass
+        return path
+
+    # --- Drive ---
+    def _session(self):
+        """Per-thread HTTP session (keeps connections open), authorized when Drive is."""
+        creds = drive_client.credentials()
+        session = getattr(self._local, "session", None)
+        if session is None or self._local.creds is not creds:
+            session = self._local.session = AuthorizedSession(creds) if creds else requests.Session()
+            self._local.creds = creds
+        return session
+
+    def _download(self, link):
+        """(image bytes, extension), or None if the link failed (e.g. expired)."""
+        if not link:
+            return None
+        try:
+            resp = self._session().get(SIZE_SUFFIX.sub(f"=s{self.size}", link), timeout=DOWNLOAD_TIMEOUT)
+        except requests.RequestException:
+            return None
+        ext = EXTENSIONS.get(resp.headers.get("Content-Type", "").split(";")[0].strip())
+        if resp.status_code != 200 or not ext:
+            return None
+        return resp.content, ext
+
+    @staticmethod
+    def fresh_links(drive_file_ids):
+        """{drive_file_id: thumbnailLink} straight from Drive (batched)."""
+        service, _ = get_drive_service()
+        if service is None or not drive_file_ids:
+            return {}
+        files = get_files(service, drive_file_ids, fields="id, thumbnailLink")
+        return {file_id: f.get('thumbnailLink') for file_id, f in files.items() if f.get('thumbnailLink')}
+
+    def fetch(self, drive_file_id, version, link):
+        """
+        Cached path for the thumbnail, downloading it on a miss (one
+        download per key even under concurrent requests). Returns
+        (path or None, fresh thumbnailLink if the stored one had expired).
+        """
+        path = self.get(drive_file_id, version)
+        if path:
+            return path, None
+
+        name = self.key(drive_file_id, version)
+        with self._lock:
+            lock = self._fetching.setdefault(name, threading.Lock())
+        try:
+            with lock:
+                path = self.get(drive_file_id, version)
+                if path:
+                    return path, None
+                fresh = None
+                image = self._download(link)
+                if image is None:
+                    fresh = self.fresh_links([drive_file_id]).get(drive_file_id)
+                    image = self._download(fresh)
+                if image is None:
+                    print(f"[ERROR] No thumbnail available for Drive file {drive_file_id}")
+                return (self.put(drive_file_id, version, *image) if image else None), fresh
+        finally:
+            with self._lock:
+                self._fetching.pop(name, None)
+
+    def prefetch(self, app, limit, workers=4):
+        """Background task: caches the `limit` newest assets' thumbnails that are missing."""
+        with app.app_context():
+            rows = db.session.query(
+                MediaAsset.id, MediaAsset.drive_file_id, MediaAsset.thumbnail_url, MediaAsset.drive_modified_at
+            ).order_by(MediaAsset.created_at.desc()).limit(limit).all()
+            missing = [
+                {"id": r.id, "drive_file_id": r.drive_file_id, "link": r.thumbnail_url,
+                 "version": thumbnail_version(r.drive_modified_at)}
+                for r in rows if not self.get(r.drive_file_id, thumbnail_version(r.drive_modified_at))
+            ]
+            if not missing:
+                return
+
+            def download(item):
+                image = self._download(item["link"])
+                if image:
+                    self.put(item["drive_file_id"], item["version"], *image)
+                return image is not None
+
+            stale = [item for item, ok in zip(missing, _map_daemon(download, missing, workers)) if not ok]
+            try:
+                links = self.fresh_links([item["drive_file_id"] for item in stale])
+            except (HttpError, RefreshError, RuntimeError, ConnectionError, TimeoutError) as e:
+                print(f"[ERROR] Could not refresh thumbnail links: {e}")
+                links = {}
+            retry = [{**item, "link": links[item["drive_file_id"]]} for item in stale if item["drive_file_id"] in links]
+            fetched = sum(_map_daemon(download, retry, workers))
+
+            if retry:
+                db.session.execute(update(MediaAsset), [{"id": i["id"], "thumbnail_url": i["link"]} for i in retry])
+                db.session.commit()
+            print(f"[DEBUG] Prefetched {len(missing) - len(stale) + fetched}/{len(missing)} thumbnails")
+            db.session.remove()
+
+    def start_prefetch(self, app):
+        limit = app.config.get("MEDIA_THUMB_PREFETCH_LIMIT", 1000)
+        if limit > 0:
+            socketio.start_background_task(self.prefetch, app, limit, app.config.get("MEDIA_THUMB_PREFETCH_WORKERS", 4))
+
+
+thumbnail_cache = ThumbnailCache()
@@ -1,8 +1,33 @@
 # app/utils/auth_decorators.py
 from functools import wraps
-from flask import jsonify
-from flask_jwt_extended import verify_jwt_in_request, get_jwt_identity
+from flask import jsonify, g
+from flask_jwt_extended import verify_jwt_in_request, get_jwt_identity, get_jwt
 from app.models.employee import Employee
+from app.utils.identity_cache import get_identity
+
+
+def get_current_identity():
+    """
+    Identity of the authenticated caller as a dict (id, role, team, name, status).
+
+    Role and team come from the JWT additional claims issued at login. The
+    status is read through the identity cache so a deactivated account is
+    locked out within the cache TTL; tokens issued without claims fall back
+    to the cached identity entirely. Returns None if the employee no longer exists.
+    """
+    current_user_id = get_jwt_identity()
+    cached = get_identity(current_user_id)
+    if not cached:
+        return None
+
+    claims = get_jwt()
+    return {
+        "id": current_user_id,
+        "role": claims.get("role") or cached["role"],
+        "team": claims.get("team") or cached["team"],
+        "name": claims.get("name") or cached["name"],
+        "status": cached["status"]
+    }
 
 def jwt_required_custom(fn):
     """
@@ -32,18 +57,20 @@ def role_required(*allowed_roles):
         def wrapper(*args, **kwargs):
             try:
                 verify_jwt_in_request()
-                current_user_id = get_jwt_identity()
-                user = Employee.query.get(current_user_id)
+                user = get_current_identity()
                 
                 if not user:
                     return jsonify({"message": "User not found"}), 404
+
+                if user["status"] != "Active":
+                    return jsonify({"message": "Your account is inactive. Please contact your manager."}), 403
                 
                 # Check if role is allowed
-                if user.role not in allowed_roles:
+                if user["role"] not in allowed_roles:
                     return jsonify({
                         "message": "Access forbidden",
                         "required_roles": list(allowed_roles),
-                        "your_role": user.role
+                        "your_role": user["role"]
                     }), 403
                 
                 return fn(*args, **kwargs)
@@ -64,33 +91,35 @@ def team_access_required(fn):
     def wrapper(*args, **kwargs):
         try:
             verify_jwt_in_request()
-            current_user_id = get_jwt_identity()
-            user = Employee.query.get(current_user_id)
+            user = get_current_identity()
             
             if not user:
                 return jsonify({"message": "User not found"}), 404
+
+            if user["status"] != "Active":
+                return jsonify({"message": "Your account is inactive. Please contact your manager."}), 403
             
             # Admin has full access
-            if user.role == 'Admin':
+            if user["role"] == 'Admin':
                 # Admins can see any team, pass the request's intended team if needed, 
                 # or the route handles it. 
                 return fn(*args, **kwargs)
             
             # Manager is explicitly FORBIDDEN from individual team pages
-            if user.role == 'Manager':
+            if user["role"] == 'Manager':
                 return jsonify({
                     "message": "Access forbidden",
                     "detail": "Managers cannot access individual team pages"
                 }), 403
             
             # Team Lead can only access their own team
-            if user.role == 'Team Lead':
+            if user["role"] == 'Team Lead':
                 # The route usually expects data for a specific team.
                 # We simply verify if the route is being accessed for the user's team.
                 # NOTE: This assumes the route either takes 'team_name' as arg OR 
                 # defines the team internally. 
                 # For safety, we inject the user's team into kwargs so the route can filter by it.
-                kwargs['authorized_team'] = user.team
+                kwargs['authorized_team'] = user["team"]
                 return fn(*args, **kwargs)
             
             # Employees cannot access team pages
@@ -106,11 +135,15 @@ def team_access_required(fn):
 
 def get_current_user():
     """
-    Helper function to get the current authenticated user
+    Helper function to get the current authenticated user.
+    The Employee row is loaded at most once per request.
     """
     try:
         verify_jwt_in_request()
         current_user_id = get_jwt_identity()
-        return Employee.query.get(current_user_id)
+        if g.get("_current_user_id") != current_user_id:
+            g._current_user = Employee.query.get(current_user_id)
+            g._current_user_id = current_user_id
+        return g._current_user
     except:
         return None
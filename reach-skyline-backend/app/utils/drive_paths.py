@@ -0,0 +1,66 @@
+# app/utils/drive_paths.py
+"""
+Derives Media Hub fields from where a file sits in the Drive folder tree.
+
+A path is the chain of folder names below the synced root folder, joined
+with "/" (e.g. "Acme Dental/Day 2 - 2026-03-14/Camera A"). Rules are
+regular expressions tried in order against that path; the first that
+matches supplies any of these named groups:
+- project  -> project_name
+- day      -> shoot_day (integer)
+- date     -> shoot_date (see DATE_FORMATS)
+Rules come from DRIVE_PATH_RULES (a JSON list of patterns) and default to
+DEFAULT_PATH_RULES, which expect the Client/Day N/... layout.
+"""
+import re
+from datetime import datetime
+
+DEFAULT_PATH_RULES = [
+    # Client/Day 3/...  or  Client/Day 3 - 2026-03-14/...
+    r"^(?P<project>[^/]+)/Day[\s_-]*(?P<day>\d+)(?:[\s_-]+(?P<date>[\d./-]+))?(?:/|$)",
+    # Client/2026-03-14/...
+    r"^(?P<project>[^/]+)/(?P<date>\d{4}-\d{2}-\d{2})(?:/|$)",
+    # Client/...
+    r"^(?P<project>[^/]+)",
+]
+
+DATE_FORMATS = ("%Y-%m-%d", "%d-%m-%Y", "%d.%m.%Y", "%d/%m/%Y", "%Y%m%d")
+
+
+def _parse_date(value):
+    for fmt in DATE_FORMATS:
+        try:
+            return datetime.strptime(value, fmt).date()
+        except ValueError:
+            continue
+    return None
+
+
+class PathRules:
+
+    def __init__(self, patterns=None):
+        self.patterns = [re.compile(p, re.IGNORECASE) for p in (patterns or DEFAULT_PATH_RULES)]
+
+    def derive(self, path):
+        """{project_name, shoot_day, shoot_date} found in path (only the keys a rule matched)."""
+        for pattern in self.patterns:
+            match = pattern.search(path or "")
+            if not match:
+                continue
+            groups = match.groupdict()
+            derived = {}
+            if groups.get("project"):
+                derived["project_name"] = groups["project"].strip()[:100]
+            if groups.get("day"):
+                derived["shoot_day"] = int(groups["day"])
+            if groups.get("date"):
+                shoot_date = _parse_date(groups["date"])
+                if shoot_date:
+                    derived["shoot_date"] = shoot_date
+            return derived
+        return {}
+
+
+def join_path(parent_path, name):
+    name = (name or "").replace("/", "-")   # Drive allows "/" in names
+    return f"{parent_path}/{name}" if parent_path else name
@@ -1,51 +1,430 @@
 import os
+import random
+import socket
+import threading
+import time
+import httplib2
 from google.oauth2.credentials import Credentials
 from google_auth_oauthlib.flow import InstalledAppFlow
 from google.auth.transport.requests import Request
-from googleapiclient.discovery import build
+from google_auth_httplib2 import AuthorizedHttp
+from googleapiclient import discovery_cache
+from googleapiclient.discovery import build_from_document
+from googleapiclient.errors import HttpError
 import json
 
 # If modifying these scopes, delete the file token.json.
 SCOPES = ['https://www.googleapis.com/auth/drive.metadata.readonly', 'https://www.googleapis.com/auth/drive.readonly']
 
-def get_drive_service():
-    creds = None
-    token_path = 'token.json'
-    
-    # The file token.json stores the user's access and refresh tokens, and is
-    # created automatically when the authorization flow completes for the first
-    # time.
-    if os.path.exists(token_path):
-        creds = Credentials.from_authorized_user_file(token_path, SCOPES)
-    
-    # If there are no (valid) credentials available, let the user log in.
-    if not creds or not creds.valid:
-        if creds and creds.expired and creds.refresh_token:
+TOKEN_PATH = 'token.json'
+
+# Socket timeout (seconds) of each thread's Drive connection
+HTTP_TIMEOUT = 60
+
+
+class DriveClient:
+    """
+    Process-wide source of Drive service objects.
+
+    Credentials are read from token.json once (and again only when the file
+    changes, e.g. after the OAuth callback) and refreshed under a lock, with
+    the new access token written back. The Drive v3 discovery document is
+    the static copy bundled with google-api-python-client, parsed once.
+    Service objects are not thread-safe, so each thread keeps its own,
+    built over its own httplib2 connection, which stays open across calls.
+    """
+
+    def __init__(self, token_path=TOKEN_PATH):
+        self.token_path = token_path
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._creds = None
+        self._mtime = None
+        self._generation = 0
+        self._document = None
+
+    def _discovery_document(self):
+        if self._document is None:
+            self._document = json.loads(discovery_cache.get_static_doc('drive', 'v3'))
+        return self._document
+
+    def _save(self, creds):
+        with open(self.token_path, 'w') as token_file:
+            token_file.write(creds.to_json())
+        self._mtime = os.stat(self.token_path).st_mtime_ns
+
+    def _refresh(self):
+        """Caller holds the lock. Refreshes an expired access token if possible."""
+        creds = self._creds
+        if creds and not creds.valid and creds.expired and creds.refresh_token:
             creds.refresh(Request())
-        else:
-            client_config = {
-                "web": {
-                    "client_id": os.getenv("GOOGLE_CLIENT_ID"),
-                    "project_id": "reach-skyline",
-                    "auth_uri": "https://accounts.google.com/o/oauth2/auth",
-                    "token_uri": "https://oauth2.googleapis.com/token",
-                    "auth_provider_x509_cert_url": "https://www.googleapis.com/oauth2/v1/certs",
-                    "client_secret": os.getenv("GOOGLE_CLIENT_SECRET"),
-                    "redirect_uris": ["http://localhost:5000/api/media/oauth-callback"]
-                }
+            self._save(creds)
+
+    def credentials(self):
+        """Current valid credentials, or None when Drive is not authorized."""
+        with self._lock:
+            try:
+                mtime = os.stat(self.token_path).st_mtime_ns
+            except FileNotFoundError:
+                mtime = None
+            if mtime != self._mtime:
+                self._creds = Credentials.from_authorized_user_file(self.token_path, SCOPES) if mtime else None
+                self._mtime = mtime
+                self._generation += 1
+            self._refresh()
+            return self._creds if self._creds and self._creds.valid else None
+
+    def ensure_fresh(self):
+        """Cheap per-request check; only takes the lock when the token has expired."""
+        creds = self._creds
+        if creds is not None and not creds.valid:
+            with self._lock:
+                self._refresh()
+
+    def service(self):
+        """This thread's Drive service, or None when Drive is not authorized."""
+        creds = self.credentials()
+        if creds is None:
+            return None
+        cached = getattr(self._local, "service", None)
+        if cached is None or self._local.generation != self._generation:
+            http = AuthorizedHttp(creds, http=httplib2.Http(timeout=HTTP_TIMEOUT))
+            cached = self._local.service = build_from_document(self._discovery_document(), http=http)
+            self._local.generation = self._generation
+        return cached
+
+    def reset(self):
+        """Forgets cached credentials and services (e.g. after re-authorization)."""
+        with self._lock:
+            self._creds = None
+            self._mtime = None
+            self._generation += 1
+
+
+drive_client = DriveClient()
+
+
+def get_drive_service():
+    service = drive_client.service()
+    if service is None:
+        client_config = {
+            "web": {
+                "client_id": os.getenv("GOOGLE_CLIENT_ID"),
+                "project_id": "reach-skyline",
+                "auth_uri": "https://accounts.google.com/o/oauth2/auth",
+                "token_uri": "https://oauth2.googleapis.com/token",
+                "auth_provider_x509_cert_url": "https://www.googleapis.com/oauth2/v1/certs",
+                "client_secret": os.getenv("GOOGLE_CLIENT_SECRET"),
+                "redirect_uris": ["http://localhost:5000/api/media/oauth-callback"]
             }
-            # Note: For a real server, we use a web-based flow. 
-            # For this dashboard, we'll implement a route to trigger this.
-            return None, client_config
+        }
+        # Note: For a real server, we use a web-based flow. 
+        # For this dashboard, we'll implement a route to trigger this.
+        return None, client_config
+
+    return service, None
+
+# Largest page files.list / changes.list accept
+PAGE_SIZE = 1000
+FOLDER_MIME_TYPE = "application/vnd.google-apps.folder"
+FILE_FIELDS = (
+    "id, name, mimeType, thumbnailLink, webViewLink, createdTime, modifiedTime, size, videoMediaMetadata, "
+    "parents, trashed"
+)
+MEDIA_QUERY = "mimeType contains 'video/' or mimeType contains 'image/'"
+# The changes feed only carries what is needed to tell whether a change
+# concerns the synced tree; full metadata is fetched with get_files()
+CHANGE_FILE_FIELDS = "id, mimeType, parents, trashed"
+
+
+# Drive accepts at most 100 calls per batch request
+BATCH_SIZE = 100
+
+# Transient statuses worth retrying (403/429 only when Drive says rate limit)
+RETRYABLE_STATUSES = (500, 502, 503, 504)
+RATE_LIMIT_REASONS = ("rateLimitExceeded", "userRateLimitExceeded")
+RETRYABLE_EXCEPTIONS = (ConnectionError, TimeoutError, socket.timeout)
+
+
+class TokenBucket:
+    """
+    Process-wide limit on Drive calls: `rate` tokens per second, bursts of
+    up to `burst`. Callers that overdraw the bucket sleep off the debt, so
+    concurrent threads end up evenly spaced. Adapts to Drive's feedback:
+    every rate-limit response halves the rate (down to MIN_RATE_FRACTION of
+    the configured one), every success wins back RECOVERY_FRACTION of it.
+    """
+    MIN_RATE_FRACTION = 0.05
+    RECOVERY_FRACTION = 0.02
+
+    def __init__(self, rate=0, burst=None):
+        self._lock = threading.Lock()
+        self.configure(rate, burst)
+
+    def configure(self, rate, burst=None):
+        with self._lock:
+            self.max_rate = float(rate or 0)
+            self.rate = self.max_rate
+            self.capacity = float(burst or max(1.0, self.max_rate))
+            self.tokens = self.capacity
+            self._updated = time.monotonic()
+
+    def _refill(self, now):
+        self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def acquire(self, tokens=1):
+        """Takes `tokens`, sleeping while the bucket is in debt; returns the seconds slept."""
+        if not self.max_rate:
+            return 0.0
+        with self._lock:
+            self._refill(time.monotonic())
+            self.tokens -= tokens
+            wait = -self.tokens / self.rate if self.tokens < 0 else 0.0
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+    def throttled(self):
+        if not self.max_rate:
+            return
+        with self._lock:
+            self._refill(time.monotonic())
+            self.rate = max(self.max_rate * self.MIN_RATE_FRACTION, self.rate / 2)
+            self.tokens = min(self.tokens, 0.0)   # no bursting straight back into the limit
+
+    def succeeded(self):
+        if self.rate < self.max_rate:
+            with self._lock:
+                self._refill(time.monotonic())
+                self.rate = min(self.max_rate, self.rate + self.max_rate * self.RECOVERY_FRACTION)
+
+
+class RetryPolicy:
+    """Exponential backoff with full jitter: attempt n sleeps U(0, min(max_delay, base_delay * 2^n))."""
+
+    def __init__(self, max_retries=5, base_delay=1.0, max_delay=32.0):
+        self.configure(max_retries, base_delay, max_delay)
+
+    def configure(self, max_retries, base_delay, max_delay):
+        self.max_retries = int(max_retries)
+        self.base_delay = float(base_delay)
+        self.max_delay = float(max_delay)
+
+    def delay(self, attempt):
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+
+
+class DriveStats:
+    """Thread-safe counters for Drive I/O: calls sent, batches, retries, rate-limit hits and seconds spent waiting."""
+    FIELDS = ("requests", "batches", "retries", "throttled", "throttle_time")
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._values = dict.fromkeys(self.FIELDS, 0)
+
+    def add(self, **counts):
+        with self._lock:
+            for key, value in counts.items():
+                self._values[key] += value
+
+    def snapshot(self):
+        with self._lock:
+            return dict(self._values)
+
+    def since(self, snapshot):
+        current = self.snapshot()
+        delta = {key: current[key] - snapshot.get(key, 0) for key in self.FIELDS}
+        delta["throttle_time"] = round(delta["throttle_time"], 3)
+        return delta
+
+
+rate_limiter = TokenBucket()
+retry_policy = RetryPolicy()
+drive_stats = DriveStats()
+
+
+def configure(config):
+    """
+    Applies the DRIVE_* settings of a Flask config (or any mapping).
+    create_app calls it once; calling it again resets the adapted rate.
+    """
+    rate_limiter.configure(config.get("DRIVE_REQUESTS_PER_SECOND", 0), config.get("DRIVE_BURST"))
+    retry_policy.configure(
+        config.get("DRIVE_MAX_RETRIES", 5),
+        config.get("DRIVE_RETRY_BASE_DELAY", 1.0),
+        config.get("DRIVE_RETRY_MAX_DELAY", 32.0)
+    )
+
+
+def is_rate_limited(error):
+    """True for Drive's 429s and for 403s whose reason is a rate limit (other 403s are permanent)."""
+    if error.resp.status == 429:
+        return True
+    if error.resp.status != 403:
+        return False
+    try:
+        details = json.loads(error.content).get('error', {}).get('errors', [])
+    except (ValueError, AttributeError):
+        return False
+    return any(d.get('reason') in RATE_LIMIT_REASONS for d in details)
+
+
+def _should_retry(error):
+    """Whether a failed call may succeed if repeated; notes rate-limit hits."""
+    if isinstance(error, HttpError):
+        if is_rate_limited(error):
+            rate_limiter.throttled()
+            drive_stats.add(throttled=1)
+            return True
+        return error.resp.status in RETRYABLE_STATUSES
+    return isinstance(error, RETRYABLE_EXCEPTIONS)
+
+
+def _backoff(attempt):
+    delay = retry_policy.delay(attempt)
+    drive_stats.add(retries=1, throttle_time=delay)
+    time.sleep(delay)
+
+
+def execute(request, cost=1):
+    """
+    Runs one Drive API request (or batch of `cost` calls) under the
+    process-wide rate limit, retrying rate-limit responses, transient 5xx
+    and dropped connections up to retry_policy.max_retries times.
+    """
+    attempt = 0
+    while True:
+        drive_stats.add(requests=cost, throttle_time=rate_limiter.acquire(cost))
+        drive_client.ensure_fresh()
+        try:
+            result = request.execute()
+        except (HttpError,) + RETRYABLE_EXCEPTIONS as e:
+            if attempt >= retry_policy.max_retries or not _should_retry(e):
+                raise
+            print(f"[DEBUG] Drive request failed ({e}), retry {attempt + 1}/{retry_policy.max_retries}")
+        else:
+            rate_limiter.succeeded()
+            return result
+        _backoff(attempt)
+        attempt += 1
+
+
+def get_files(service, file_ids, fields=FILE_FIELDS, on_error=None):
+    """
+    Metadata for many files, BATCH_SIZE per round trip through the Drive
+    batch endpoint. Returns {file_id: file}; files Drive no longer has are
+    left out. Calls that fail transiently inside a batch are sent again in
+    the next one. Other per-file errors go to on_error(file_id, error) and
+    the file is left out; without on_error the first one is raised.
+    """
+    found = {}
+    pending = list(dict.fromkeys(file_ids))
+    attempt = 0
+    while pending:
+        retry, failed = [], []
+
+        def on_response(file_id, response, exception):
+            if exception is None:
+                found[file_id] = response
+            elif isinstance(exception, HttpError) and exception.resp.status == 404:
+                pass
+            elif _should_retry(exception):
+                retry.append(file_id)
+            elif on_error is not None:
+                on_error(file_id, exception)
+            else:
+                failed.append(exception)
+
+        for i in range(0, len(pending), BATCH_SIZE):
+            chunk = pending[i:i + BATCH_SIZE]
+            batch = service.new_batch_http_request(callback=on_response)
+            for file_id in chunk:
+                batch.add(service.files().get(fileId=file_id, fields=fields), request_id=file_id)
+            drive_stats.add(batches=1)
+            execute(batch, cost=len(chunk))
+        if failed:
+            raise failed[0]
+        if retry:
+            if attempt >= retry_policy.max_retries:
+                raise RuntimeError(f"Drive kept rate limiting metadata requests for {len(retry)} files")
+            _backoff(attempt)
+            attempt += 1
+        pending = retry
+    return found
+
+
+def is_media(file):
+    mime = file.get('mimeType') or ''
+    return mime.startswith('video/') or mime.startswith('image/')
+
+
+def is_folder(file):
+    return file.get('mimeType') == FOLDER_MIME_TYPE
+
+
+def iter_folder_pages(service, folder_id, include_folders=False):
+    """
+    Yields each page (list of files) of non-trashed images/videos directly
+    in folder_id; with include_folders, subfolders are listed as well.
+    """
+    kinds = f"mimeType = '{FOLDER_MIME_TYPE}' or {MEDIA_QUERY}" if include_folders else MEDIA_QUERY
+    query = f"'{folder_id}' in parents and trashed = false and ({kinds})"
+    page_token = None
+    while True:
+        results = execute(service.files().list(
+            q=query,
+            pageSize=PAGE_SIZE,
+            pageToken=page_token,
+            fields=f"nextPageToken, files({FILE_FIELDS})"
+        ))
+        yield results.get('files', [])
+        page_token = results.get('nextPageToken')
+        if not page_token:
+            return
+
+
+def iter_folder_files(service, folder_id):
+    """Yields every non-trashed image/video directly in folder_id, following nextPageToken."""
+    for page in iter_folder_pages(service, folder_id):
+        yield from page
 
-    return build('drive', 'v3', credentials=creds), None
 
 def sync_folder(service, folder_id):
-    """Lists files in the given folder and returns metadata."""
-    query = f"'{folder_id}' in parents and trashed = false and (mimeType contains 'video/' or mimeType contains 'image/')"
-    results = service.files().list(
-        q=query,
-        pageSize=100, 
-        fields="nextPageToken, files(id, name, mimeType, thumbnailLink, webViewLink, createdTime, size, videoMediaMetadata)"
-    ).execute()
-    return results.get('files', [])
+    """Lists files in the given folder and returns metadata (all pages)."""
+    return list(iter_folder_files(service, folder_id))
+
+
+def resolve_folder_id(service, folder_id):
+    """
+    The real ID of folder_id. Drive accepts aliases such as 'root' in
+    requests but reports only real IDs in a file's parents.
+    """
+    return execute(service.files().get(fileId=folder_id, fields='id'))['id']
+
+
+def get_start_page_token(service):
+    """Token for 'now' in the Drive changes feed."""
+    return execute(service.changes().getStartPageToken())['startPageToken']
+
+
+def list_changes(service, page_token, on_page=None):
+    """
+    Every change since page_token, following nextPageToken; on_page() is
+    called after each page. Returns (changes, new_start_page_token).
+    """
+    changes = []
+    while True:
+        results = execute(service.changes().list(
+            pageToken=page_token,
+            pageSize=PAGE_SIZE,
+            includeRemoved=True,
+            spaces='drive',
+            fields=f"nextPageToken, newStartPageToken, changes(fileId, removed, file({CHANGE_FILE_FIELDS}))"
+        ))
+        changes.extend(results.get('changes', []))
+        if on_page:
+            on_page()
+        if results.get('newStartPageToken'):
+            return changes, results['newStartPageToken']
+        page_token = results['nextPageToken']
@@ -0,0 +1,12 @@
+import base64
+import json
+
+
+def encode_cursor(values):
+    """Opaque keyset-pagination cursor (URL-safe base64 JSON) for a dict of last-row values."""
+    return base64.urlsafe_b64encode(json.dumps(values).encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor):
+    padded = cursor + "=" * (-len(cursor) % 4)
+    return json.loads(base64.urlsafe_b64decode(padded.encode()))
@@ -0,0 +1,78 @@
+# app/utils/identity_cache.py
+import threading
+import time
+from flask import g, current_app, has_app_context
+from sqlalchemy import event
+from app.models.employee import Employee
+
+# emp_id -> (expires_at, identity dict). Plain dicts, never ORM instances,
+# so entries are safe to share between requests and threads.
+_identities = {}
+_lock = threading.Lock()
+
+
+def _snapshot(employee):
+    return {
+        "id": employee.id,
+        "name": employee.name,
+        "role": employee.role,
+        "team": employee.team,
+        "email": employee.email,
+        "status": employee.status,
+        "team_leader_id": employee.team_leader_id
+    }
+
+
+def _ttl():
+    if has_app_context():
+        return current_app.config.get("IDENTITY_CACHE_TTL", 30)
+    return 30
+
+
+def get_identity(emp_id):
+    """
+    Returns the identity dict for an employee, or None if they don't exist.
+    Looks in the per-request cache first, then the short-TTL process cache,
+    and only then queries the database.
+    """
+    if not emp_id:
+        return None
+
+    request_cache = g.setdefault("_identity_cache", {})
+    if emp_id in request_cache:
+        return request_cache[emp_id]
+
+    now = time.monotonic()
+    with _lock:
+        entry = _identities.get(emp_id)
+    if entry and entry[0] > now:
+        identity = entry[1]
+    else:
+        employee = Employee.query.get(emp_id)
+        identity = _snapshot(employee) if employee else None
+        if identity:
+            with _lock:
+                _identities[emp_id] = (now + _ttl(), identity)
+
+    request_cache[emp_id] = identity
+    return identity
+
+
+def invalidate_identity(emp_id=None):
+    """Drops one employee (or everyone when emp_id is None) from the process cache."""
+    with _lock:
+        if emp_id is None:
+            _identities.clear()
+        else:
+            _identities.pop(emp_id, None)
+    if has_app_context() and "_identity_cache" in g:
+        if emp_id is None:
+            g._identity_cache.clear()
+        else:
+            g._identity_cache.pop(emp_id, None)
+
+
+@event.listens_for(Employee, "after_update")
+@event.listens_for(Employee, "after_delete")
+def _invalidate_on_change(mapper, connection, target):
+    invalidate_identity(target.id)
@@ -1,8 +1,7 @@
-import smtplib
-from email.mime.text import MIMEText
-from email.mime.multipart import MIMEMultipart
 from flask import current_app
 import os
+from app.services.email_queue import enqueue_email
+from app.services.email_templates import render_email
 
 def send_task_assignment_email(employee, tasks, team_leader):
     """
@@ -16,8 +15,6 @@ def send_task_assignment_email(employee, tasks, team_leader):
         return False
 
     try:
-        smtp_server = os.environ.get("SMTP_SERVER", "smtp.gmail.com")
-        smtp_port = int(os.environ.get("SMTP_PORT", 587))
         smtp_user = os.environ.get("SMTP_USER")
         smtp_password = os.environ.get("SMTP_PASS")
         
@@ -36,65 +33,27 @@ def send_task_assignment_email(employee, tasks, team_leader):
 
         subject = f"New Assignment: {client_name} - {task_count} Task(s)"
         
-        # Build Task Table
-        task_rows_html = ""
-        for t in tasks:
-            row = f"""
-            <tr>
-                <td style="border: 1px solid #ddd; padding: 8px;">{t.id}</td>
-                <td style="border: 1px solid #ddd; padding: 8px;">{t.activity_code}</td>
-                <td style="border: 1px solid #ddd; padding: 8px;">{t.content_type or 'N/A'}</td>
-                <td style="border: 1px solid #ddd; padding: 8px;">{t.minutes or 0} mins</td>
-                <td style="border: 1px solid #ddd; padding: 8px;">{t.remarks or 'No instructions'}</td>
-            </tr>
-            """
-            task_rows_html += row
-
-        html_body = f"""
-        <html>
-        <body style="font-family: Arial, sans-serif; color: #333;">
-            <p>Hello <strong>{employee.name}</strong>,</p>
-            <p>You have been assigned <strong>{task_count}</strong> new task(s) for client <strong>{client_name}</strong>.</p>
-            
-            <table style="width: 100%; border-collapse: collapse; margin-top: 20px;">
-                <thead>
-                    <tr style="background-color: #f2f2f2;">
-                        <th style="border: 1px solid #ddd; padding: 8px; text-align: left;">Task ID</th>
-                        <th style="border: 1px solid #ddd; padding: 8px; text-align: left;">Code</th>
-                        <th style="border: 1px solid #ddd; padding: 8px; text-align: left;">Activity Type</th>
-                        <th style="border: 1px solid #ddd; padding: 8px; text-align: left;">Min</th>
-                        <th style="border: 1px solid #ddd; padding: 8px; text-align: left;">Description</th>
-                    </tr>
-                </thead>
-                <tbody>
-                    {task_rows_html}
-                </tbody>
-            </table>
-
-            <div style="margin-top: 20px; padding: 15px; background-color: #f9f9f9; border-radius: 5px;">
-                <p style="margin: 0;"><strong>Assigned Date & Time:</strong> {date_time}</p>
-                <p style="margin: 5px 0 0 0;"><strong>Assigned By:</strong> {tl_name} ({tl_email})</p>
-            </div>
-
-            <p style="margin-top: 20px;">Please check your dashboard for more details.</p>
-            <p>Regards,<br><strong>Reach Skyline Team</strong></p>
-        </body>
-        </html>
-        """
-
-        msg = MIMEMultipart("alternative")
-        msg['From'] = sender_display
-        msg['To'] = employee.email
-        msg['Reply-To'] = tl_email
-        msg['Subject'] = subject
-        msg.attach(MIMEText(html_body, 'html'))
-
-        with smtplib.SMTP(smtp_server, smtp_port) as server:
-            server.starttls()
-            server.login(smtp_user, smtp_password)
-            server.send_message(msg)
-
-        print(f"[DEBUG] Consolidated assignment email sent to {employee.email} for {task_count} tasks.")
+        html_body = render_email(
+            "task_assignment_summary",
+            employee=employee,
+            tasks=tasks,
+            task_count=task_count,
+            client_name=client_name,
+            date_time=date_time,
+            tl_name=tl_name,
+            tl_email=tl_email
+        )
+
+        enqueue_email(
+            recipient=employee.email,
+            subject=subject,
+            html_body=html_body,
+            sender=sender_display,
+            reply_to=tl_email,
+            category="task_assignment"
+        )
+
+        print(f"[DEBUG] Consolidated assignment email queued for {employee.email} for {task_count} tasks.")
         return True
 
     except Exception as e:
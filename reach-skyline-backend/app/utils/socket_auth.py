@@ -0,0 +1,93 @@
+# app/utils/socket_auth.py
+"""
+Socket.IO authentication.
+
+The access token is verified once, in the 'connect' handler. The resolved
+identity and the chats the user may use are kept in the per-connection
+Socket.IO session, so event handlers authorize with an in-memory lookup
+instead of decoding a JWT and querying Employee on every message.
+"""
+from flask import request, session
+from flask_jwt_extended import decode_token
+from app.models.chat import Chat
+from app.utils.identity_cache import get_identity
+
+# Roles that may read and post in any chat
+SUPERVISOR_ROLES = ("Admin", "Manager")
+
+
+def _token_from_handshake(auth):
+    if isinstance(auth, dict) and auth.get("token"):
+        return auth["token"]
+    header = request.headers.get("Authorization", "")
+    if header.startswith("Bearer "):
+        return header[len("Bearer "):]
+    return request.args.get("token")
+
+
+def authenticate_socket(auth):
+    """
+    Verifies the handshake token and stores the caller's identity on the
+    socket session. Returns the identity dict, or None if the connection
+    should be refused.
+    """
+    token = _token_from_handshake(auth)
+    if not token:
+        return None
+    try:
+        claims = decode_token(token)
+    except Exception as e:
+        print(f"[DEBUG] Socket auth rejected: {e}")
+        return None
+    if claims.get("type") != "access":
+        return None
+
+    cached = get_identity(claims.get("sub"))
+    if not cached or (cached.get("status") or "Active") != "Active":
+        return None
+
+    identity = {
+        "id": cached["id"],
+        "role": claims.get("role") or cached["role"],
+        "team": claims.get("team") or cached["team"],
+        "name": cached["name"]
+    }
+    # chat_id -> (emp_id, team_leader_id)
+    chats = Chat.query.with_entities(Chat.id, Chat.emp_id, Chat.team_leader_id).filter(
+        (Chat.emp_id == identity["id"]) | (Chat.team_leader_id == identity["id"])
+    ).all()
+    session["identity"] = identity
+    session["chats"] = {chat_id: (emp_id, tl_id) for chat_id, emp_id, tl_id in chats}
+    return identity
+
+
+def current_socket_identity():
+    return session.get("identity")
+
+
+def chat_participants(chat_id):
+    """
+    (emp_id, team_leader_id) of a chat the connected user may access, or
+    None. Chats created after the socket connected are looked up once and
+    then cached on the session.
+    """
+    identity = current_socket_identity()
+    if not identity or not chat_id:
+        return None
+    try:
+        chat_id = int(chat_id)
+    except (TypeError, ValueError):
+        return None
+
+    chats = session.setdefault("chats", {})
+    if chat_id in chats:
+        return chats[chat_id]
+
+    chat = Chat.query.get(chat_id)
+    if not chat:
+        return None
+    participants = (chat.emp_id, chat.team_leader_id)
+    if identity["id"] in participants or identity["role"] in SUPERVISOR_ROLES:
+        chats[chat_id] = participants
+        return participants
+    return None
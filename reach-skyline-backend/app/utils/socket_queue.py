@@ -0,0 +1,39 @@
+# app/utils/socket_queue.py
+"""
+Cross-process pub/sub backends for Socket.IO emits.
+
+With a message queue every worker publishes its emits to the broker and
+delivers the ones it receives to its own connected clients, so
+emit(..., room=...) reaches room members on any gunicorn worker. Room
+membership itself stays local to the worker holding the connection.
+
+SOCKETIO_MESSAGE_QUEUE selects the backend:
+- unset                      in-process only (single worker)
+- redis://, rediss://        Redis pub/sub
+- unix:///path/redis.sock    Redis over a Unix socket
+- zmq+tcp://host:port        ZeroMQ (needs a forwarder)
+- filesystem:///some/dir     Kombu directory transport; brokerless, for
+                             tests and single-host setups
+- anything else              Kombu URL (amqp://, ...)
+"""
+import os
+from urllib.parse import urlparse
+import socketio
+
+
+def create_client_manager(url, channel="flask-socketio"):
+    """Returns a python-socketio client manager for url, or None for in-process."""
+    if not url:
+        return None
+
+    if url.startswith(("redis://", "rediss://", "unix://")):
+        return socketio.RedisManager(url, channel=channel)
+    if url.startswith("zmq"):
+        return socketio.ZmqManager(url, channel=channel)
+    if url.startswith("filesystem://"):
+        folder = urlparse(url).path or os.path.join(os.getcwd(), "instance", "socketio-queue")
+        os.makedirs(folder, exist_ok=True)
+        return socketio.KombuManager("filesystem://", channel=channel, connection_options={
+            "transport_options": {"data_folder_in": folder, "data_folder_out": folder, "control_folder": folder}
+        })
+    return socketio.KombuManager(url, channel=channel)
@@ -0,0 +1,69 @@
+# benchmarks/_support.py
+"""
+Setup shared by the scripts in benchmarks/.
+
+The scripts run as `python benchmarks/<name>.py`, so this directory is on
+sys.path and `from _support import ...` works directly. Importing it:
+
+- puts the backend root on sys.path, so `app` imports;
+- points DATABASE_URL at a new SQLite file in TMP (a fresh temporary
+  directory) and turns the email queue workers off, so no script ever
+  touches a real database or SMTP server.
+
+Import it before anything from `app` (Config reads the environment at
+import). A script needing more settings calls environ(...) right after.
+Servers started as child processes inherit DATABASE_URL and so see what
+the script seeded; a child that imports _support itself gets a fresh one.
+"""
+import os
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+TMP = tempfile.mkdtemp()
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(TMP, 'bench.db')}"
+os.environ["EMAIL_QUEUE_ENABLED"] = "false"
+
+
+def environ(**values):
+    """Sets environment variables (str() of each value) before `app` is imported."""
+    os.environ.update({name: str(value) for name, value in values.items()})
+
+
+def expect(label, actual, wanted):
+    ok = actual == wanted
+    print(f"{'ok  ' if ok else 'FAIL'} {label}: {actual}" + ("" if ok else f" (expected {wanted})"))
+    return ok
+
+
+def seed_chat():
+    """
+    Client C001 ("Bench"), its Branding task ACT-0001 and that task's chat
+    between employee B001 and team lead TLB001. Needs an app context;
+    returns the chat id.
+    """
+    from app.extensions import db
+    from app.models.chat import Chat
+    from app.models.client import Client
+    from app.models.task import Task
+
+    db.session.add(Client(client_id="C001", client_name="Bench", slug="bench-c001"))
+    db.session.add(Task(activity_code="ACT-0001", client_id="C001", team="Branding"))
+    db.session.commit()
+    chat = Chat(task_id=1, emp_id="B001", team_leader_id="TLB001", department="Branding")
+    db.session.add(chat)
+    db.session.commit()
+    return chat.id
+
+
+def user_token(identity, role="Employee", team="Branding"):
+    """Access token for an active user (needs an app context)."""
+    from flask_jwt_extended import create_access_token
+    return create_access_token(identity=identity, additional_claims={"role": role, "team": team, "status": "Active"})
+
+
+def admin_token():
+    return user_token("ADM001", "Admin", "Management")
@@ -0,0 +1,89 @@
+# benchmarks/bench_chat_write_behind.py
+"""
+Chat message throughput with and without the write-behind buffer.
+
+Each mode runs in its own process against a fresh SQLite file and sends
+--messages chat messages through the send_message socket handler. It
+reports handler throughput (what the sending socket sees) and the time
+until every message is in chat_messages. Exits non-zero if any message
+is missing from the table or the unread counter.
+
+Usage: python benchmarks/bench_chat_write_behind.py [--messages 2000]
+"""
+import argparse
+import os
+import subprocess
+import sys
+import time
+
+from _support import seed_chat, user_token
+
+
+def run_mode(messages):
+    from app import create_app
+    from app.extensions import db, socketio
+    from app.models.chat import ChatMessage
+    from app.services.chat_buffer import chat_buffer
+    from app.services.chat_service import get_unread_counts
+
+    app = create_app()
+    with app.app_context():
+        chat_id = seed_chat()
+        token = user_token("B001")
+
+    client = socketio.test_client(app, auth={"token": token})
+    start = time.perf_counter()
+    for i in range(messages):
+        client.emit("send_message", {
+            "sender_id": "B001", "receiver_id": "TLB001", "chat_id": chat_id,
+            "message": f"bench-{i}", "task_code": "ACT-0001"
+        })
+    handler_time = time.perf_counter() - start
+
+    with app.app_context():
+        while db.session.query(db.func.count(ChatMessage.id)).scalar() < messages:
+            if time.perf_counter() - start > 60:
+                break
+            db.session.remove()
+            time.sleep(0.005)
+        durable_time = time.perf_counter() - start
+        stored = db.session.query(db.func.count(ChatMessage.id)).scalar()
+        unread = get_unread_counts("TLB001").get("ACT-0001", 0)
+    if chat_buffer.enabled:
+        chat_buffer.stop()
+
+    mode = "write-behind" if chat_buffer.enabled else "synchronous"
+    print(f"{mode:13} {messages} msgs: handler {messages / handler_time:8.0f} msg/s, "
+          f"durable after {durable_time * 1000:7.0f} ms ({messages / durable_time:6.0f} msg/s), "
+          f"stored={stored} unread={unread}")
+    return stored == messages and unread == messages
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--messages", type=int, default=2000)
+    parser.add_argument("--mode", choices=["sync", "write-behind"])
+    args = parser.parse_args()
+
+    if args.mode:
+        # Child process: one mode, fresh database (_support's)
+        ok = run_mode(args.messages)
+        sys.exit(0 if ok else 1)
+
+    failed = False
+    for mode in ["sync", "write-behind"]:
+        env = {**os.environ, "CHAT_WRITE_BEHIND": "true" if mode == "write-behind" else "false"}
+        res = subprocess.run([sys.executable, __file__, "--mode", mode, "--messages", str(args.messages)],
+                             env=env, capture_output=True, text=True)
+        lines = [line for line in res.stdout.splitlines() if "msgs:" in line]
+        print(lines[-1] if lines else res.stderr[-2000:])
+        failed = failed or res.returncode != 0
+
+    if failed:
+        print("FAIL: messages were lost")
+        sys.exit(1)
+    print("OK")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+# benchmarks/bench_drive_service.py
+"""
+Times getting a Drive service object (no network: the token written here
+is valid for an hour, so nothing is refreshed).
+
+Compares get_drive_service() with what it used to do on every call -
+read token.json and build() the service - and checks that each thread
+gets its own cached service.
+
+Usage: python benchmarks/bench_drive_service.py [--calls 500]
+"""
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+from datetime import datetime, timedelta
+
+from _support import TMP
+
+from google.oauth2.credentials import Credentials
+from googleapiclient.discovery import build
+
+from app.utils.google_drive import SCOPES, DriveClient
+
+
+def write_token(path):
+    with open(path, "w") as f:
+        json.dump({
+            "token": "bench-access-token", "refresh_token": "bench-refresh-token",
+            "client_id": "bench", "client_secret": "bench", "scopes": SCOPES,
+            "token_uri": "https://oauth2.googleapis.com/token",
+            "expiry": (datetime.utcnow() + timedelta(hours=1)).strftime("%Y-%m-%dT%H:%M:%SZ")
+        }, f)
+
+
+def legacy(path):
+    creds = Credentials.from_authorized_user_file(path, SCOPES)
+    return build('drive', 'v3', credentials=creds)
+
+
+def timed(label, fn, calls):
+    start = time.perf_counter()
+    for _ in range(calls):
+        fn()
+    per_call = (time.perf_counter() - start) / calls
+    print(f"{label:28} {per_call * 1000:8.3f} ms per call")
+    return per_call
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--calls", type=int, default=500)
+    args = parser.parse_args()
+
+    path = os.path.join(TMP, "token.json")
+    write_token(path)
+    client = DriveClient(path)
+
+    before = timed("read token + build()", lambda: legacy(path), args.calls)
+    after = timed("cached DriveClient.service()", client.service, args.calls)
+    print(f"speedup: {before / after:.0f}x")
+
+    main_service = client.service()
+    ok = client.service() is main_service
+    services = []
+    threads = [threading.Thread(target=lambda: services.append(client.service())) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    ok &= len({id(s) for s in services}) == 4
+
+    time.sleep(0.01)
+    write_token(path)   # e.g. the OAuth callback saving a new token
+    ok &= client.service() is not main_service
+
+    if not ok or after > before / 10:
+        print("FAIL: service not cached per thread, or not reloaded after token.json changed")
+        sys.exit(1)
+    print("OK")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+# benchmarks/bench_drive_sync.py
+"""
+Times a Drive library sync into media_assets (fake Drive, no network).
+
+Compares the bulk upsert engine with the previous per-file loop (one
+SELECT per Drive file, ORM add per new row) on:
+1. an initial import of --files files;
+2. a forced full re-sync after --changed files were renamed.
+Exits non-zero if the engine's statement count grows with the library
+size or the resulting tables differ.
+
+Usage: python benchmarks/bench_drive_sync.py [--files 20000] [--changed 2000]
+"""
+import argparse
+import sys
+import time
+
+from _support import environ
+
+environ(DRIVE_REQUESTS_PER_SECOND=0)
+
+from sqlalchemy import event  # noqa: E402
+
+from app import create_app  # noqa: E402
+from app.extensions import db  # noqa: E402
+from app.models.media_asset import MediaAsset  # noqa: E402
+from app.services.drive_sync import sync_drive_folder  # noqa: E402
+from app.utils.google_drive import sync_folder  # noqa: E402
+from fake_drive import FakeDrive  # noqa: E402
+
+FOLDER = "library"
+
+# Per 1,000 files: one IN lookup, one INSERT or UPDATE batch; plus fixed overhead
+MAX_QUERIES_PER_1K = 3
+BASE_QUERIES = 10
+
+
+def legacy_sync(service):
+    """The loop POST /api/media/sync used to run."""
+    drive_files = sync_folder(service, FOLDER)
+    for file in drive_files:
+        existing = MediaAsset.query.filter_by(drive_file_id=file['id']).first()
+        if not existing:
+            db.session.add(MediaAsset(
+                drive_file_id=file['id'],
+                filename=file['name'],
+                mime_type=file['mimeType'],
+                thumbnail_url=file.get('thumbnailLink'),
+                play_url=f"https://drive.google.com/file/d/{file['id']}/preview",
+                project_name="Unassigned",
+                shoot_day=1,
+                meta_data=file.get('videoMediaMetadata', {})
+            ))
+    db.session.commit()
+
+
+def timed(label, fn, statements):
+    statements.clear()
+    start = time.perf_counter()
+    fn()
+    elapsed = time.perf_counter() - start
+    print(f"{label:34} {elapsed:7.2f} s  {len(statements):6} statements")
+    return len(statements)
+
+
+def snapshot():
+    return sorted(db.session.query(MediaAsset.drive_file_id, MediaAsset.filename))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--files", type=int, default=20000)
+    parser.add_argument("--changed", type=int, default=2000)
+    args = parser.parse_args()
+
+    drive = FakeDrive()
+    ids = [drive.add_file(f"clip-{i}.mp4", FOLDER, videoMediaMetadata={"durationMillis": str(i * 1000)})
+           for i in range(args.files)]
+
+    app = create_app()
+    statements = []
+    with app.app_context():
+        event.listen(db.engine, "before_cursor_execute", lambda *a: statements.append(a[2]))
+        budget = BASE_QUERIES + MAX_QUERIES_PER_1K * (args.files // 1000 + 1)
+
+        def reset():
+            db.session.query(MediaAsset).delete()
+            db.session.commit()
+
+        timed("legacy: initial import", lambda: legacy_sync(drive), statements)
+        legacy_rows = snapshot()
+        reset()
+
+        queries = timed("bulk upsert: initial import", lambda: sync_drive_folder(drive, FOLDER, full=True), statements)
+        ok = queries <= budget and snapshot() == legacy_rows
+
+        for file_id in ids[:args.changed]:
+            drive.rename(file_id, f"renamed-{file_id}.mp4")
+        queries = timed(f"bulk upsert: re-sync, {args.changed} renamed",
+                        lambda: sync_drive_folder(drive, FOLDER, full=True), statements)
+        ok &= queries <= budget
+        renamed = db.session.query(MediaAsset).filter(MediaAsset.filename.like("renamed-%")).count()
+        ok &= renamed == args.changed
+        print(f"assets={db.session.query(MediaAsset).count()} renamed={renamed} statement budget={budget}")
+
+    if not ok:
+        print("FAIL: statement count grew with the library or rows differ")
+        sys.exit(1)
+    print("OK")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+# benchmarks/bench_email_render.py
+"""
+Micro-benchmark for rendering a task assignment digest email.
+
+Compares the precompiled Jinja template used by send_task_email with the
+previous body, which grew the task table by repeated f-string
+concatenation and escaped nothing, and with that same body escaped with
+html.escape. Exits non-zero if the template and the escaped f-string do
+not render the same document.
+
+Usage: python benchmarks/bench_email_render.py [--tasks 500] [--repeat 200]
+"""
+import argparse
+import html
+import sys
+import timeit
+from types import SimpleNamespace
+
+import _support  # noqa: F401  (puts the backend on sys.path)
+
+from app.services.email_templates import render_email
+
+
+def make_tasks(n):
+    return [
+        SimpleNamespace(
+            id=i,
+            activity_code=f"ACT-{i:04}",
+            content_type="Social Media Post",
+            team="Branding",
+            minutes=45,
+            remarks=f"Follow brand guide <v{i % 7}> & keep captions short"
+        )
+        for i in range(1, n + 1)
+    ]
+
+
+def render_concat(employee, tasks, escape=str):
+    """send_task_email's body before the template: the full HTML, rows grown by concatenation."""
+    client_name = "Acme"
+    task_count = len(tasks)
+    assigned_at = "2026-01-01 | 10:00 AM"
+    tl_name = "TL Branding"
+    tl_email = "tlbranding@reachskyline.com"
+
+    task_rows_html = ""
+    for t in tasks:
+        activity_type = t.content_type or t.team or "N/A"
+        task_rows_html += f"""
+        <tr>
+            <td style="border: 1px solid #ddd; padding: 12px; text-align: left;">{t.id}</td>
+            <td style="border: 1px solid #ddd; padding: 12px; text-align: left;">{escape(t.activity_code or 'N/A')}</td>
+            <td style="border: 1px solid #ddd; padding: 12px; text-align: left;">{escape(activity_type)}</td>
+            <td style="border: 1px solid #ddd; padding: 12px; text-align: left;">{t.minutes or 0} mins</td>
+            <td style="border: 1px solid #ddd; padding: 12px; text-align: left;">{escape(t.remarks or '-')}</td>
+        </tr>
+        """
+
+    return f"""
+    <html>
+    <body style="font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif; color: #333; line-height: 1.6;">
+        <div style="max-width: 800px; margin: 0 auto; padding: 20px; border: 1px solid #eee; border-radius: 10px;">
+            <h2 style="color: #2c3e50; border-bottom: 2px solid #3498db; padding-bottom: 10px;">New Task Assignment</h2>
+            <p>Hello <strong>{escape(employee.name)}</strong>,</p>
+            <p>You have been assigned <strong>{task_count}</strong> new task(s) for client: <span style="font-size: 1.1em; color: #e67e22; font-weight: bold;">{escape(client_name)}</span></p>
+            
+            <table style="width: 100%; border-collapse: collapse; margin-top: 20px; border: 1px solid #ddd;">
+                <thead>
+                    <tr style="background-color: #3498db; color: white;">
+                        <th style="border: 1px solid #ddd; padding: 12px; text-align: left;">Task ID</th>
+                        <th style="border: 1px solid #ddd; padding: 12px; text-align: left;">Code</th>
+                        <th style="border: 1px solid #ddd; padding: 12px; text-align: left;">Activity Type</th>
+                        <th style="border: 1px solid #ddd; padding: 12px; text-align: left;">Min</th>
+                        <th style="border: 1px solid #ddd; padding: 12px; text-align: left;">Description</th>
+                    </tr>
+                </thead>
+                <tbody>
+                    {task_rows_html}
+                </tbody>
+            </table>
+
+            <div style="margin-top: 30px; padding: 20px; background-color: #f8f9fa; border-left: 5px solid #3498db; border-radius: 4px;">
+                <p style="margin: 0; font-size: 0.9em;"><strong>Assigned Date & Time:</strong> {escape(assigned_at)}</p>
+                <p style="margin: 8px 0 0 0; font-size: 0.9em;"><strong>Assigned By:</strong> {escape(tl_name)} ({escape(tl_email)})</p>
+            </div>
+
+            <p style="margin-top: 30px; font-size: 0.9em; color: #7f8c8d;">Please login to your dashboard to view more details and start working.</p>
+            <hr style="border: none; border-top: 1px solid #eee; margin-top: 30px;">
+            <p style="text-align: center; color: #bdc3c7; font-size: 0.8em;">Reach Skyline CRM Notifications</p>
+        </div>
+    </body>
+    </html>
+    """
+
+
+def render_concat_escaped(employee, tasks):
+    return render_concat(employee, tasks, escape=html.escape)
+
+
+def render_template(employee, tasks):
+    return render_email(
+        "task_assignment",
+        employee=employee,
+        tasks=tasks,
+        task_count=len(tasks),
+        client_name="Acme",
+        assigned_at="2026-01-01 | 10:00 AM",
+        tl_name="TL Branding",
+        tl_email="tlbranding@reachskyline.com"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--tasks", type=int, default=500)
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    employee = SimpleNamespace(name="Emp Branding", email="empbranding@reachskyline.com")
+    tasks = make_tasks(args.tasks)
+
+    renderers = [
+        ("f-string concat (old)", render_concat),
+        ("f-string + html.escape", render_concat_escaped),
+        ("precompiled template", render_template),
+    ]
+    for label, fn in renderers:
+        best = min(timeit.repeat(lambda: fn(employee, tasks), number=args.repeat, repeat=3)) / args.repeat
+        size = len(fn(employee, tasks))
+        print(f"{label:24} {args.tasks} tasks: {best * 1000:7.3f} ms/render  ({size / 1024:.0f} KiB)")
+
+    # Same document: identical text once markup whitespace is ignored
+    squash = lambda doc: " ".join(doc.split())  # noqa: E731
+    if squash(render_template(employee, tasks)) != squash(render_concat_escaped(employee, tasks)):
+        print("FAIL: the template and the escaped f-string render different HTML")
+        sys.exit(1)
+    print("OK")
+
+
+if __name__ == "__main__":
+    main()
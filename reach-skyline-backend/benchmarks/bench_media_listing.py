@@ -0,0 +1,170 @@
+# benchmarks/bench_media_listing.py
+"""
+Seeds a throwaway SQLite database with --assets media assets and measures
+GET /api/media/assets.
+
+Compares the previous listing (every asset; crew member and reviewer
+loaded lazily, one query per employee not yet in the session's identity
+map) with the eager-loaded one, then times the first keyset page, a
+filtered page and a walk through every page. Exits non-zero if the statement count grows with the number
+of assets, pages skip or repeat assets, the filtered query does not
+use ix_media_assets_filters, or GET /api/media/assets/counts disagrees
+with a count over the walked pages.
+
+Usage: python benchmarks/bench_media_listing.py [--assets 50000] [--limit 100]
+"""
+import argparse
+import sys
+import time
+from datetime import datetime, timedelta
+
+from _support import admin_token
+
+from sqlalchemy import event, insert, text
+
+from app import create_app
+from app.extensions import db
+from app.models.employee import Employee
+from app.models.media_asset import MediaAsset
+from app.utils.helpers import encode_cursor
+
+MAX_QUERIES = 6
+PROJECTS = [f"Client {i}" for i in range(40)]
+STATUSES = ["RAW", "REVIEWED", "APPROVED"]
+SCRIPTS = [None, "Social Media", "Service Promotion", "Testimonial", "Educational"]
+
+
+def seed(n_assets):
+    employees = [e.id for e in Employee.query.all()]
+    start = datetime(2026, 1, 1)
+    db.session.execute(insert(MediaAsset), [
+        {
+            "drive_file_id": f"file-{i}",
+            "filename": f"clip-{i}.mp4",
+            "mime_type": "image/jpeg" if i % 7 == 0 else "video/mp4",
+            "project_name": PROJECTS[i % len(PROJECTS)],
+            "shoot_day": i % 5 + 1,
+            "status": STATUSES[i % len(STATUSES)],
+            "script_type": SCRIPTS[i % len(SCRIPTS)],
+            "crew_member_id": employees[i % len(employees)],
+            "assigned_reviewer_id": employees[(i + 1) % len(employees)] if i % 2 else None,
+            # Synced in batches: many assets share a created_at
+            "created_at": start + timedelta(seconds=i // 10),
+        }
+        for i in range(n_assets)
+    ])
+    db.session.commit()
+
+
+def legacy_listing():
+    """What GET /api/media/assets used to do."""
+    assets = MediaAsset.query.order_by(MediaAsset.created_at.desc()).all()
+    return [asset.to_dict() for asset in assets]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--assets", type=int, default=50000)
+    parser.add_argument("--limit", type=int, default=100)
+    args = parser.parse_args()
+
+    app = create_app()
+    with app.app_context():
+        seed(args.assets)
+        token = admin_token()
+        statements = []
+        event.listen(db.engine, "before_cursor_execute", lambda *a: statements.append(a[2]))
+
+        start = time.perf_counter()
+        legacy_listing()
+        print(f"{'legacy: full listing, lazy loads':44} queries={len(statements):6} "
+              f"time={(time.perf_counter() - start) * 1000:8.1f} ms")
+        db.session.remove()
+
+        plan = db.session.execute(text(
+            "EXPLAIN QUERY PLAN SELECT id FROM media_assets WHERE project_name = 'Client 3' "
+            "AND status = 'RAW' AND script_type = 'Testimonial' ORDER BY created_at DESC, id DESC LIMIT 101"
+        )).all()
+        uses_index = any("ix_media_assets_filters" in row[-1] for row in plan)
+
+    client = app.test_client()
+    headers = {"Authorization": f"Bearer {token}"}
+    failed = not uses_index
+    print(f"filtered query plan uses ix_media_assets_filters: {uses_index}")
+
+    paths = [
+        "/api/media/assets",
+        f"/api/media/assets?limit={args.limit}",
+        f"/api/media/assets?limit={args.limit}&project=Client%203&status=RAW&script_type=Testimonial",
+    ]
+    for path in paths:
+        statements.clear()
+        start = time.perf_counter()
+        res = client.get(path, headers=headers)
+        elapsed = (time.perf_counter() - start) * 1000
+        count = len(statements)
+        body = res.get_json()
+        items = body if isinstance(body, list) else body["items"]
+        print(f"{path[:44]:44} queries={count:6} time={elapsed:8.1f} ms  assets={len(items)}")
+        if res.status_code != 200 or count > MAX_QUERIES:
+            failed = True
+
+    # Walk every page: each asset exactly once, newest first
+    seen, walked, pages, cursor = [], [], 0, None
+    start = time.perf_counter()
+    while True:
+        path = "/api/media/assets?limit=500" + (f"&cursor={cursor}" if cursor else "")
+        body = client.get(path, headers=headers).get_json()
+        seen.extend((a["created_at"], a["id"]) for a in body["items"])
+        walked.extend(body["items"])
+        pages += 1
+        cursor = body["nextCursor"]
+        if not cursor:
+            break
+    elapsed = time.perf_counter() - start
+    print(f"walked {pages} pages of 500 in {elapsed:.2f} s ({elapsed / pages * 1000:.1f} ms per page)")
+    if len(seen) != args.assets or len(set(seen)) != args.assets or seen != sorted(seen, reverse=True):
+        print(f"pagination returned {len(set(seen))} distinct of {args.assets} assets, or out of order")
+        failed = True
+
+    # Counts endpoint: the totals the dashboard panels show without listing every asset
+    path = "/api/media/assets/counts?status=RAW"
+    statements.clear()
+    start = time.perf_counter()
+    counts = client.get(path, headers=headers).get_json()
+    print(f"{path:44} queries={len(statements):6} time={(time.perf_counter() - start) * 1000:8.1f} ms  {counts}")
+    mine = [a for a in walked if a["status"] == "RAW"]
+    wanted = {
+        "total": len(mine),
+        "script_types": {t: sum(a["script_type"] == t for a in mine) for t in {a["script_type"] for a in mine}},
+        "media_types": {m: sum(a["mime_type"].startswith(m + "/") for a in mine) for m in ("image", "video")},
+    }
+    if counts != wanted or len(statements) > MAX_QUERIES:
+        print(f"counts {counts} (expected {wanted})")
+        failed = True
+    images, cursor = [], None
+    while True:
+        path = "/api/media/assets?limit=500&status=RAW&media_type=image" + (f"&cursor={cursor}" if cursor else "")
+        body = client.get(path, headers=headers).get_json()
+        images.extend(body["items"])
+        cursor = body["nextCursor"]
+        if not cursor:
+            break
+    if len(images) != wanted["media_types"]["image"] or any(a["mime_type"] != "image/jpeg" for a in images):
+        print("media_type=image did not return exactly the images")
+        failed = True
+
+    now = datetime.utcnow().isoformat()
+    for bad in ("not-a-cursor", encode_cursor({"c": now}), encode_cursor({"c": now, "id": "x"}), encode_cursor([1])):
+        if client.get(f"/api/media/assets?cursor={bad}", headers=headers).status_code != 400:
+            print(f"cursor {bad!r} was not rejected with 400")
+            failed = True
+
+    if failed:
+        print(f"FAIL: expected <= {MAX_QUERIES} queries per listing, complete ordered pages and index use")
+        sys.exit(1)
+    print("OK")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,184 @@
+# benchmarks/bench_socketio_connections.py
+"""
+Concurrent-connection benchmark for the Socket.IO server.
+
+Starts run.py in the requested ASYNC_MODE against a throwaway SQLite
+database, then:
+1. opens --idle websocket clients that only join their user room
+   (connect_user) and reports server RSS per connection;
+2. joins --listeners clients to one chat room and sends --messages
+   chat messages through send_message, reporting p50/p99 fan-out latency
+   (send -> 'new_message' received by every listener).
+
+Usage: python benchmarks/bench_socketio_connections.py --mode eventlet [--idle 2000]
+       [--listeners 50] [--messages 200]
+Needs aiohttp on the client side (pip install aiohttp).
+"""
+import argparse
+import asyncio
+import os
+import resource
+import subprocess
+import sys
+import time
+import urllib.request
+
+import socketio
+
+from _support import ROOT, environ, seed_chat, user_token
+
+
+def seed(env):
+    environ(**env)
+    from app import create_app
+
+    app = create_app()
+    with app.app_context():
+        return seed_chat(), user_token("B001")
+
+
+def rss_kib(pid):
+    with open(f"/proc/{pid}/status") as f:
+        for line in f:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1])
+    return 0
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+async def connect_many(url, token, count, concurrency=100):
+    clients = []
+    sem = asyncio.Semaphore(concurrency)
+    failed = 0
+
+    async def one(i):
+        nonlocal failed
+        async with sem:
+            c = socketio.AsyncClient(reconnection=False)
+            try:
+                await c.connect(url, auth={"token": token}, transports=["websocket"])
+            except socketio.exceptions.ConnectionError:
+                failed += 1
+                return
+            await c.emit("connect_user", {"user_id": f"IDLE{i:05}"})
+            clients.append(c)
+
+    await asyncio.gather(*(one(i) for i in range(count)))
+    return clients, failed
+
+
+async def run(args, url, token, chat_id, server_pid):
+    base = rss_kib(server_pid)
+    start = time.perf_counter()
+    idle, failed = await connect_many(url, token, args.idle)
+    await asyncio.sleep(2)
+    connected = rss_kib(server_pid)
+    connect_time = time.perf_counter() - start
+    per_conn = (connected - base) / max(len(idle), 1)
+    print(f"idle connections: {len(idle)} ({failed} failed) in {connect_time:.1f}s, "
+          f"server RSS {base / 1024:.1f} -> {connected / 1024:.1f} MiB ({per_conn:.1f} KiB/connection)")
+
+    latencies = []
+    pending = {}
+
+    listeners = []
+    for _ in range(args.listeners):
+        c = socketio.AsyncClient(reconnection=False)
+
+        @c.on("new_message")
+        async def on_message(data):
+            sent = pending.get(data.get("message_text"))
+            if sent is not None:
+                latencies.append((time.perf_counter() - sent) * 1000)
+
+        await c.connect(url, auth={"token": token}, transports=["websocket"])
+        await c.emit("join_chat", {"chat_id": chat_id})
+        listeners.append(c)
+
+    sender = socketio.AsyncClient(reconnection=False)
+    await sender.connect(url, auth={"token": token}, transports=["websocket"])
+    await asyncio.sleep(1)
+
+    expected = args.messages * args.listeners
+    start = time.perf_counter()
+    for i in range(args.messages):
+        text = f"bench-{i}"
+        pending[text] = time.perf_counter()
+        await sender.emit("send_message", {
+            "sender_id": "B001", "receiver_id": "TLB001", "chat_id": chat_id,
+            "message": text, "task_code": "ACT-0001"
+        })
+        if args.interval:
+            await asyncio.sleep(args.interval / 1000)
+
+    deadline = time.perf_counter() + 60
+    while len(latencies) < expected and time.perf_counter() < deadline:
+        await asyncio.sleep(0.1)
+    elapsed = time.perf_counter() - start
+
+    print(f"fan-out: {len(latencies)}/{expected} deliveries to {args.listeners} listeners in {elapsed:.1f}s, "
+          f"{args.messages / elapsed:.0f} msg/s")
+    if latencies:
+        print(f"latency ms: p50={percentile(latencies, 50):.1f} p99={percentile(latencies, 99):.1f} "
+              f"max={max(latencies):.1f}")
+    print(f"server RSS after load: {rss_kib(server_pid) / 1024:.1f} MiB")
+
+    for c in idle + listeners + [sender]:
+        await c.disconnect()
+    return len(latencies) == expected and not failed
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--mode", default="eventlet", choices=["threading", "eventlet", "gevent"])
+    parser.add_argument("--idle", type=int, default=2000)
+    parser.add_argument("--listeners", type=int, default=50)
+    parser.add_argument("--messages", type=int, default=200)
+    parser.add_argument("--interval", type=float, default=5, help="ms between sends")
+    parser.add_argument("--port", type=int, default=5201)
+    args = parser.parse_args()
+
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    resource.setrlimit(resource.RLIMIT_NOFILE, (hard, hard))
+
+    # The server inherits _support's DATABASE_URL, so it sees the seeded chat
+    env = {
+        "ASYNC_MODE": args.mode,
+        "FLASK_DEBUG": "0",
+        "PORT": str(args.port),
+        "WORKER_CONNECTIONS": str(args.idle + args.listeners + 100),
+    }
+    chat_id, token = seed(dict(env, ASYNC_MODE="threading"))
+
+    server = subprocess.Popen([sys.executable, "run.py"], cwd=ROOT, env={**os.environ, **env},
+                              stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        url = f"http://127.0.0.1:{args.port}"
+        deadline = time.time() + 30
+        while True:
+            try:
+                urllib.request.urlopen(f"{url}/socket.io/?EIO=4&transport=polling", timeout=1)
+                break
+            except Exception:
+                if time.time() > deadline:
+                    raise RuntimeError("server did not start")
+                time.sleep(0.3)
+
+        print(f"mode={args.mode}")
+        ok = asyncio.run(run(args, url, token, chat_id, server.pid))
+    finally:
+        server.terminate()
+        server.wait()
+
+    if not ok:
+        print("FAIL: connections were refused or not every message reached every listener")
+        sys.exit(1)
+    print("OK")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+# benchmarks/bench_task_bulk.py
+"""
+Seeds a throwaway SQLite database and measures POST /api/tasks/bulk.
+
+The payload mixes generated ("PENDING") codes, fresh explicit codes and
+codes that already exist, so both the reserved block and the conflict
+suffixing are exercised. Exits non-zero if the statement count grows with
+the number of rows or if any row is missing from the per-row results.
+
+Usage: python benchmarks/bench_task_bulk.py [--rows 10000] [--clients 50]
+"""
+import argparse
+import sys
+import time
+
+from _support import admin_token
+
+from sqlalchemy import event, insert
+
+from app import create_app
+from app.extensions import db
+from app.models.client import Client
+from app.models.task import Task
+
+# Statements per 1,000 rows (IN checks + INSERT chunks) plus a fixed overhead
+MAX_QUERIES_PER_1K = 4
+BASE_QUERIES = 10
+
+
+def seed(n_clients, n_existing):
+    db.session.execute(insert(Client), [
+        {"client_id": f"C{i:03}", "client_name": f"Client {i}", "slug": f"client-{i}-c{i:03}", "status": "Pending"}
+        for i in range(1, n_clients + 1)
+    ])
+    db.session.execute(insert(Task), [
+        {"activity_code": f"IMP-{i:05}", "client_id": "C001", "team": "SEO", "status": "Pending"}
+        for i in range(n_existing)
+    ])
+    db.session.commit()
+
+
+def payload(n_rows, n_clients, n_existing):
+    rows = []
+    for i in range(n_rows):
+        if i % 3 == 0:
+            code = "PENDING"
+        elif i % 3 == 1 and i < n_existing * 3:
+            code = f"IMP-{i // 3:05}"         # already in the table
+        else:
+            code = f"NEW-{i:05}"
+        rows.append({
+            "activityCode": code,
+            "clientID": f"C{(i % n_clients) + 1:03}",
+            "team": "SEO",
+            "serviceType": "Blog",
+            "amount": 1,
+            "minutes": 30
+        })
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=10000)
+    parser.add_argument("--clients", type=int, default=50)
+    args = parser.parse_args()
+    n_existing = args.rows // 10
+
+    app = create_app()
+    with app.app_context():
+        seed(args.clients, n_existing)
+        token = admin_token()
+
+        statements = []
+        event.listen(db.engine, "before_cursor_execute", lambda *a: statements.append(a[2]))
+
+    client = app.test_client()
+    body = payload(args.rows, args.clients, n_existing)
+    start = time.perf_counter()
+    res = client.post("/api/tasks/bulk", json=body, headers={"Authorization": f"Bearer {token}"})
+    elapsed = (time.perf_counter() - start) * 1000
+    data = res.get_json()
+
+    statuses = {}
+    for r in data.get("results", []):
+        statuses[r.get("status")] = statuses.get(r.get("status"), 0) + 1
+    count = len(statements)
+    print(f"rows={args.rows} status={res.status_code} queries={count} time={elapsed:.1f} ms results={statuses}")
+
+    with app.app_context():
+        stored = Task.query.count()
+    limit = BASE_QUERIES + MAX_QUERIES_PER_1K * (args.rows // 1000 + 1)
+    if res.status_code != 201 or len(data.get("results", [])) != args.rows or count > limit \
+            or stored != n_existing + args.rows:
+        print(f"FAIL: expected 201, {args.rows} results, <= {limit} queries and {n_existing + args.rows} stored tasks")
+        sys.exit(1)
+    print("OK")
+
+
+if __name__ == "__main__":
+    main()
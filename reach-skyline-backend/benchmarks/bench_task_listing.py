@@ -0,0 +1,141 @@
+# benchmarks/bench_task_listing.py
+"""
+Seeds a throwaway SQLite database and measures GET /api/tasks.
+
+Also acts as the query-count regression check for task serialization:
+the listing must not issue one `clients` lookup per task. Exits non-zero
+if the statement count grows with the number of tasks, if a walk over
+every order=updated_at page loses or repeats a task (timestamps with and
+without microseconds, ties), or if a cursor from another listing mode or
+a malformed date filter is not rejected with a 400. The team board
+(/api/seo/tasks) must return summaries with empty `tasks` unless a group
+is expanded.
+
+Usage: python benchmarks/bench_task_listing.py [--tasks 5000] [--clients 50]
+"""
+import argparse
+import sys
+import time
+from datetime import datetime, timedelta
+
+from _support import admin_token
+
+from sqlalchemy import event, insert
+
+from app import create_app
+from app.extensions import db
+from app.models.client import Client
+from app.models.task import Task
+from app.utils.helpers import encode_cursor
+
+MAX_QUERIES = 5
+
+
+def seed(n_tasks, n_clients):
+    db.session.execute(insert(Client), [
+        {"client_id": f"C{i:03}", "client_name": f"Client {i}", "slug": f"client-{i}-c{i:03}", "status": "Pending"}
+        for i in range(1, n_clients + 1)
+    ])
+    db.session.execute(insert(Task), [
+        {
+            "activity_code": f"ACT-{i:05}",
+            "client_id": f"C{(i % n_clients) + 1:03}",
+            "team": "SEO",
+            "status": "Pending",
+            "content_type": "Blog",
+            "amount": 1,
+            "minutes": 30,
+        }
+        for i in range(1, n_tasks + 1)
+    ])
+    db.session.commit()
+
+
+def seed_timestamps(client_id="C999", n_tasks=30):
+    """Tasks sharing and not sharing updated_at values, some on whole seconds."""
+    db.session.add(Client(client_id=client_id, client_name="Timestamps", slug="timestamps", status="Pending"))
+    base = datetime(2026, 3, 14, 9, 30)
+    for i in range(n_tasks):
+        stamp = base + timedelta(seconds=i // 3, microseconds=0 if i % 2 else 1000 * i)
+        task = Task(activity_code=f"ACT-T{i:04}", client_id=client_id, team="SEO", status="Pending")
+        db.session.add(task)
+        db.session.flush()
+        task.updated_at = stamp
+    db.session.commit()
+
+
+def walk_updated_at(client, headers, client_id="C999", limit=7):
+    """Task ids from every order=updated_at page of one client's tasks."""
+    seen, cursor = [], None
+    while True:
+        path = f"/api/tasks?client_id={client_id}&order=updated_at&limit={limit}" + (f"&cursor={cursor}" if cursor else "")
+        body = client.get(path, headers=headers).get_json()
+        seen.extend(t["id"] for t in body["items"])
+        cursor = body["nextCursor"]
+        if not cursor:
+            return seen
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--tasks", type=int, default=5000)
+    parser.add_argument("--clients", type=int, default=50)
+    args = parser.parse_args()
+
+    app = create_app()
+    with app.app_context():
+        seed(args.tasks, args.clients)
+        seed_timestamps()
+        expected = Task.query.filter_by(client_id="C999").count()
+        token = admin_token()
+
+        statements = []
+        event.listen(db.engine, "before_cursor_execute", lambda *a: statements.append(a[2]))
+
+    client = app.test_client()
+    headers = {"Authorization": f"Bearer {token}"}
+    failed = False
+    for path in ["/api/tasks", "/api/tasks?group_by_client=true", "/api/seo/tasks"]:
+        statements.clear()
+        start = time.perf_counter()
+        res = client.get(path, headers=headers)
+        elapsed = (time.perf_counter() - start) * 1000
+        count = len(statements)
+        print(f"{path:40} status={res.status_code} queries={count:3} time={elapsed:8.1f} ms")
+        if res.status_code != 200 or count > MAX_QUERIES:
+            failed = True
+
+    # Team board: summaries only by default; rows for the expanded groups alone
+    board = client.get("/api/seo/tasks", headers=headers).get_json()
+    expanded_id = board[0]["clientID"]
+    expanded = client.get(f"/api/seo/tasks?expand={expanded_id}", headers=headers).get_json()
+    rows = client.get(f"/api/seo/tasks/client/{expanded_id}", headers=headers).get_json()
+    board_ok = (all(g["tasks"] == [] for g in board)
+                and all(g["tasks"] == (rows if g["clientID"] == expanded_id else []) for g in expanded)
+                and len(rows) == board[0]["count"])
+    print(f"{'team board: rows only for expanded groups':40} {board_ok}")
+    failed |= not board_ok
+
+    # Every page of the (updated_at, id) keyset: no task lost or repeated
+    seen = walk_updated_at(client, headers)
+    print(f"{'order=updated_at walk':40} tasks={len(set(seen))}/{expected} pages of 7")
+    if len(seen) != expected or len(set(seen)) != expected:
+        failed = True
+
+    # A cursor replayed against another listing mode is a 400, not a 500
+    cursor = client.get("/api/tasks?order=updated_at&limit=10", headers=headers).get_json()["nextCursor"]
+    for path in [f"/api/tasks?group_by_client=true&cursor={cursor}", f"/api/tasks?cursor={encode_cursor({'u': 1})}",
+                 "/api/tasks?date_to=bad", "/api/tasks?date_from=2026-13-01"]:
+        status = client.get(path, headers=headers).status_code
+        print(f"{path[:40]:40} status={status}")
+        if status != 400:
+            failed = True
+
+    if failed:
+        print(f"FAIL: expected <= {MAX_QUERIES} queries per listing, complete keyset walks and 400 for mismatched cursors and bad dates")
+        sys.exit(1)
+    print("OK")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,223 @@
+# benchmarks/bench_thumbnail_proxy.py
+"""
+Times the Media Hub grid's thumbnails through GET /api/media/assets/<id>/thumb.
+
+A local HTTP server stands in for Drive's thumbnail host (--latency per
+image). Measures loading --assets thumbnails straight from the "Drive"
+links, through the proxy cold, after the post-sync prefetch, and again
+from the cache, and checks the proxy's contract: signed URLs only, and
+not once expired or when SECRET_KEY is the built-in default outside
+development, strong ETag + immutable caching until the URL expires,
+304 on If-None-Match, redirect once the
+Drive version changed, 404 / 503 when Drive cannot supply a fresh link,
+and the size-bounded LRU eviction, also with a second worker process
+(a second ThumbnailCache) sharing the directory.
+
+Usage: python benchmarks/bench_thumbnail_proxy.py [--assets 200] [--latency 0.05]
+"""
+import argparse
+import os
+import sys
+import threading
+import time
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from _support import TMP, admin_token, environ, expect
+
+environ(MEDIA_THUMB_CACHE_DIR=os.path.join(TMP, "thumb_cache"), SECRET_KEY="bench-thumbnail-proxy-secret")
+os.chdir(TMP)   # no token.json here: Drive itself is never called
+
+from app import create_app  # noqa: E402
+from app.config import DEFAULT_SECRET_KEY  # noqa: E402
+from app.extensions import db  # noqa: E402
+from app.models.media_asset import MediaAsset  # noqa: E402
+from app.services.thumbnail_cache import ThumbnailCache, thumbnail_cache  # noqa: E402
+from googleapiclient.errors import HttpError  # noqa: E402
+from httplib2 import Response  # noqa: E402
+
+IMAGE = b"\xff\xd8\xff\xe0" + os.urandom(12 * 1024)
+
+
+class ThumbHost(BaseHTTPRequestHandler):
+    latency = 0.0
+    hits = 0
+
+    def do_GET(self):
+        time.sleep(self.latency)
+        ThumbHost.hits += 1
+        if self.path.startswith("/expired/"):
+            self.send_response(403)
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", "image/jpeg")
+        self.send_header("Content-Length", str(len(IMAGE)))
+        self.end_headers()
+        self.wfile.write(IMAGE)
+
+    def log_message(self, *args):
+        pass
+
+
+def load_grid(client, urls, workers=6):
+    """Fetches urls like a browser would (a few connections in parallel); returns seconds."""
+    chunks = [urls[i::workers] for i in range(workers)]
+    statuses = []
+
+    def run(chunk):
+        for url in chunk:
+            statuses.append(client.get(url).status_code)
+
+    start = time.perf_counter()
+    threads = [threading.Thread(target=run, args=(c,)) for c in chunks]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return time.perf_counter() - start, statuses
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--assets", type=int, default=200)
+    parser.add_argument("--latency", type=float, default=0.05)
+    args = parser.parse_args()
+
+    ThumbHost.latency = args.latency
+    server = ThreadingHTTPServer(("127.0.0.1", 0), ThumbHost)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    host = f"http://127.0.0.1:{server.server_port}"
+
+    app = create_app()
+    ok = True
+    with app.app_context():
+        now = datetime.utcnow()
+        db.session.add_all([MediaAsset(
+            drive_file_id=f"file-{i}", filename=f"clip-{i}.mp4", mime_type="video/mp4",
+            thumbnail_url=f"{host}/thumb/file-{i}=s220", project_name="Bench", shoot_day=1,
+            drive_modified_at=now, created_at=now - timedelta(seconds=i)
+        ) for i in range(args.assets)])
+        db.session.commit()
+        assets = MediaAsset.query.order_by(MediaAsset.id).all()
+        urls = [a.to_dict()["thumb_url"] for a in assets]
+        token = admin_token()
+
+    client = app.test_client()
+    import requests
+    session = requests.Session()
+    direct_links = [f"{host}/thumb/file-{i}=s400" for i in range(args.assets // 2)]
+    start = time.perf_counter()
+    for link in direct_links:
+        session.get(link)
+    direct = (time.perf_counter() - start) * 2
+    print(f"     straight from Drive (serial, estimated for {args.assets}): {direct:.2f} s")
+
+    half = args.assets // 2
+    cold, statuses = load_grid(client, urls[:half])
+    ok &= expect("cold proxy: all 200", set(statuses), {200})
+    print(f"     proxy, cold ({half} misses): {cold:.2f} s")
+
+    ThumbHost.hits = 0
+    thumbnail_cache.prefetch(app, limit=args.assets, workers=4)
+    ok &= expect("prefetch downloads only what is missing", ThumbHost.hits, args.assets - half)
+
+    ThumbHost.hits = 0
+    warm, statuses = load_grid(client, urls)
+    ok &= expect("warm proxy: all 200, no downloads", (set(statuses), ThumbHost.hits), ({200}, 0))
+    print(f"     proxy, from cache ({args.assets} tiles): {warm:.3f} s "
+          f"({warm / args.assets * 1000:.2f} ms per tile)")
+    ok &= expect("cache at interactive speed (< 5 ms per tile)", warm / args.assets < 0.005, True)
+
+    resp = client.get(urls[0])
+    etag = resp.headers.get("ETag", "")
+    ok &= expect("strong ETag", etag.startswith('"') and not etag.startswith("W/"), True)
+    ttl = thumbnail_cache.url_ttl
+    max_age = int(resp.headers.get("Cache-Control", "").split("max-age=")[1].split(",")[0])
+    ok &= expect("Cache-Control: immutable until the URL expires",
+                 (resp.headers.get("Cache-Control").endswith("immutable"), ttl < max_age <= 2 * ttl), (True, True))
+    ok &= expect("Content-Type", resp.mimetype, "image/jpeg")
+    ok &= expect("If-None-Match -> 304", client.get(urls[0], headers={"If-None-Match": etag}).status_code, 304)
+    ok &= expect("bad signature -> 403", client.get(urls[0][:-4] + "0000").status_code, 403)
+    expired = int(time.time()) - 1
+    version = urls[0].split("v=")[1].split("&")[0]
+    signed_expired = (f"/api/media/assets/{assets[0].id}/thumb?v={version}&e={expired}"
+                      f"&sig={thumbnail_cache.signature(assets[0].id, version, expired)}")
+    ok &= expect("expired URL -> 403", client.get(signed_expired).status_code, 403)
+    later = urls[0].replace("&e=", "&e=9")
+    ok &= expect("expiry pushed back by hand -> 403", client.get(later).status_code, 403)
+    ok &= expect("URL stable within a TTL window", urls[0] == client.get(
+        "/api/media/assets", headers={"Authorization": f"Bearer {token}"}).get_json()[0]["thumb_url"], True)
+    ok &= expect("assets listing carries thumb_url", "thumb_url" in client.get(
+        "/api/media/assets", headers={"Authorization": f"Bearer {token}"}).get_json()[0], True)
+
+    with app.app_context():
+        asset = db.session.get(MediaAsset, assets[0].id)
+        asset.drive_modified_at = now + timedelta(minutes=5)
+        db.session.commit()
+        new_url = asset.to_dict()["thumb_url"]
+        resp = client.get(urls[0])
+        ok &= expect("changed in Drive -> redirect to new version",
+                     (resp.status_code, resp.headers.get("Location", "").endswith(new_url)), (302, True))
+        ok &= expect("new version downloaded", client.get(new_url).status_code, 200)
+
+        asset.thumbnail_url = f"{host}/expired/x=s220"
+        asset.drive_modified_at = now + timedelta(minutes=10)
+        db.session.commit()
+        ok &= expect("expired link, Drive not authorized -> 404",
+                     client.get(asset.to_dict()["thumb_url"]).status_code, 404)
+
+        # Drive failing while the link is refreshed
+        for label, error, status in [
+            ("file gone from Drive -> 404", HttpError(Response({"status": "404"}), b"{}"), 404),
+            ("Drive keeps rate limiting -> 503", RuntimeError("Drive kept rate limiting"), 503),
+            ("Drive 500 after retries -> 503", HttpError(Response({"status": "500"}), b"{}"), 503),
+        ]:
+            def drive_down(drive_file_ids, error=error):
+                raise error
+            thumbnail_cache.fresh_links = drive_down
+            ok &= expect(label, client.get(asset.to_dict()["thumb_url"]).status_code, status)
+        del thumbnail_cache.fresh_links
+
+    limit = 20 * len(IMAGE)
+    thumbnail_cache.max_bytes = limit
+    thumbnail_cache.put("evict-probe", "1", IMAGE, ".jpg")
+    files = sum(len(f) for _, _, f in os.walk(thumbnail_cache.directory))
+    ok &= expect("LRU keeps the cache under its cap", (thumbnail_cache._total <= limit, files), (True, 20))
+    ok &= expect("most recent entry kept", thumbnail_cache.get("evict-probe", "1") is not None, True)
+
+    # A second worker process shares the directory
+    other = ThumbnailCache(app)
+    other.max_bytes = limit
+    other.put("other-worker", "1", IMAGE, ".jpg")
+    ThumbHost.hits = 0
+    path, _ = thumbnail_cache.fetch("other-worker", "1", f"{host}/thumb/other-worker=s220")
+    ok &= expect("file cached by another worker served without downloading", (path is not None, ThumbHost.hits),
+                 (True, 0))
+
+    for i in range(10):
+        other.put(f"other-{i}", "1", IMAGE, ".jpg")
+    thumbnail_cache._scanned_at = 0   # RESCAN_INTERVAL elapsed
+    thumbnail_cache.put("after-other", "1", IMAGE, ".jpg")
+    files = sum(len(f) for _, _, f in os.walk(thumbnail_cache.directory))
+    ok &= expect("cap holds across workers", files, 20)
+
+    # Built-in SECRET_KEY: signed in development only
+    app.config["SECRET_KEY"] = DEFAULT_SECRET_KEY
+    with app.app_context():
+        asset = db.session.get(MediaAsset, assets[1].id)
+        unsigned = ThumbnailCache(app)
+        ok &= expect("default SECRET_KEY outside development: nothing signed",
+                     (unsigned.url_for(asset), unsigned.verify(asset.id, "0", unsigned.expiry(), "")), (None, False))
+        app.debug = True
+        ok &= expect("default SECRET_KEY in development: signed", ThumbnailCache(app).url_for(asset) is not None, True)
+
+    server.shutdown()
+    if not ok:
+        print("FAIL")
+        sys.exit(1)
+    print("OK")
+
+
+if __name__ == "__main__":
+    main()
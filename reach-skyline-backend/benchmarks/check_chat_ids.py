@@ -0,0 +1,106 @@
+# benchmarks/check_chat_ids.py
+"""
+Checks that write-behind chat message IDs (app/services/chat_buffer.py)
+follow send order when several workers share the database.
+
+1. With SOCKETIO_MESSAGE_QUEUE set and no CHAT_ID_URL, write-behind turns
+   itself off rather than hand out per-worker ID blocks.
+2. With --redis (CHAT_ID_URL), two workers, each with its own buffer and
+   Redis connection, send alternately: IDs increase in send order and a
+   client catching up with ?after_id=<last id it saw> gets every later
+   message. A Redis that lost the counter is reseeded past stored IDs.
+   Skipped without --redis.
+3. Without a message queue (single worker) the buffer keeps reserving
+   IDs in blocks.
+
+Exits non-zero on any mismatch.
+
+Usage: python benchmarks/check_chat_ids.py [--redis redis://localhost:6379/15]
+"""
+import argparse
+import os
+import sys
+
+from _support import TMP, environ, expect, seed_chat
+
+environ(CHAT_WRITE_BEHIND="true")
+
+from app import create_app  # noqa: E402
+from app.config import Config  # noqa: E402
+from app.extensions import db  # noqa: E402
+from app.models.chat import ChatMessage  # noqa: E402
+from app.services.chat_buffer import ChatWriteBuffer, chat_buffer  # noqa: E402
+
+WORKERS = 2
+MESSAGES = 20
+
+
+def send_alternately(buffers, chat_id):
+    """Sends MESSAGES messages round-robin over the buffers; returns the IDs in send order."""
+    ids = [buffers[i % len(buffers)].add(chat_id, "TLB001", "B001", f"message {i}", task_code="ACT-0001")["id"]
+           for i in range(MESSAGES)]
+    for buffer in buffers:
+        buffer.flush()
+    return ids
+
+
+def check_redis(app, chat_id):
+    ok = True
+    workers = [ChatWriteBuffer(app) for _ in range(WORKERS)]
+    try:
+        last_id = db.session.query(db.func.max(ChatMessage.id)).scalar() or 0
+        ids = send_alternately(workers, chat_id)
+        ok &= expect("two workers: IDs increase in send order", ids == sorted(ids) and ids[0] > last_id, True)
+
+        seen = ids[MESSAGES // 2 - 1]
+        caught_up = [m.id for m in ChatMessage.query.filter(ChatMessage.chat_id == chat_id, ChatMessage.id > seen)
+                     .order_by(ChatMessage.id)]
+        ok &= expect("after_id catch-up returns every later message", caught_up, ids[MESSAGES // 2:])
+
+        workers[0]._ids._redis.delete(workers[0]._ids.key)
+        ids_after = send_alternately(workers, chat_id)
+        ok &= expect("counter lost in Redis: reseeded past stored IDs", ids_after[0] > ids[-1], True)
+    finally:
+        workers[0]._ids._redis.delete(workers[0]._ids.key)
+        for buffer in workers:
+            buffer.stop()
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--redis", help="Redis URL to check the shared CHAT_ID_URL sequence against")
+    args = parser.parse_args()
+
+    ok = True
+    Config.SOCKETIO_MESSAGE_QUEUE = f"filesystem://{os.path.join(TMP, 'socketio-queue')}"
+    Config.CHAT_ID_URL = None
+    app = create_app()
+    with app.app_context():
+        chat_id = seed_chat()
+
+        ok &= expect("queue without CHAT_ID_URL: write-behind off", chat_buffer.enabled, False)
+
+        if args.redis:
+            Config.CHAT_ID_URL = args.redis
+            ok &= check_redis(create_app(), chat_id)
+        else:
+            print("skip two workers sharing a Redis sequence (pass --redis URL)")
+
+        Config.SOCKETIO_MESSAGE_QUEUE = None
+        Config.CHAT_ID_URL = None
+        single = ChatWriteBuffer(create_app())
+        ok &= expect("single worker: write-behind on", single.enabled, True)
+        ok &= expect("single worker: IDs reserved in blocks", single.id_block_size, app.config["CHAT_ID_BLOCK_SIZE"])
+        ids = send_alternately([single], chat_id)
+        ok &= expect("single worker: IDs increase in send order", ids == sorted(ids), True)
+        single.stop()
+
+    if not ok:
+        print("FAIL")
+        sys.exit(1)
+    print("OK")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+# benchmarks/check_chat_unread.py
+"""
+Checks the chat unread counters (app/services/chat_service.py) against
+the messages they count, including sends that commit on another
+connection while a counter is being recomputed.
+
+1. reconcile_unread_counts() repairs a wrong count, zeroes a counter with
+   nothing unread and recreates a missing row;
+2. a message sent while reconcile_unread_counts() runs is still counted;
+3. mark_read() zeroes the counter, but a message that arrives after it
+   read the newest message id stays unread and counted.
+
+Exits non-zero on any mismatch.
+
+Usage: python benchmarks/check_chat_unread.py
+"""
+import sys
+from datetime import datetime
+
+from _support import expect, seed_chat
+
+from sqlalchemy import event, update
+
+from app import create_app
+from app.extensions import db
+from app.models.chat import ChatMessage, ChatUnreadCounter
+from app.services import chat_service
+
+TASK_CODE = "ACT-0001"
+EMPLOYEE, TEAM_LEAD = "B001", "TLB001"
+counters = ChatUnreadCounter.__table__
+
+
+def send(chat_id, count=1):
+    """What handle_send_message does without write-behind."""
+    for i in range(count):
+        db.session.add(ChatMessage(chat_id=chat_id, sender_id=TEAM_LEAD, receiver_id=EMPLOYEE,
+                                   message_text=f"message {i}", task_code=TASK_CODE, read_status=False))
+        chat_service.increment_unread(EMPLOYEE, TASK_CODE)
+        db.session.commit()
+
+
+def send_elsewhere(chat_id):
+    """The same send, committed by another request on its own connection."""
+    with db.engine.begin() as conn:
+        conn.execute(ChatMessage.__table__.insert().values(
+            chat_id=chat_id, sender_id=TEAM_LEAD, receiver_id=EMPLOYEE, message_text="concurrent",
+            task_code=TASK_CODE, read_status=False, created_at=datetime.utcnow()
+        ))
+        conn.execute(update(counters).where(counters.c.receiver_id == EMPLOYEE, counters.c.task_code == TASK_CODE)
+                     .values(unread_count=counters.c.unread_count + 1))
+
+
+def interleave(chat_id, statement_prefixes):
+    """Runs send_elsewhere() right before the next statement starting with one of statement_prefixes."""
+    state = {"armed": True}
+
+    def before(conn, cursor, statement, parameters, context, executemany):
+        if state["armed"] and statement.lstrip().startswith(statement_prefixes):
+            state["armed"] = False
+            send_elsewhere(chat_id)
+
+    event.listen(db.engine, "before_cursor_execute", before)
+    return lambda: event.remove(db.engine, "before_cursor_execute", before)
+
+
+def unread():
+    db.session.expire_all()
+    return chat_service.get_unread_counts(EMPLOYEE)
+
+
+def main():
+    app = create_app()
+    ok = True
+    with app.app_context():
+        chat_id = seed_chat()
+        send(chat_id, 5)
+
+        # 1. drift repaired in place
+        db.session.execute(update(counters).values(unread_count=42))
+        chat_service.increment_unread(EMPLOYEE, "ACT-GONE", by=3)
+        db.session.commit()
+        chat_service.reconcile_unread_counts()
+        ok &= expect("wrong count repaired, stale counter zeroed", unread(), {TASK_CODE: 5})
+
+        db.session.execute(counters.delete())
+        db.session.commit()
+        chat_service.reconcile_unread_counts()
+        ok &= expect("missing counter recreated", unread(), {TASK_CODE: 5})
+
+        # 2. a send lands between reading the messages and writing the counters
+        db.session.execute(update(counters).values(unread_count=0))
+        db.session.commit()
+        stop = interleave(chat_id, ("UPDATE chat_unread_counters", "DELETE FROM chat_unread_counters"))
+        chat_service.reconcile_unread_counts()
+        stop()
+        ok &= expect("send during reconcile still counted", unread(), {TASK_CODE: 6})
+
+        # 3. mark as read
+        chat_service.mark_read(EMPLOYEE, TASK_CODE)
+        db.session.commit()
+        ok &= expect("mark_read zeroes the counter", unread(), {})
+
+        send(chat_id, 2)
+        stop = interleave(chat_id, ("INSERT INTO chat_read_watermarks",))
+        chat_service.mark_read(EMPLOYEE, TASK_CODE)
+        db.session.commit()
+        stop()
+        newest = db.session.query(db.func.max(ChatMessage.id)).scalar()
+        read = chat_service.serialize_messages([db.session.get(ChatMessage, newest)], chat_id)[0]["read_status"]
+        ok &= expect("send during mark_read: counted, not read", (unread(), read), ({TASK_CODE: 1}, False))
+        chat_service.reconcile_unread_counts()
+        ok &= expect("reconcile agrees", unread(), {TASK_CODE: 1})
+
+    if not ok:
+        print("FAIL")
+        sys.exit(1)
+    print("OK")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+# benchmarks/check_drive_crawl.py
+"""
+Checks the recursive Drive crawl against benchmarks/fake_drive.py (no network).
+
+1. a full sync walks nested Client/Day N/... folders, imports their media
+   and derives project_name / shoot_day / shoot_date from the path;
+2. a file added to a known day folder is picked up incrementally;
+3. a new folder in the tree makes the next sync fall back to a full crawl;
+4. a manually assigned project survives a re-sync;
+5. crawling a tree with simulated Drive latency, --workers threads beat one.
+
+Exits non-zero on any mismatch.
+
+Usage: python benchmarks/check_drive_crawl.py [--workers 8] [--clients 6] [--latency 0.02]
+"""
+import argparse
+import sys
+import time
+from datetime import date
+
+from _support import environ, expect
+
+environ(DRIVE_REQUESTS_PER_SECOND=0)
+
+from app import create_app  # noqa: E402
+from app.extensions import db  # noqa: E402
+from app.models.media_asset import MediaAsset  # noqa: E402
+from app.services.drive_crawler import DriveCrawler  # noqa: E402
+from app.services.drive_sync import sync_drive_folder  # noqa: E402
+from fake_drive import FakeDrive  # noqa: E402
+
+FOLDER = "shoots"
+
+
+def run_sync(drive, full=False):
+    before = drive.calls
+    result = sync_drive_folder(drive, FOLDER, full=full)
+    print(f"     {result['mode']} sync: {drive.calls - before} Drive calls, "
+          f"{result['folders']} folders, +{result['added']} ~{result['updated']} -{result['removed']}")
+    return result
+
+
+def derived(file_id):
+    asset = MediaAsset.query.filter_by(drive_file_id=file_id).one()
+    return asset.project_name, asset.shoot_day, asset.shoot_date
+
+
+def build_tree(drive, clients, days=3, cameras=2, clips=3):
+    for c in range(clients):
+        client = drive.add_folder(f"Client {c}", FOLDER)
+        for d in range(1, days + 1):
+            day = drive.add_folder(f"Day {d}", client)
+            for cam in range(cameras):
+                camera = drive.add_folder(f"Camera {cam}", day)
+                for i in range(clips):
+                    drive.add_file(f"c{c}-d{d}-cam{cam}-{i}.mp4", camera)
+
+
+def time_crawl(drive, workers):
+    start = time.perf_counter()
+    folders = list(DriveCrawler(lambda: drive, FOLDER, workers).crawl())
+    return time.perf_counter() - start, len(folders), sum(len(f.files) for f in folders)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--clients", type=int, default=6)
+    parser.add_argument("--latency", type=float, default=0.02)
+    args = parser.parse_args()
+
+    drive = FakeDrive()
+    acme = drive.add_folder("Acme Dental", FOLDER)
+    day1 = drive.add_folder("Day 1 - 2026-03-14", acme)
+    cam_a = drive.add_folder("Camera A", day1)
+    day1_clip = drive.add_file("a001.mp4", cam_a)
+    day2 = drive.add_folder("Day 2", acme)
+    day2_clip = drive.add_file("b001.mov", day2, mime_type="video/quicktime")
+    beta = drive.add_folder("Beta Foods", FOLDER)
+    dated = drive.add_folder("2026-04-01", beta)
+    dated_clip = drive.add_file("still.jpg", dated, mime_type="image/jpeg")
+    loose_clip = drive.add_file("loose.mp4", FOLDER)
+    drive.add_file("elsewhere.mp4", "other-folder")
+
+    app = create_app()
+    ok = True
+    with app.app_context():
+        result = run_sync(drive)
+        ok &= expect("full crawl: folders / assets", (result["folders"], MediaAsset.query.count()), (7, 4))
+        ok &= expect("Client/Day N - date/Camera", derived(day1_clip), ("Acme Dental", 1, date(2026, 3, 14)))
+        ok &= expect("Client/Day N", derived(day2_clip), ("Acme Dental", 2, None))
+        ok &= expect("Client/date", derived(dated_clip), ("Beta Foods", 1, date(2026, 4, 1)))
+        ok &= expect("root file", derived(loose_clip), ("Unassigned", 1, None))
+
+        new_clip = drive.add_file("b002.mp4", day2)
+        result = run_sync(drive)
+        ok &= expect("file in known folder: mode", result["mode"], "incremental")
+        ok &= expect("file in known folder: derived", derived(new_clip), ("Acme Dental", 2, None))
+
+        day3 = drive.add_folder("Day 3 - 15.03.2026", acme)
+        day3_clip = drive.add_file("c001.mp4", day3)
+        result = run_sync(drive)
+        ok &= expect("new folder: mode", result["mode"], "full")
+        ok &= expect("new folder: derived", derived(day3_clip), ("Acme Dental", 3, date(2026, 3, 15)))
+
+        drive.move(day2, beta)
+        result = run_sync(drive)
+        ok &= expect("moved folder: mode", result["mode"], "full")
+        ok &= expect("moved folder keeps assigned project", derived(day2_clip)[0], "Acme Dental")
+
+        MediaAsset.query.filter_by(drive_file_id=day1_clip).update({"project_name": "Acme Rebrand"})
+        db.session.commit()
+        drive.rename(day1_clip, "a001-final.mp4")
+        run_sync(drive, full=True)
+        asset = MediaAsset.query.filter_by(drive_file_id=day1_clip).one()
+        ok &= expect("manual project kept, rename applied", (asset.project_name, asset.filename),
+                     ("Acme Rebrand", "a001-final.mp4"))
+
+    tree = FakeDrive(latency=args.latency)
+    build_tree(tree, args.clients)
+    serial, folders, files = time_crawl(tree, 1)
+    parallel, folders_p, files_p = time_crawl(tree, args.workers)
+    print(f"     crawl of {folders} folders / {files} files at {args.latency * 1000:.0f} ms per call: "
+          f"1 worker {serial:.2f} s, {args.workers} workers {parallel:.2f} s ({serial / parallel:.1f}x)")
+    ok &= expect("parallel crawl finds the same tree", (folders_p, files_p), (folders, files))
+    ok &= expect("parallel crawl faster", parallel < serial / 2, True)
+
+    if not ok:
+        print("FAIL")
+        sys.exit(1)
+    print("OK")
+
+
+if __name__ == "__main__":
+    main()
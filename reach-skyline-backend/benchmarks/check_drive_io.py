@@ -0,0 +1,155 @@
+# benchmarks/check_drive_io.py
+"""
+Checks the Drive I/O layer (app/utils/google_drive.py) through a real
+googleapiclient service on the replayable transport in fake_drive_http.py.
+
+1. get_files() fetches 250 files in 3 batch round trips and leaves out
+   ids Drive does not have;
+2. rate-limited and 5xx calls - single, whole-batch and inside a batch -
+   are retried with backoff and counted; a 429 halves the request rate;
+3. permanent errors (404, plain 403) are raised without retrying, and a
+   call that keeps failing gives up after DRIVE_MAX_RETRIES;
+4. the token bucket holds a burst of calls to the configured rate; it is
+   configured once by create_app, and starting a sync keeps the rate a
+   429 lowered;
+5. a full and an incremental sync succeed while Drive throttles them;
+6. a file whose metadata Drive refuses is reported in the sync's errors
+   and kept, and the rest of the sync still applies.
+
+Exits non-zero on any mismatch.
+
+Usage: python benchmarks/check_drive_io.py
+"""
+import sys
+import time
+
+from _support import environ, expect
+
+environ(DRIVE_REQUESTS_PER_SECOND=0, DRIVE_MAX_RETRIES=3, DRIVE_RETRY_BASE_DELAY=0.005, DRIVE_RETRY_MAX_DELAY=0.05)
+
+from googleapiclient.errors import HttpError  # noqa: E402
+
+from app import create_app  # noqa: E402
+from app.models.media_asset import MediaAsset  # noqa: E402
+from app.services.drive_sync import DriveSyncEngine, sync_drive_folder  # noqa: E402
+from app.utils.google_drive import drive_stats, execute, get_files, rate_limiter, retry_policy  # noqa: E402
+from fake_drive import FakeDrive  # noqa: E402
+from fake_drive_http import FakeDriveHttp, build_service  # noqa: E402
+
+FOLDER = "shoots"
+
+
+def counted(fn):
+    """Runs fn; returns (result or raised exception, Drive counters it added)."""
+    before = drive_stats.snapshot()
+    try:
+        result = fn()
+    except Exception as e:
+        result = e
+    delta = drive_stats.since(before)
+    return result, (delta["requests"], delta["batches"], delta["retries"], delta["throttled"])
+
+
+def status_of(result):
+    return result.resp.status if isinstance(result, HttpError) else "ok"
+
+
+def main():
+    app = create_app()
+    ok = True
+    ok &= expect("create_app applied DRIVE_MAX_RETRIES", retry_policy.max_retries, 3)
+
+    drive = FakeDrive()
+    ids = [drive.add_file(f"clip-{i}.mp4", FOLDER) for i in range(250)]
+    http = FakeDriveHttp(drive)
+    service = build_service(http)
+    get = lambda file_id: execute(service.files().get(fileId=file_id))  # noqa: E731
+
+    # 1. batching
+    found, counts = counted(lambda: get_files(service, ids + ["missing"]))
+    ok &= expect("get_files: found / round trips", (len(found), sum(1 for c in http.log if c[0] == "POST")), (250, 3))
+    ok &= expect("get_files: requests, batches, retries, throttled", counts, (251, 3, 0, 0))
+
+    # 2. retries
+    rate_limiter.configure(1000)
+    http.faults = [429, 503]
+    result, counts = counted(lambda: get(ids[0]))
+    ok &= expect("429 then 503, then ok", (status_of(result), counts), ("ok", (3, 0, 2, 1)))
+    ok &= expect("rate halved by the 429, +2% for the success", rate_limiter.rate, 520)
+    for _ in range(100):
+        get(ids[0])
+    ok &= expect("rate recovered after successes", rate_limiter.rate, 1000)
+    rate_limiter.configure(0)
+
+    http.faults = [503]
+    result, counts = counted(lambda: get_files(service, ids[:10]))
+    ok &= expect("whole batch 503, resent", (len(result), counts), (10, (20, 1, 1, 0)))
+
+    http.faults = [None, None, 429, None, 403]
+    result, counts = counted(lambda: get_files(service, ids[:10]))
+    ok &= expect("2 calls in batch rate limited, resent", (len(result), counts), (10, (12, 2, 1, 2)))
+
+    # 3. permanent errors and giving up
+    result, counts = counted(lambda: get("missing"))
+    ok &= expect("404 not retried", (status_of(result), counts), (404, (1, 0, 0, 0)))
+
+    http.faults = [(403, "insufficientFilePermissions")]
+    result, counts = counted(lambda: get(ids[0]))
+    ok &= expect("permission 403 not retried", (status_of(result), counts), (403, (1, 0, 0, 0)))
+
+    http.faults = [500] * 10
+    result, counts = counted(lambda: get(ids[0]))
+    ok &= expect("gives up after 3 retries", (status_of(result), counts), (500, (4, 0, 3, 0)))
+    http.faults = []
+
+    # 4. token bucket
+    rate_limiter.configure(200, burst=10)
+    start = time.perf_counter()
+    for _ in range(110):
+        rate_limiter.acquire()
+    elapsed = time.perf_counter() - start
+    ok &= expect("110 calls at 200/s, burst 10, take ~0.5 s", 0.45 <= elapsed <= 0.6, True)
+    rate_limiter.throttled()
+    with app.app_context():
+        DriveSyncEngine(service, FOLDER)
+    ok &= expect("a new sync keeps the lowered rate", rate_limiter.rate, 100)
+    rate_limiter.configure(0)
+
+    # 5. sync under throttling
+    with app.app_context():
+        # The first call of each sync resolves the folder ID
+        http.faults = [None, None, 429, 503]
+        result = sync_drive_folder(service, FOLDER)
+        ok &= expect("full sync under throttling: mode, assets, retries",
+                     (result["mode"], MediaAsset.query.count(), result["drive_io"]["retries"]), ("full", 250, 2))
+        print(f"     drive_io: {result['drive_io']}")
+
+        new_ids = [drive.add_file(f"new-{i}.mp4", FOLDER) for i in range(150)]
+        drive.rename(ids[0], "renamed.mp4")
+        http.faults = [None, None, 429, None, 503]
+        result = sync_drive_folder(service, FOLDER)
+        ok &= expect("incremental sync under throttling: mode, added, updated",
+                     (result["mode"], result["added"], result["updated"]), ("incremental", 150, 1))
+        ok &= expect("incremental sync: batches, retries", (result["drive_io"]["batches"], result["drive_io"]["retries"]),
+                     (3, 2))
+        ok &= expect("assets after incremental", MediaAsset.query.count(), 250 + len(new_ids))
+        print(f"     drive_io: {result['drive_io']}")
+
+        # 6. a file Drive refuses to describe
+        drive.rename(ids[1], "refused.mp4")
+        drive.rename(ids[2], "allowed.mp4")
+        http.faults = [None, None, None, (403, "insufficientFilePermissions")]
+        result = sync_drive_folder(service, FOLDER)
+        ok &= expect("refused file: mode, updated, removed, errors",
+                     (result["mode"], result["updated"], result["removed"], result["error_count"]),
+                     ("incremental", 1, 0, 1))
+        ok &= expect("refused file kept", MediaAsset.query.count(), 250 + len(new_ids))
+
+    if not ok:
+        print("FAIL")
+        sys.exit(1)
+    print("OK")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+# benchmarks/check_drive_sync.py
+"""
+Checks the Drive sync engine against benchmarks/fake_drive.py (no network).
+
+1. a first sync of a folder bigger than one page imports every file;
+2. after adds, renames, trashes, deletes and moves, the next sync reads
+   only the changes feed and applies exactly those;
+3. an expired changes token falls back to a full re-list;
+4. a background sync job (app/services/media_sync_jobs.py) builds its
+   Drive service on its own thread instead of reusing the requester's;
+5. syncing the 'root' alias keys its state on the real root ID, so files
+   added directly under it or in its subfolders sync incrementally;
+6. a full sync of one root leaves the assets of other roots alone.
+
+Exits non-zero on any mismatch. Prints Drive round-trips per sync.
+
+Usage: python benchmarks/check_drive_sync.py [--files 2500]
+"""
+import argparse
+import sys
+import threading
+import time
+
+from _support import environ, expect
+
+environ(DRIVE_REQUESTS_PER_SECOND=0, MEDIA_THUMB_PREFETCH_LIMIT=0)
+
+from app import create_app  # noqa: E402
+from app.extensions import db  # noqa: E402
+from app.models.drive_sync_state import DriveSyncState  # noqa: E402
+from app.models.media_asset import MediaAsset  # noqa: E402
+from app.models.media_sync_job import MediaSyncJob  # noqa: E402
+from app.services.drive_sync import sync_drive_folder  # noqa: E402
+from app.services.media_sync_jobs import start_sync_job  # noqa: E402
+from fake_drive import ROOT_ID, FakeDrive  # noqa: E402
+
+FOLDER = "shoots"
+
+
+def run_sync(drive):
+    before = drive.calls
+    result = sync_drive_folder(drive, FOLDER)
+    print(f"     {result['mode']} sync: {drive.calls - before} Drive calls, {result}")
+    return result
+
+
+def assets(root=None):
+    query = MediaAsset.query if root is None else MediaAsset.query.filter_by(drive_root_id=root)
+    return {a.drive_file_id: a.filename for a in query}
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--files", type=int, default=2500)
+    args = parser.parse_args()
+
+    drive = FakeDrive()
+    ids = [drive.add_file(f"clip-{i}.mp4", FOLDER) for i in range(args.files)]
+    drive.add_file("notes.pdf", FOLDER, mime_type="application/pdf")
+    drive.add_file("elsewhere.mp4", "other-folder")
+
+    app = create_app()
+    ok = True
+    with app.app_context():
+        result = run_sync(drive)
+        ok &= expect("full sync mode", result["mode"], "full")
+        ok &= expect("assets after full sync", len(assets()), args.files)
+
+        new_id = drive.add_file("new-clip.mp4", FOLDER)
+        drive.rename(ids[0], "renamed.mp4")
+        drive.trash(ids[1])
+        drive.delete(ids[2])
+        drive.move(ids[3], "other-folder")
+        drive.add_file("unrelated.mp4", "other-folder")
+
+        result = run_sync(drive)
+        current = assets()
+        ok &= expect("incremental mode", result["mode"], "incremental")
+        ok &= expect("added/updated/removed", (result["added"], result["updated"], result["removed"]), (1, 1, 3))
+        ok &= expect("new file imported", current.get(new_id), "new-clip.mp4")
+        ok &= expect("rename applied", current.get(ids[0]), "renamed.mp4")
+        ok &= expect("trashed/deleted/moved removed", [i in current for i in ids[1:4]], [False] * 3)
+        ok &= expect("assets after incremental", len(current), args.files - 2)
+
+        result = run_sync(drive)
+        ok &= expect("no-op sync", (result["mode"], result["total_received"]), ("incremental", 0))
+
+        drive.rename(ids[4], "after-expiry.mp4")
+        drive.expire_tokens()
+        result = run_sync(drive)
+        ok &= expect("expired token falls back", result["mode"], "full")
+        ok &= expect("full re-list applied rename", assets().get(ids[4]), "after-expiry.mp4")
+
+        # 4. background job
+        built_on = []
+
+        def service_factory():
+            built_on.append(threading.get_ident())
+            return drive
+
+        job, _ = start_sync_job(service_factory, FOLDER)
+        deadline = time.perf_counter() + 30
+        while db.session.get(MediaSyncJob, job.id).status in ("Queued", "Running") and time.perf_counter() < deadline:
+            db.session.expire_all()
+            time.sleep(0.05)
+        ok &= expect("background job completed", db.session.get(MediaSyncJob, job.id).status, "Completed")
+        ok &= expect("service built on the job's thread only",
+                     (len(built_on) > 0, threading.get_ident() in built_on), (True, False))
+
+        # 5. the 'root' alias
+        # Same Drive as FOLDER: two roots share IDs and one changes feed
+        shoots = assets(FOLDER)
+        mine = drive
+        day = mine.add_folder("Day 1", "root")
+        root_ids = [mine.add_file("top.mp4", "root"), mine.add_file("day.mp4", day)]
+        sync_drive_folder(mine, "root")
+        ok &= expect("root alias: full sync imports the tree", sorted(assets(ROOT_ID)), sorted(root_ids))
+        root_ids += [mine.add_file("top-2.mp4", "root"), mine.add_file("day-2.mp4", day)]
+        result = sync_drive_folder(mine, "root")
+        ok &= expect("root alias: new files synced incrementally", (result["mode"], sorted(assets(ROOT_ID))),
+                     ("incremental", sorted(root_ids)))
+        ok &= expect("root alias: state keyed on the real ID",
+                     [s.folder_id for s in DriveSyncState.query.filter(DriveSyncState.folder_id.in_(["root", ROOT_ID]))],
+                     [ROOT_ID])
+
+        # 6. other roots untouched
+        ok &= expect("full sync of another root keeps these assets", assets(FOLDER) == shoots and len(shoots), args.files - 2)
+        result = sync_drive_folder(drive, FOLDER, full=True)
+        ok &= expect("full re-sync removes nothing of the other root",
+                     (result["removed"], sorted(assets(ROOT_ID))), (0, sorted(root_ids)))
+
+    if not ok:
+        sys.exit(1)
+    print("OK")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,187 @@
+# benchmarks/check_email_queue.py
+"""
+Checks the email outbox (app/services/email_queue.py) against a local
+aiosmtpd stand-in for the SMTP server.
+
+1. a batch of queued messages is delivered over a single SMTP session;
+2. a transient 4xx reply is retried on a fresh session and then sent;
+3. a refused recipient fails at once, and a message that keeps failing
+   gives up after max_attempts;
+4. a session the server dropped while idle is re-established, both when
+   probed with NOOP and when the drop only shows up on send;
+5. a failed enqueue rolls back and leaves the session usable;
+6. a running worker is woken by enqueue_email() instead of waiting for
+   its poll interval;
+7. GET /api/email/outbox rejects a non-numeric limit with a 400.
+
+Exits non-zero on any mismatch.
+
+Usage: python benchmarks/check_email_queue.py
+"""
+import socket
+import sys
+import time
+
+from _support import admin_token, environ, expect
+
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+PORT = _free_port()
+# _support leaves EMAIL_QUEUE_ENABLED off: workers are started by the checks below
+environ(SMTP_SERVER="127.0.0.1", SMTP_PORT=PORT, SMTP_USER="notifications@example.com")
+
+from aiosmtpd.controller import Controller  # noqa: E402
+
+from app import create_app  # noqa: E402
+from app.extensions import db  # noqa: E402
+from app.models.email_outbox import EmailOutbox  # noqa: E402
+from app.services.email_queue import EmailWorker, SMTPConnection, enqueue_email  # noqa: E402
+
+
+class Relay:
+    """aiosmtpd handler: records messages and sessions, replays scripted DATA replies."""
+
+    def __init__(self):
+        self.messages = []
+        self.sessions = 0
+        self.faults = []
+
+    async def handle_EHLO(self, server, session, envelope, hostname, responses):
+        self.sessions += 1
+        session.host_name = hostname
+        return responses
+
+    async def handle_RCPT(self, server, session, envelope, address, rcpt_options):
+        if address.startswith("refused"):
+            return "550 5.1.1 No such user"
+        envelope.rcpt_tos.append(address)
+        return "250 OK"
+
+    async def handle_DATA(self, server, session, envelope):
+        if self.faults:
+            return self.faults.pop(0)
+        self.messages.append(envelope)
+        return "250 Message accepted"
+
+
+def queue(n, recipient="employee@example.com"):
+    return [enqueue_email(recipient, f"Message {i}", "<p>Hello</p>", "Team Lead <notifications@example.com>",
+                          category="check").id for i in range(n)]
+
+
+def drain(worker):
+    """Runs the worker until nothing is due."""
+    while worker.process_once():
+        pass
+
+
+def states(ids):
+    db.session.expire_all()
+    return [(e.status, e.attempts) for e in EmailOutbox.query.filter(EmailOutbox.id.in_(ids)).order_by(EmailOutbox.id)]
+
+
+def main():
+    relay = Relay()
+    server = Controller(relay, hostname="127.0.0.1", port=PORT)
+    server.start()
+    app = create_app()
+    ok = True
+
+    def connection_factory(idle_timeout=60):
+        return lambda: SMTPConnection("127.0.0.1", PORT, use_tls=False, idle_timeout=idle_timeout)
+
+    with app.app_context():
+        worker = EmailWorker(app, connection_factory(), max_attempts=3, backoff_base=0)
+
+        # 1. connection reuse
+        ids = queue(30)
+        start = time.perf_counter()
+        drain(worker)
+        elapsed = time.perf_counter() - start
+        ok &= expect("30 messages: sent, SMTP sessions", (set(states(ids)), len(relay.messages), relay.sessions),
+                     ({("Sent", 1)}, 30, 1))
+        print(f"     delivered in {elapsed * 1000:.0f} ms ({elapsed / 30 * 1000:.1f} ms per message)")
+
+        # 2. transient failure, retried on a new session
+        relay.faults = ["451 4.3.0 Try again later"]
+        ids = queue(1)
+        worker.process_once()
+        ok &= expect("451: queued for retry", states(ids), [("Queued", 1)])
+        drain(worker)
+        ok &= expect("451: sent on the next attempt, new session", (states(ids), relay.sessions), ([("Sent", 2)], 2))
+
+        # 3. permanent failures
+        ids = queue(1, recipient="refused@example.com")
+        drain(worker)
+        ok &= expect("550 recipient: failed without retrying", states(ids), [("Failed", 1)])
+
+        relay.faults = ["451 4.3.0 Try again later"] * 10
+        ids = queue(1)
+        drain(worker)
+        ok &= expect("keeps failing: gives up after 3 attempts", states(ids), [("Failed", 3)])
+        relay.faults = []
+        worker.connection.close()
+
+        # 4. server restarts between messages
+        for label, idle_timeout in [("probed with NOOP", 0), ("noticed on send", 60)]:
+            worker.connection = connection_factory(idle_timeout)()
+            queue(1)
+            drain(worker)
+            sessions = relay.sessions
+            server.stop()
+            server = Controller(relay, hostname="127.0.0.1", port=PORT)
+            server.start()
+            ids = queue(1)
+            drain(worker)
+            ok &= expect(f"dropped session {label}: sent first time, new session",
+                         (states(ids), relay.sessions - sessions), ([("Sent", 1)], 1))
+        worker.connection.close()
+
+        # 5. a failed enqueue rolls back and leaves the session usable
+        try:
+            enqueue_email(None, "No recipient", "<p></p>", "x <notifications@example.com>")
+            failed = False
+        except Exception:
+            failed = True
+        ok &= expect("invalid row: enqueue raises", failed, True)
+        ok &= expect("session usable afterwards", len(queue(1)), 1)
+        drain(EmailWorker(app, connection_factory(), backoff_base=0))
+        token = admin_token()
+
+    # 6. a running worker picks up new mail as soon as it is queued
+    background = EmailWorker(app, connection_factory(), poll_interval=30)
+    background.start()
+    time.sleep(0.2)
+    with app.app_context():
+        ids = queue(1)
+        start = time.perf_counter()
+        while states(ids)[0][0] != "Sent" and time.perf_counter() - start < 5:
+            time.sleep(0.01)
+        waited = time.perf_counter() - start
+        ok &= expect("worker woken by enqueue (poll interval 30 s)", (states(ids)[0][0], waited < 1), ("Sent", True))
+        print(f"     delivered {waited * 1000:.0f} ms after enqueue")
+        db.session.remove()
+    background.stop()
+    background.join(5)
+
+    # 7. status API
+    client = app.test_client()
+    headers = {"Authorization": f"Bearer {token}"}
+    ok &= expect("outbox ?limit=abc -> 400", client.get("/api/email/outbox?limit=abc", headers=headers).status_code, 400)
+    ok &= expect("outbox ?limit=5 -> 5 items", len(client.get("/api/email/outbox?limit=5", headers=headers)
+                                                  .get_json()["items"]), 5)
+
+    server.stop()
+    if not ok:
+        print("FAIL")
+        sys.exit(1)
+    print("OK")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+# benchmarks/check_socketio_fanout.py
+"""
+Checks that chat emits reach clients connected to a different worker.
+
+Starts two server processes sharing one SQLite database and one message
+queue, connects the receiver to worker 1 (connect_user + join_chat) and
+sends a message through worker 2. Exits non-zero unless the receiver gets
+both the room 'new_message' and the 'notification' emit.
+
+Usage: python benchmarks/check_socketio_fanout.py [--queue filesystem:///tmp/q]
+       (any SOCKETIO_MESSAGE_QUEUE URL, e.g. redis://localhost:6379/0)
+"""
+import argparse
+import os
+import subprocess
+import sys
+import threading
+import time
+
+import socketio
+
+from _support import ROOT, TMP, environ, seed_chat, user_token
+
+SERVER = """
+import sys
+from app import create_app
+from app.extensions import socketio
+app = create_app()
+socketio.run(app, host="127.0.0.1", port=int(sys.argv[1]), allow_unsafe_werkzeug=True, log_output=False)
+"""
+
+
+def seed(env):
+    environ(**env)
+    from app import create_app
+
+    app = create_app()
+    with app.app_context():
+        return seed_chat(), {uid: user_token(uid, role) for uid, role in [("B001", "Employee"), ("TLB001", "Team Lead")]}
+
+
+def wait_for_port(port, timeout=20):
+    import socket
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=1).close()
+            return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError(f"server on port {port} did not start")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--queue", default=f"filesystem://{os.path.join(TMP, 'socketio-queue')}")
+    parser.add_argument("--ports", default="5101,5102")
+    args = parser.parse_args()
+    ports = [int(p) for p in args.ports.split(",")]
+
+    # The servers inherit _support's DATABASE_URL, so they see the seeded chat
+    env = {"SOCKETIO_MESSAGE_QUEUE": args.queue}
+    chat_id, tokens = seed(env)
+
+    servers = [subprocess.Popen([sys.executable, "-c", SERVER, str(p)], cwd=ROOT, env={**os.environ, **env},
+                                stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL) for p in ports]
+    try:
+        for p in ports:
+            wait_for_port(p)
+
+        received = {"new_message": threading.Event(), "notification": threading.Event()}
+        receiver = socketio.Client()
+        receiver.on("new_message", lambda data: received["new_message"].set())
+        receiver.on("notification", lambda data: received["notification"].set())
+        receiver.connect(f"http://127.0.0.1:{ports[0]}", auth={"token": tokens["TLB001"]}, transports=["polling"])
+        receiver.emit("connect_user", {"user_id": "TLB001"})
+        receiver.emit("join_chat", {"chat_id": chat_id})
+
+        sender = socketio.Client()
+        sender.connect(f"http://127.0.0.1:{ports[1]}", auth={"token": tokens["B001"]}, transports=["polling"])
+        time.sleep(1)
+
+        start = time.perf_counter()
+        sender.emit("send_message", {
+            "sender_id": "B001", "receiver_id": "TLB001", "chat_id": chat_id,
+            "message": "cross-worker hello", "task_code": "ACT-0001"
+        })
+        ok = all(e.wait(10) for e in received.values())
+        elapsed = (time.perf_counter() - start) * 1000
+
+        sender.disconnect()
+        receiver.disconnect()
+    finally:
+        for s in servers:
+            s.terminate()
+            s.wait()
+
+    print(f"queue={args.queue} new_message={received['new_message'].is_set()} "
+          f"notification={received['notification'].is_set()} latency={elapsed:.0f} ms")
+    if not ok:
+        print("FAIL: emit did not cross workers")
+        sys.exit(1)
+    print("OK")
+
+
+if __name__ == "__main__":
+    main()
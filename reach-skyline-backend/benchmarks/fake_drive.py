@@ -0,0 +1,207 @@
+# benchmarks/fake_drive.py
+"""
+In-memory stand-in for the googleapiclient Drive v3 service.
+
+Implements the parts the sync engine uses - files().list with paging,
+files().get in batch requests and the changes feed (getStartPageToken /
+list) - so app/services/drive_sync.py can be exercised without network
+access or credentials. Mutate the drive with add_file / modify / rename /
+trash / delete / move; every mutation is appended to the changes feed like
+Drive does. As in Drive, 'root' is an alias: requests accept it, but files
+report the root's real ID (ROOT_ID) in their parents. A parent that was
+never added as an item acts as a folder of its own. Requests may come
+from several threads at once (the folder crawler); `latency` adds a
+simulated round trip to each of them.
+"""
+import itertools
+import re
+import threading
+import time
+from datetime import datetime, timedelta
+from googleapiclient.errors import HttpError
+
+ROOT_ID = "0AFakeRootFolder"
+FOLDER_MIME_TYPE = "application/vnd.google-apps.folder"
+
+
+class _Response(dict):
+    def __init__(self, status):
+        super().__init__(status=str(status))
+        self.status = status
+        self.reason = "fake"
+
+
+class _Request:
+    def __init__(self, drive, fn):
+        self._drive = drive
+        self._fn = fn
+
+    def execute(self, num_retries=0):
+        with self._drive._lock:
+            self._drive.calls += 1
+        if self._drive.latency:
+            time.sleep(self._drive.latency)
+        return self._fn()
+
+
+class _Files:
+    def __init__(self, drive):
+        self._drive = drive
+
+    def list(self, q="", pageSize=100, pageToken=None, fields=None, **kwargs):
+        return _Request(self._drive, lambda: self._drive._list(q, pageSize, pageToken))
+
+    def get(self, fileId, fields=None, **kwargs):
+        return _Request(self._drive, lambda: self._drive._get(fileId))
+
+
+class _Batch:
+    """All added requests in one round trip; per-request errors go to the callback."""
+
+    def __init__(self, drive, callback):
+        self._drive = drive
+        self._callback = callback
+        self._requests = []
+
+    def add(self, request, request_id):
+        self._requests.append((request_id, request))
+
+    def execute(self):
+        with self._drive._lock:
+            self._drive.calls += 1
+        for request_id, request in self._requests:
+            try:
+                response, exception = request._fn(), None
+            except HttpError as e:
+                response, exception = None, e
+            self._callback(request_id, response, exception)
+
+
+class _Changes:
+    def __init__(self, drive):
+        self._drive = drive
+
+    def getStartPageToken(self, **kwargs):
+        return _Request(self._drive, lambda: {"startPageToken": str(len(self._drive.log) + 1)})
+
+    def list(self, pageToken, pageSize=100, **kwargs):
+        return _Request(self._drive, lambda: self._drive._changes(pageToken, pageSize))
+
+
+class FakeDrive:
+
+    def __init__(self, latency=0.0):
+        self.items = {}      # id -> file resource
+        self.log = []        # changes feed: file ids, oldest first
+        self.calls = 0       # execute() round-trips
+        self.oldest_token = 1
+        self.latency = latency
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+
+    # --- googleapiclient surface ---
+    def files(self):
+        return _Files(self)
+
+    def changes(self):
+        return _Changes(self)
+
+    def new_batch_http_request(self, callback=None):
+        return _Batch(self, callback)
+
+    # --- mutations ---
+    def add_file(self, name, parent="root", mime_type="video/mp4", **extra):
+        file_id = f"f{next(self._ids):06}"
+        self.items[file_id] = {
+            "id": file_id, "name": name, "mimeType": mime_type, "parents": [self._real_id(parent)], "trashed": False,
+            "thumbnailLink": f"https://thumbs.example/{file_id}=s220", "createdTime": "2026-01-01T00:00:00Z",
+            "modifiedTime": self._now(), **extra
+        }
+        self.log.append(file_id)
+        return file_id
+
+    def add_folder(self, name, parent="root"):
+        return self.add_file(name, parent, mime_type=FOLDER_MIME_TYPE)
+
+    def modify(self, file_id):
+        """New content: a later modifiedTime, as after uploading a new version."""
+        self.items[file_id]["modifiedTime"] = self._now()
+        self.log.append(file_id)
+
+    def rename(self, file_id, name):
+        self.items[file_id]["name"] = name
+        self.log.append(file_id)
+
+    def trash(self, file_id):
+        self.items[file_id]["trashed"] = True
+        self.log.append(file_id)
+
+    def delete(self, file_id):
+        del self.items[file_id]
+        self.log.append(file_id)
+
+    def move(self, file_id, parent):
+        self.items[file_id]["parents"] = [self._real_id(parent)]
+        self.log.append(file_id)
+
+    def expire_tokens(self):
+        """Makes every token handed out so far invalid (Drive answers 410)."""
+        self.oldest_token = len(self.log) + 1
+
+    # --- implementation ---
+    @staticmethod
+    def _real_id(file_id):
+        return ROOT_ID if file_id == "root" else file_id
+
+    def _now(self):
+        """Fake clock: one second per change since 2026-01-01."""
+        return (datetime(2026, 1, 1) + timedelta(seconds=len(self.log))).strftime("%Y-%m-%dT%H:%M:%S.000Z")
+
+    def _list(self, q, page_size, page_token):
+        parent = re.search(r"'([^']+)' in parents", q)
+        want_media = "mimeType contains" in q
+        want_folders = "mimeType = 'application/vnd.google-apps.folder'" in q
+
+        def kind_matches(f):
+            if not (want_media or want_folders):
+                return True
+            is_folder = f["mimeType"] == "application/vnd.google-apps.folder"
+            return (want_folders and is_folder) or (want_media and f["mimeType"].startswith(("video/", "image/")))
+
+        matches = [
+            f for f in list(self.items.values())
+            if (not parent or self._real_id(parent.group(1)) in f["parents"])
+            and ("trashed = false" not in q or not f["trashed"])
+            and kind_matches(f)
+        ]
+        start = int(page_token or 0)
+        page = matches[start:start + page_size]
+        result = {"files": [dict(f) for f in page]}
+        if start + page_size < len(matches):
+            result["nextPageToken"] = str(start + page_size)
+        return result
+
+    def _get(self, file_id):
+        file_id = self._real_id(file_id)
+        if file_id not in self.items:
+            if file_id == ROOT_ID or any(file_id in f["parents"] for f in list(self.items.values())):
+                return {"id": file_id, "name": file_id, "mimeType": FOLDER_MIME_TYPE, "trashed": False}
+            raise HttpError(_Response(404), b'{"error": {"message": "File not found"}}')
+        return dict(self.items[file_id])
+
+    def _changes(self, page_token, page_size):
+        start = int(page_token)
+        if start < self.oldest_token:
+            raise HttpError(_Response(410), b'{"error": {"message": "Invalid page token"}}')
+        entries = self.log[start - 1:start - 1 + page_size]
+        changes = []
+        for file_id in entries:
+            file = self.items.get(file_id)
+            change = {"fileId": file_id, "removed": file is None}
+            if file is not None:
+                change["file"] = dict(file)
+            changes.append(change)
+        end = start + len(entries)
+        if end <= len(self.log):
+            return {"changes": changes, "nextPageToken": str(end)}
+        return {"changes": changes, "newStartPageToken": str(end)}
@@ -0,0 +1,123 @@
+# benchmarks/fake_drive_http.py
+"""
+Replayable HTTP transport for a real googleapiclient Drive service.
+
+FakeDriveHttp stands in for httplib2.Http: it answers the Drive v3 REST
+calls the sync uses (files list/get, changes, and multipart/mixed batch
+requests) from a FakeDrive, so requests go through googleapiclient's own
+serialization, batch encoding and error handling without network access.
+
+`faults` scripts failures: each entry is consumed by the next call (the
+batch POST itself, then each call inside it) and is either None (answer
+normally), an HTTP status to return instead - 429 and 403 come back as
+Drive rate-limit errors, 5xx as backend errors - or a (status, reason)
+pair for any other error. Every call is appended to
+`log` as (method, path, status), so the same drive and fault script
+always replay the same exchange.
+
+    service = build_service(FakeDriveHttp(drive, faults=[429, None, 503]))
+"""
+import json
+import threading
+from email.parser import BytesParser
+from urllib.parse import parse_qs, urlparse
+
+import httplib2
+from googleapiclient import discovery_cache
+from googleapiclient.discovery import build_from_document
+from googleapiclient.errors import HttpError
+
+ERRORS = {
+    403: ("userRateLimitExceeded", "User rate limit exceeded."),
+    429: ("rateLimitExceeded", "Rate limit exceeded."),
+    404: ("notFound", "File not found."),
+}
+
+_document = json.loads(discovery_cache.get_static_doc("drive", "v3"))
+
+
+def build_service(http):
+    """A Drive v3 service whose requests go to `http`."""
+    return build_from_document(_document, http=http)
+
+
+def _error_body(status, reason=None):
+    default_reason, message = ERRORS.get(status, ("backendError", "Backend Error"))
+    reason = reason or default_reason
+    return {"error": {"code": status, "message": message, "errors": [{"reason": reason, "message": message}]}}
+
+
+class FakeDriveHttp:
+
+    def __init__(self, drive, faults=()):
+        self.drive = drive
+        self.faults = list(faults)
+        self.log = []
+        self._lock = threading.Lock()
+
+    # --- httplib2.Http surface ---
+    def request(self, uri, method="GET", body=None, headers=None, redirections=5, connection_type=None):
+        url = urlparse(uri)
+        if url.path.startswith("/batch/"):
+            return self._batch(body, headers)
+        status, payload = self._call(method, url)
+        return self._response(status, "application/json"), json.dumps(payload).encode()
+
+    # --- implementation ---
+    @staticmethod
+    def _response(status, content_type):
+        return httplib2.Response({"status": str(status), "content-type": content_type})
+
+    def _next_fault(self):
+        with self._lock:
+            fault = self.faults.pop(0) if self.faults else None
+        if fault is None:
+            return None
+        status, reason = fault if isinstance(fault, tuple) else (fault, None)
+        return status, _error_body(status, reason)
+
+    def _call(self, method, url):
+        fault = self._next_fault()
+        status, payload = fault or self._serve(url)
+        with self._lock:
+            self.log.append((method, url.path, status))
+        return status, payload
+
+    def _serve(self, url):
+        params = {k: v[0] for k, v in parse_qs(url.query).items()}
+        path = url.path.removeprefix("/drive/v3/")
+        try:
+            if path == "files":
+                return 200, self.drive._list(params.get("q", ""), int(params.get("pageSize", 100)),
+                                             params.get("pageToken"))
+            if path.startswith("files/"):
+                return 200, self.drive._get(path.removeprefix("files/"))
+            if path == "changes/startPageToken":
+                return 200, {"startPageToken": str(len(self.drive.log) + 1)}
+            if path == "changes":
+                return 200, self.drive._changes(params["pageToken"], int(params.get("pageSize", 100)))
+        except HttpError as e:
+            return e.resp.status, _error_body(e.resp.status)
+        return 404, _error_body(404)
+
+    def _batch(self, body, headers):
+        fault = self._next_fault()
+        with self._lock:
+            self.log.append(("POST", "/batch/drive/v3", fault[0] if fault else 200))
+        if fault:
+            return self._response(fault[0], "application/json"), json.dumps(fault[1]).encode()
+
+        content_type = headers["content-type"]
+        message = BytesParser().parsebytes(f"content-type: {content_type}\r\n\r\n{body}".encode())
+        parts = []
+        for part in message.get_payload():
+            request_line = part.get_payload().splitlines()[0]
+            method, target, _ = request_line.split(" ", 2)
+            status, payload = self._call(method, urlparse(target))
+            content_id = part["Content-ID"].replace("<", "<response-", 1)
+            parts.append(
+                f"--BATCH\r\nContent-Type: application/http\r\nContent-ID: {content_id}\r\n\r\n"
+                f"HTTP/1.1 {status} X\r\nContent-Type: application/json\r\n\r\n{json.dumps(payload)}\r\n"
+            )
+        content = "".join(parts) + "--BATCH--\r\n"
+        return self._response(200, "multipart/mixed; boundary=BATCH"), content.encode()
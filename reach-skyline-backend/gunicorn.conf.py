@@ -0,0 +1,24 @@
+# gunicorn.conf.py
+# gunicorn -c gunicorn.conf.py run:app
+#
+# The worker class follows ASYNC_MODE so it always matches the Socket.IO
+# async_mode the app is created with. Green workers monkey-patch themselves.
+# With more than one worker, set SOCKETIO_MESSAGE_QUEUE and use sticky
+# sessions (or websocket-only clients) at the load balancer.
+import os
+
+ASYNC_MODE = os.environ.get("ASYNC_MODE", "threading").lower()
+
+bind = f"0.0.0.0:{os.environ.get('PORT', 5000)}"
+workers = int(os.environ.get("WEB_CONCURRENCY", 1))
+timeout = int(os.environ.get("GUNICORN_TIMEOUT", 120))
+
+if ASYNC_MODE == "eventlet":
+    worker_class = "eventlet"
+    worker_connections = int(os.environ.get("WORKER_CONNECTIONS", 1000))
+elif ASYNC_MODE == "gevent":
+    worker_class = "geventwebsocket.gunicorn.workers.GeventWebSocketWorker"
+    worker_connections = int(os.environ.get("WORKER_CONNECTIONS", 1000))
+else:
+    worker_class = "gthread"
+    threads = int(os.environ.get("GUNICORN_THREADS", 100))
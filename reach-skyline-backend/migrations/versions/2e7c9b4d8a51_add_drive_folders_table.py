@@ -0,0 +1,34 @@
+"""add drive folders table
+
+Revision ID: 2e7c9b4d8a51
+Revises: 8d1f5a3e6b47
+Create Date: 2026-10-18 18:37:52.640219
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '2e7c9b4d8a51'
+down_revision = '8d1f5a3e6b47'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Filled by the next full crawl; clearing the tokens forces one so
+    # existing assets get their project / shoot day from the folder paths
+    op.create_table('drive_folders',
+        sa.Column('root_id', sa.String(length=255), nullable=False),
+        sa.Column('id', sa.String(length=255), nullable=False),
+        sa.Column('parent_id', sa.String(length=255), nullable=True),
+        sa.Column('name', sa.String(length=255), nullable=True),
+        sa.Column('path', sa.Text(), nullable=True),
+        sa.PrimaryKeyConstraint('root_id', 'id')
+    )
+    op.execute("UPDATE drive_sync_state SET start_page_token = NULL")
+
+
+def downgrade():
+    op.drop_table('drive_folders')
@@ -0,0 +1,44 @@
+"""add email outbox table
+
+Revision ID: 3f8d2b6c9a14
+Revises: 7c1e4a9b2d30
+Create Date: 2026-10-18 10:02:17.846210
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3f8d2b6c9a14'
+down_revision = '7c1e4a9b2d30'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('email_outbox',
+        sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column('recipient', sa.String(length=120), nullable=False),
+        sa.Column('sender', sa.String(length=255), nullable=False),
+        sa.Column('reply_to', sa.String(length=120), nullable=True),
+        sa.Column('subject', sa.String(length=255), nullable=False),
+        sa.Column('html_body', sa.Text(), nullable=False),
+        sa.Column('category', sa.String(length=50), nullable=True),
+        sa.Column('status', sa.String(length=20), nullable=True),
+        sa.Column('attempts', sa.Integer(), nullable=True),
+        sa.Column('next_attempt_at', sa.DateTime(), nullable=True),
+        sa.Column('last_error', sa.Text(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('sent_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('email_outbox', schema=None) as batch_op:
+        batch_op.create_index('ix_email_outbox_status_next_attempt', ['status', 'next_attempt_at'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('email_outbox', schema=None) as batch_op:
+        batch_op.drop_index('ix_email_outbox_status_next_attempt')
+
+    op.drop_table('email_outbox')
@@ -0,0 +1,32 @@
+"""add drive sync state table
+
+Revision ID: 4b9e2c7a1f03
+Revises: c3a8f61d2e95
+Create Date: 2026-10-18 16:10:27.552190
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '4b9e2c7a1f03'
+down_revision = 'c3a8f61d2e95'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # No rows: each folder does one full sync, then follows the changes feed
+    op.create_table('drive_sync_state',
+        sa.Column('folder_id', sa.String(length=255), nullable=False),
+        sa.Column('start_page_token', sa.String(length=255), nullable=True),
+        sa.Column('last_full_sync_at', sa.DateTime(), nullable=True),
+        sa.Column('last_sync_at', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('folder_id')
+    )
+
+
+def downgrade():
+    op.drop_table('drive_sync_state')
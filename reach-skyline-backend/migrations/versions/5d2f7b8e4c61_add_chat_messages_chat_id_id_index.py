@@ -0,0 +1,26 @@
+"""add chat_messages chat_id id index
+
+Revision ID: 5d2f7b8e4c61
+Revises: 9a6e1c3f5b27
+Create Date: 2026-10-18 12:15:33.904127
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5d2f7b8e4c61'
+down_revision = '9a6e1c3f5b27'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('chat_messages', schema=None) as batch_op:
+        batch_op.create_index('ix_chat_messages_chat_id_id', ['chat_id', 'id'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('chat_messages', schema=None) as batch_op:
+        batch_op.drop_index('ix_chat_messages_chat_id_id')
@@ -0,0 +1,28 @@
+"""add media asset drive modified at
+
+Revision ID: 6a3f0c8e2d19
+Revises: 2e7c9b4d8a51
+Create Date: 2026-10-18 21:04:13.518302
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '6a3f0c8e2d19'
+down_revision = '2e7c9b4d8a51'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('media_assets', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('drive_modified_at', sa.DateTime(), nullable=True))
+    # The next full crawl records modifiedTime for assets that already exist
+    op.execute("UPDATE drive_sync_state SET start_page_token = NULL")
+
+
+def downgrade():
+    with op.batch_alter_table('media_assets', schema=None) as batch_op:
+        batch_op.drop_column('drive_modified_at')
@@ -0,0 +1,26 @@
+"""add tasks updated_at index
+
+Revision ID: 7c1e4a9b2d30
+Revises: 240dfefa52bd
+Create Date: 2026-10-18 09:12:41.503118
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '7c1e4a9b2d30'
+down_revision = '240dfefa52bd'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('tasks', schema=None) as batch_op:
+        batch_op.create_index('ix_tasks_updated_at_id', ['updated_at', 'id'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('tasks', schema=None) as batch_op:
+        batch_op.drop_index('ix_tasks_updated_at_id')
@@ -0,0 +1,55 @@
+"""add media sync jobs table
+
+Revision ID: 8d1f5a3e6b47
+Revises: 4b9e2c7a1f03
+Create Date: 2026-10-18 17:24:08.106733
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8d1f5a3e6b47'
+down_revision = '4b9e2c7a1f03'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('media_sync_jobs',
+        sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column('folder_id', sa.String(length=255), nullable=False),
+        sa.Column('status', sa.String(length=20), nullable=True),
+        sa.Column('mode', sa.String(length=20), nullable=True),
+        sa.Column('full', sa.Boolean(), nullable=True),
+        sa.Column('pages_fetched', sa.Integer(), nullable=True),
+        sa.Column('files_received', sa.Integer(), nullable=True),
+        sa.Column('added', sa.Integer(), nullable=True),
+        sa.Column('updated', sa.Integer(), nullable=True),
+        sa.Column('removed', sa.Integer(), nullable=True),
+        sa.Column('error_count', sa.Integer(), nullable=True),
+        sa.Column('errors', sa.JSON(), nullable=True),
+        sa.Column('requested_by', sa.String(length=20), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('started_at', sa.DateTime(), nullable=True),
+        sa.Column('finished_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('media_sync_jobs', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_media_sync_jobs_folder_id'), ['folder_id'], unique=False)
+
+    with op.batch_alter_table('drive_sync_state', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('lock_job_id', sa.Integer(), nullable=True))
+        batch_op.add_column(sa.Column('locked_at', sa.DateTime(), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table('drive_sync_state', schema=None) as batch_op:
+        batch_op.drop_column('locked_at')
+        batch_op.drop_column('lock_job_id')
+
+    with op.batch_alter_table('media_sync_jobs', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_media_sync_jobs_folder_id'))
+
+    op.drop_table('media_sync_jobs')
@@ -0,0 +1,29 @@
+"""add sequence counters table
+
+Revision ID: 9a6e1c3f5b27
+Revises: 3f8d2b6c9a14
+Create Date: 2026-10-18 11:40:52.318044
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '9a6e1c3f5b27'
+down_revision = '3f8d2b6c9a14'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Counters are seeded lazily from the existing max IDs on first use
+    op.create_table('sequence_counters',
+        sa.Column('name', sa.String(length=50), nullable=False),
+        sa.Column('value', sa.BigInteger(), nullable=False),
+        sa.PrimaryKeyConstraint('name')
+    )
+
+
+def downgrade():
+    op.drop_table('sequence_counters')
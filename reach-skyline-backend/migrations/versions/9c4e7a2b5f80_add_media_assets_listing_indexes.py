@@ -0,0 +1,28 @@
+"""add media assets listing indexes
+
+Revision ID: 9c4e7a2b5f80
+Revises: 6a3f0c8e2d19
+Create Date: 2026-10-18 22:41:07.226815
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '9c4e7a2b5f80'
+down_revision = '6a3f0c8e2d19'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('media_assets', schema=None) as batch_op:
+        batch_op.create_index('ix_media_assets_filters', ['project_name', 'status', 'script_type', 'created_at'], unique=False)
+        batch_op.create_index('ix_media_assets_created_at_id', ['created_at', 'id'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('media_assets', schema=None) as batch_op:
+        batch_op.drop_index('ix_media_assets_created_at_id')
+        batch_op.drop_index('ix_media_assets_filters')
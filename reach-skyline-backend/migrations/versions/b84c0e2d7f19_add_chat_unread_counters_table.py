@@ -0,0 +1,38 @@
+"""add chat unread counters table
+
+Revision ID: b84c0e2d7f19
+Revises: 5d2f7b8e4c61
+Create Date: 2026-10-18 12:48:09.226503
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b84c0e2d7f19'
+down_revision = '5d2f7b8e4c61'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('chat_unread_counters',
+        sa.Column('receiver_id', sa.String(length=20), nullable=False),
+        sa.Column('task_code', sa.String(length=50), nullable=False),
+        sa.Column('unread_count', sa.Integer(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('receiver_id', 'task_code')
+    )
+
+    # Seed counters from the existing unread messages
+    op.execute(
+        "INSERT INTO chat_unread_counters (receiver_id, task_code, unread_count, updated_at) "
+        "SELECT receiver_id, COALESCE(task_code, ''), COUNT(id), CURRENT_TIMESTAMP "
+        "FROM chat_messages WHERE read_status = false "
+        "GROUP BY receiver_id, COALESCE(task_code, '')"
+    )
+
+
+def downgrade():
+    op.drop_table('chat_unread_counters')
@@ -0,0 +1,39 @@
+"""add chat pending notifications table
+
+Revision ID: c3a8f61d2e95
+Revises: e17a9d4b3c82
+Create Date: 2026-10-18 15:02:11.318524
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c3a8f61d2e95'
+down_revision = 'e17a9d4b3c82'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('chat_pending_notifications',
+        sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column('receiver_id', sa.String(length=20), nullable=False),
+        sa.Column('sender_id', sa.String(length=20), nullable=False),
+        sa.Column('chat_id', sa.Integer(), nullable=False),
+        sa.Column('message_id', sa.Integer(), nullable=False),
+        sa.Column('task_code', sa.String(length=50), nullable=True),
+        sa.Column('preview', sa.String(length=200), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('chat_pending_notifications', schema=None) as batch_op:
+        batch_op.create_index('ix_chat_pending_notifications_receiver_id_id', ['receiver_id', 'id'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('chat_pending_notifications', schema=None) as batch_op:
+        batch_op.drop_index('ix_chat_pending_notifications_receiver_id_id')
+
+    op.drop_table('chat_pending_notifications')
@@ -0,0 +1,34 @@
+"""make tasks updated_at not null
+
+Revision ID: d4b7e2a9c516
+Revises: 9c4e7a2b5f80
+Create Date: 2026-10-19 10:02:37.214905
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd4b7e2a9c516'
+down_revision = '9c4e7a2b5f80'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Rows from before the column had a default: the (updated_at, id) keyset
+    # in GET /api/tasks?order=updated_at never reaches NULLs
+    op.execute("UPDATE tasks SET updated_at = COALESCE(completed_at, CURRENT_TIMESTAMP) WHERE updated_at IS NULL")
+    if op.get_bind().dialect.name == "sqlite":
+        # SQLite keeps DATETIME as text. CURRENT_TIMESTAMP wrote 'YYYY-MM-DD
+        # HH:MM:SS' while SQLAlchemy writes and binds 'YYYY-MM-DD HH:MM:SS.ffffff';
+        # the keyset compares them as strings, so bring every row to the latter.
+        op.execute("UPDATE tasks SET updated_at = updated_at || '.000000' WHERE length(updated_at) = 19")
+    with op.batch_alter_table('tasks', schema=None) as batch_op:
+        batch_op.alter_column('updated_at', existing_type=sa.DateTime(), nullable=False)
+
+
+def downgrade():
+    with op.batch_alter_table('tasks', schema=None) as batch_op:
+        batch_op.alter_column('updated_at', existing_type=sa.DateTime(), nullable=True)
@@ -0,0 +1,32 @@
+"""add chat read watermarks table
+
+Revision ID: e17a9d4b3c82
+Revises: b84c0e2d7f19
+Create Date: 2026-10-18 13:21:45.670391
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e17a9d4b3c82'
+down_revision = 'b84c0e2d7f19'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Existing read_status flags stay valid, so no seeding is needed
+    op.create_table('chat_read_watermarks',
+        sa.Column('chat_id', sa.Integer(), nullable=False),
+        sa.Column('reader_id', sa.String(length=20), nullable=False),
+        sa.Column('last_read_message_id', sa.Integer(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['chat_id'], ['chats.id'], ),
+        sa.PrimaryKeyConstraint('chat_id', 'reader_id')
+    )
+
+
+def downgrade():
+    op.drop_table('chat_read_watermarks')
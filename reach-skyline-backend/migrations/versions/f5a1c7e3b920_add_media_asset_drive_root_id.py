@@ -0,0 +1,35 @@
+"""add media asset drive root id
+
+Revision ID: f5a1c7e3b920
+Revises: d4b7e2a9c516
+Create Date: 2026-10-18 23:12:40.218733
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f5a1c7e3b920'
+down_revision = 'd4b7e2a9c516'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('media_assets', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('drive_root_id', sa.String(length=255), nullable=True))
+        batch_op.create_index(batch_op.f('ix_media_assets_drive_root_id'), ['drive_root_id'], unique=False)
+    # With a single synced root every existing asset came from it
+    op.execute(
+        "UPDATE media_assets SET drive_root_id = (SELECT folder_id FROM drive_sync_state) "
+        "WHERE (SELECT COUNT(*) FROM drive_sync_state) = 1"
+    )
+    # The next full crawl of each root claims the assets it still finds
+    op.execute("UPDATE drive_sync_state SET start_page_token = NULL")
+
+
+def downgrade():
+    with op.batch_alter_table('media_assets', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_media_assets_drive_root_id'))
+        batch_op.drop_column('drive_root_id')
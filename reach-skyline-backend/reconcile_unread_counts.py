@@ -0,0 +1,14 @@
+from app import create_app
+from app.services.chat_service import backfill_read_status, reconcile_unread_counts
+
+app = create_app()
+
+# Repairs chat_unread_counters from chat_messages and copies read
+# watermarks into the legacy read_status column. Counters are corrected in
+# place, so it is safe to run from cron while the app is serving
+if __name__ == "__main__":
+    with app.app_context():
+        backfilled = backfill_read_status()
+        print(f"Backfilled read_status on {backfilled} messages.")
+        pairs = reconcile_unread_counts()
+        print(f"Reconciled unread counters: {pairs} conversations with unread messages.")
@@ -1,5 +1,17 @@
-import eventlet
-eventlet.monkey_patch()
+import os
+from dotenv import load_dotenv
+
+if os.path.exists(".env"):
+    load_dotenv()
+
+# Must run before anything imports socket/threading (see Config.ASYNC_MODE)
+ASYNC_MODE = os.environ.get("ASYNC_MODE", "threading").lower()
+if ASYNC_MODE == "eventlet":
+    import eventlet
+    eventlet.monkey_patch()
+elif ASYNC_MODE == "gevent":
+    from gevent import monkey
+    monkey.patch_all()
 
 from app import create_app
 from app.extensions import db, socketio
@@ -12,4 +24,12 @@ if __name__ == "__main__":
         db.create_all()
         create_default_admin()
 
-    socketio.run(app, debug=True, host="0.0.0.0", port=5000)
+    debug = os.environ.get("FLASK_DEBUG", "1") == "1"
+    options = {}
+    if ASYNC_MODE == "eventlet":
+        # eventlet.wsgi caps simultaneous connections (1024 by default)
+        options["max_size"] = int(os.environ.get("WORKER_CONNECTIONS", 1000))
+
+    # allow_unsafe_werkzeug only matters for ASYNC_MODE=threading without debug
+    socketio.run(app, debug=debug, host="0.0.0.0", port=int(os.environ.get("PORT", 5000)),
+                 allow_unsafe_werkzeug=True, **options)
@@ -59,19 +59,60 @@ const ChatWindow = ({ task, currentUser, onClose, assignedEmployeeName }) => {
         initChat();
     }, [task.id, currentUser.id]);
 
+    const HISTORY_PAGE_SIZE = 50;
+    const [hasMore, setHasMore] = useState(false);
+
     const fetchHistory = (chatId) => {
         console.log('[CHAT] Fetching history for chat:', chatId);
-        fetch(`/api/chat/history/${chatId}`, {
+        fetch(`/api/chat/history/${chatId}?limit=${HISTORY_PAGE_SIZE}`, {
+            headers: { 'Authorization': `Bearer ${token}` }
+        })
+            .then(res => res.json())
+            .then(data => {
+                console.log('[CHAT] History loaded:', data.items.length, 'messages');
+                setMessages(data.items);
+                setHasMore(data.hasMore);
+            })
+            .catch(err => console.error('[CHAT] History fetch error:', err));
+    };
+
+    // Older page, prepended when the user scrolls back
+    const fetchEarlier = () => {
+        if (!chatInfo || messages.length === 0) return;
+        fetch(`/api/chat/history/${chatInfo.id}?limit=${HISTORY_PAGE_SIZE}&before_id=${messages[0].id}`, {
             headers: { 'Authorization': `Bearer ${token}` }
         })
             .then(res => res.json())
             .then(data => {
-                console.log('[CHAT] History loaded:', data.length, 'messages');
-                setMessages(data);
+                setMessages(prev => [...data.items, ...prev]);
+                setHasMore(data.hasMore);
             })
             .catch(err => console.error('[CHAT] History fetch error:', err));
     };
 
+    // Messages sent while the socket was disconnected, 500 at a time until caught up
+    const fetchMissed = (chatId, lastId) => {
+        fetch(`/api/chat/history/${chatId}?limit=500&after_id=${lastId}`, {
+            headers: { 'Authorization': `Bearer ${token}` }
+        })
+            .then(res => res.json())
+            .then(data => {
+                setMessages(prev => {
+                    const seen = new Set(prev.map(m => m.id));
+                    return [...prev, ...data.items.filter(m => !seen.has(m.id))];
+                });
+                if (data.hasMore && data.items.length) {
+                    fetchMissed(chatId, data.items[data.items.length - 1].id);
+                }
+            })
+            .catch(err => console.error('[CHAT] Catch-up fetch error:', err));
+    };
+
+    const lastMessageId = useRef(null);
+    useEffect(() => {
+        lastMessageId.current = messages.length ? messages[messages.length - 1].id : null;
+    }, [messages]);
+
     // 2. Join Socket Room
     useEffect(() => {
         if (socket && chatInfo) {
@@ -83,7 +124,17 @@ const ChatWindow = ({ task, currentUser, onClose, assignedEmployeeName }) => {
                 }
             };
 
+            const handleReconnect = () => {
+                socket.emit('join_chat', { chat_id: chatInfo.id });
+                if (lastMessageId.current) {
+                    fetchMissed(chatInfo.id, lastMessageId.current);
+                } else {
+                    fetchHistory(chatInfo.id);
+                }
+            };
+
             socket.on('new_message', handleMsg);
+            socket.on('connect', handleReconnect);
 
             // Mark as read when opening
             markAsRead(task.activityCode);
@@ -91,6 +142,7 @@ const ChatWindow = ({ task, currentUser, onClose, assignedEmployeeName }) => {
             return () => {
                 socket.emit('leave_chat', { chat_id: chatInfo.id });
                 socket.off('new_message', handleMsg);
+                socket.off('connect', handleReconnect);
             };
         }
     }, [socket, chatInfo, task.activityCode]);
@@ -200,6 +252,11 @@ const ChatWindow = ({ task, currentUser, onClose, assignedEmployeeName }) => {
 
                 {/* Messages Body */}
                 <div className="chat-modal-body">
+                    {hasMore && (
+                        <button type="button" className="chat-load-earlier" onClick={fetchEarlier}>
+                            Load earlier messages
+                        </button>
+                    )}
                     {messages.length === 0 && (
                         <div className="chat-empty-state">
                             <p>No messages yet. Start the conversation!</p>
@@ -207,7 +264,7 @@ const ChatWindow = ({ task, currentUser, onClose, assignedEmployeeName }) => {
                     )}
                     {messages.map((msg, idx) => (
                         <div
-                            key={idx}
+                            key={msg.id ?? idx}
                             className={`chat-message-row ${msg.sender_id === currentUser.id ? 'sent' : 'received'}`}
                         >
                             <div className="chat-message-bubble">
@@ -303,6 +360,10 @@ const ChatWindow = ({ task, currentUser, onClose, assignedEmployeeName }) => {
                     flex: 1; overflow-y: auto; background: #e5ddd5;
                     padding: 15px; display: flex; flex-direction: column; gap: 8px;
                 }
+                .chat-load-earlier {
+                    align-self: center; background: rgba(255, 255, 255, 0.8); border: none;
+                    border-radius: 12px; padding: 4px 12px; font-size: 12px; color: #555; cursor: pointer;
+                }
                 .chat-message-row { display: flex; width: 100%; }
                 .chat-message-row.sent { justify-content: flex-end; }
                 .chat-message-row.received { justify-content: flex-start; }
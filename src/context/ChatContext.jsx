@@ -3,6 +3,32 @@ import { io } from 'socket.io-client';
 
 const ChatContext = createContext();
 
+// Keeps this tab marked online; the server forgets a socket after 90s without one
+const PRESENCE_HEARTBEAT_MS = 30000;
+// Retry schedule after the server refuses the handshake (e.g. expired token)
+const RECONNECT_BASE_MS = 1000;
+const RECONNECT_MAX_MS = 30000;
+
+// Swaps the refresh token for a new access token; false if that is refused too
+const refreshAccessToken = async () => {
+    const refreshToken = localStorage.getItem('refresh_token');
+    if (!refreshToken) return false;
+    try {
+        const response = await fetch('/api/auth/refresh', {
+            method: 'POST',
+            headers: { 'Authorization': `Bearer ${refreshToken}` }
+        });
+        if (!response.ok) return false;
+        const data = await response.json();
+        localStorage.setItem('access_token', data.access_token);
+        return true;
+    } catch (error) {
+        // Network trouble: keep the current token and try again later
+        console.error('[SOCKET] Token refresh failed:', error);
+        return true;
+    }
+};
+
 export const useChat = () => useContext(ChatContext);
 
 export const ChatProvider = ({ children }) => {
@@ -15,11 +41,17 @@ export const ChatProvider = ({ children }) => {
     useEffect(() => {
         if (token && user) {
             const newSocket = io({
-                auth: { token },
+                // Read on every (re)connect so a refreshed token is picked up
+                auth: (cb) => cb({ token: localStorage.getItem('access_token') }),
                 transports: ['websocket', 'polling']
             });
 
+            let refusals = 0;
+            let retryTimer = null;
+            let closed = false;
+
             newSocket.on('connect', () => {
+                refusals = 0;
                 console.log('[SOCKET] Connected to chat socket, ID:', newSocket.id);
                 newSocket.emit('connect_user', { user_id: user.id });
                 console.log('[SOCKET] Joined user room:', user.id);
@@ -29,8 +61,18 @@ export const ChatProvider = ({ children }) => {
                 console.log('[SOCKET] Disconnected from chat socket');
             });
 
-            newSocket.on('connect_error', (error) => {
+            newSocket.on('connect_error', async (error) => {
                 console.error('[SOCKET] Connection error:', error);
+                // Transport errors are retried by the client itself; a refused
+                // handshake is not, so fetch a fresh token and connect again
+                if (newSocket.active || closed) return;
+                if (!(await refreshAccessToken())) {
+                    console.error('[SOCKET] Session expired, not reconnecting');
+                    return;
+                }
+                const delay = Math.min(RECONNECT_BASE_MS * 2 ** refusals, RECONNECT_MAX_MS);
+                refusals += 1;
+                if (!closed) retryTimer = setTimeout(() => newSocket.connect(), delay);
             });
 
             newSocket.on('notification', ({ task_code }) => {
@@ -45,12 +87,21 @@ export const ChatProvider = ({ children }) => {
                 fetchUnreadCounts();
             });
 
+            const heartbeat = setInterval(() => {
+                if (newSocket.connected) newSocket.emit('presence_heartbeat');
+            }, PRESENCE_HEARTBEAT_MS);
+
             setSocket(newSocket);
 
             // Fetch initial unread counts
             fetchUnreadCounts();
 
-            return () => newSocket.close();
+            return () => {
+                closed = true;
+                clearInterval(heartbeat);
+                clearTimeout(retryTimer);
+                newSocket.close();
+            };
         }
     }, [token]);
 
@@ -512,7 +512,7 @@ const ClientDetail = () => {
                             {client.media_assets.map(asset => (
                                 <div key={asset.id} style={{ border: '1px solid #eee', borderRadius: '8px', overflow: 'hidden' }}>
                                     <div style={{ height: '120px', background: '#000', position: 'relative' }}>
-                                        <img src={asset.thumbnail_url} alt={asset.filename} style={{ width: '100%', height: '100%', objectFit: 'cover' }} />
+                                        <img src={asset.thumb_url || asset.thumbnail_url} alt={asset.filename} loading="lazy" decoding="async" style={{ width: '100%', height: '100%', objectFit: 'cover' }} />
                                         {asset.mime_type && asset.mime_type.startsWith('video/') && (
                                             <div style={{ position: 'absolute', top: '50%', left: '50%', transform: 'translate(-50%, -50%)', background: 'rgba(0,0,0,0.5)', borderRadius: '50%', padding: '8px' }}>
                                                 <Play size={16} color="white" fill="white" />
@@ -1,44 +1,90 @@
-import React, { useState, useEffect } from 'react';
+import React, { useState, useEffect, useRef } from 'react';
 import { useParams, useNavigate } from 'react-router-dom';
 import { useAuth } from '../context/AuthContext';
 import { Play, ArrowLeft } from 'lucide-react';
 
+// Assets fetched per request; later ones are fetched as the pager reaches them
+const MEDIA_PAGE_SIZE = 50;
+const MEDIA_TYPES = { Images: 'image', Videos: 'video' };
+
 const ClientMediaDetail = () => {
     const { clientName } = useParams();
     const navigate = useNavigate();
     const { user } = useAuth();
     const [media, setMedia] = useState([]);
+    const [nextCursor, setNextCursor] = useState(null);
+    const [counts, setCounts] = useState(null);
     const [loading, setLoading] = useState(true);
 
     const [filterType, setFilterType] = useState('All');
     const [currentPage, setCurrentPage] = useState(1);
     const itemsPerPage = 5;
+    // Latest fetchMedia call; responses for an older filter are dropped
+    const mediaRequest = useRef(0);
+    // Cursor of the batch being fetched, so paging on doesn't fetch it twice
+    const pendingCursor = useRef(null);
 
     useEffect(() => {
         if (clientName) {
-            fetchMedia();
+            fetchCounts();
         }
     }, [clientName]);
 
     // Reset pagination when filter changes
     useEffect(() => {
         setCurrentPage(1);
-    }, [filterType]);
+        if (clientName) {
+            fetchMedia();
+        }
+    }, [clientName, filterType]);
 
-    const fetchMedia = async () => {
+    // Paging past what is loaded fetches the next batch
+    useEffect(() => {
+        if (currentPage * itemsPerPage > media.length && nextCursor) {
+            fetchMedia(nextCursor);
+        }
+    }, [currentPage, nextCursor]);
+
+    const fetchCounts = async () => {
         try {
             const token = localStorage.getItem('access_token');
-            const res = await fetch(`/api/media/assets?project=${encodeURIComponent(clientName)}`, {
+            const res = await fetch(`/api/media/assets/counts?${new URLSearchParams({ project: clientName })}`, {
                 headers: { 'Authorization': `Bearer ${token}` }
             });
             if (res.ok) {
+                setCounts(await res.json());
+            }
+        } catch (err) {
+            console.error("Error fetching media counts:", err);
+        }
+    };
+
+    const fetchMedia = async (cursor = null) => {
+        if (cursor && cursor === pendingCursor.current) return;
+        pendingCursor.current = cursor;
+        const request = cursor ? mediaRequest.current : ++mediaRequest.current;
+        try {
+            if (!cursor) {
+                setLoading(true);
+                setNextCursor(null);
+            }
+            const token = localStorage.getItem('access_token');
+            const params = new URLSearchParams({ project: clientName, limit: MEDIA_PAGE_SIZE });
+            if (MEDIA_TYPES[filterType]) params.set('media_type', MEDIA_TYPES[filterType]);
+            if (cursor) params.set('cursor', cursor);
+            const res = await fetch(`/api/media/assets?${params}`, {
+                headers: { 'Authorization': `Bearer ${token}` }
+            });
+            if (res.ok && request === mediaRequest.current) {
                 const data = await res.json();
-                setMedia(data);
+                setMedia(prev => (cursor ? prev.concat(data.items) : data.items));
+                setNextCursor(data.nextCursor);
             }
         } catch (err) {
             console.error("Error fetching media:", err);
         } finally {
-            setLoading(false);
+            if (request === mediaRequest.current) setLoading(false);
+            if (pendingCursor.current === cursor) pendingCursor.current = null;
         }
     };
 
@@ -50,17 +96,12 @@ const ClientMediaDetail = () => {
         }
     };
 
-    // Filtering Logic
-    const filteredMedia = media.filter(asset => {
-        if (filterType === 'All') return true;
-        if (filterType === 'Images') return asset.mime_type && asset.mime_type.startsWith('image/');
-        if (filterType === 'Videos') return asset.mime_type && asset.mime_type.startsWith('video/');
-        return true;
-    });
-
-    // Pagination Logic
-    const totalPages = Math.ceil(filteredMedia.length / itemsPerPage);
-    const displayedMedia = filteredMedia.slice((currentPage - 1) * itemsPerPage, currentPage * itemsPerPage);
+    // Pagination Logic: totals come from the counts endpoint, pages from what is loaded
+    const totalMedia = counts ? counts.total : 0;
+    const filteredTotal = !counts ? media.length
+        : MEDIA_TYPES[filterType] ? counts.media_types[MEDIA_TYPES[filterType]] : counts.total;
+    const totalPages = Math.max(Math.ceil(filteredTotal / itemsPerPage), 1);
+    const displayedMedia = media.slice((currentPage - 1) * itemsPerPage, currentPage * itemsPerPage);
 
     return (
         <div className="container" style={{ padding: '20px', maxWidth: '1200px', margin: '0 auto' }}>
@@ -98,9 +139,9 @@ const ClientMediaDetail = () => {
 
             {loading ? (
                 <p>Loading media...</p>
-            ) : filteredMedia.length === 0 ? (
+            ) : media.length === 0 ? (
                 <div style={{ padding: '40px', background: '#f8f9fa', borderRadius: '8px', textAlign: 'center', color: '#666' }}>
-                    <p>{media.length === 0 ? "No media assigned for this client." : "No media found matching the selected filter."}</p>
+                    <p>{totalMedia === 0 ? "No media assigned for this client." : "No media found matching the selected filter."}</p>
                 </div>
             ) : (
                 <>
@@ -108,7 +149,7 @@ const ClientMediaDetail = () => {
                         {displayedMedia.map(asset => (
                             <div key={asset.id} style={{ background: 'white', borderRadius: '8px', overflow: 'hidden', boxShadow: '0 2px 4px rgba(0,0,0,0.1)' }}>
                                 <div style={{ position: 'relative', height: '150px', background: '#000' }}>
-                                    <img src={asset.thumbnail_url} alt={asset.filename} style={{ width: '100%', height: '100%', objectFit: 'cover' }} />
+                                    <img src={asset.thumb_url || asset.thumbnail_url} alt={asset.filename} loading="lazy" decoding="async" style={{ width: '100%', height: '100%', objectFit: 'cover' }} />
                                     {asset.mime_type && asset.mime_type.startsWith('video/') && (
                                         <div style={{ position: 'absolute', top: '50%', left: '50%', transform: 'translate(-50%, -50%)', background: 'rgba(0,0,0,0.5)', borderRadius: '50%', padding: '10px' }}>
                                             <Play size={20} color="white" fill="white" />
@@ -1,5 +1,6 @@
-import React, { useState, useEffect } from 'react';
+import React, { useState, useEffect, useRef } from 'react';
 import { useAuth } from '../context/AuthContext';
+import { useChat } from '../context/ChatContext';
 import {
     Play, Filter, User, Calendar, CheckCircle, Clock, AlertCircle,
     Bookmark, Video, Image as ImageIcon, Sparkles, Megaphone,
@@ -15,8 +16,12 @@ const SCRIPT_TYPES = [
     { id: "Behind the Scene (BTS)", label: "Behind the Scene", icon: Camera, color: "#ec4899" }
 ];
 
+// Assets listed per page; "Load more" fetches the next one
+const ASSET_PAGE_SIZE = 200;
+
 const MediaDashboard = () => {
     const { user } = useAuth();
+    const { socket } = useChat() || {};
     const [assets, setAssets] = useState([]);
     const [projects, setProjects] = useState([]);
     const [clients, setClients] = useState([]);
@@ -31,6 +36,11 @@ const MediaDashboard = () => {
     const [activeId, setActiveId] = useState(null);
     const [draggedAsset, setDraggedAsset] = useState(null);
     const [scriptCounts, setScriptCounts] = useState({});
+    const [syncJob, setSyncJob] = useState(null);
+    const [nextCursor, setNextCursor] = useState(null);
+    const [loadingMore, setLoadingMore] = useState(false);
+    // Latest fetchAssets call; responses for older filters are dropped
+    const assetsRequest = useRef(0);
 
     const sensors = useSensors(
         useSensor(PointerSensor, {
@@ -41,6 +51,47 @@ const MediaDashboard = () => {
     );
 
     const canDrag = user?.role === 'Admin' || user?.role === 'Manager';
+    const syncRunning = syncJob && ['Queued', 'Running'].includes(syncJob.status);
+
+    const handleSyncProgress = (job) => {
+        setSyncJob(prev => (prev && prev.id !== job.id ? prev : job));
+        if (job.status === 'Completed') {
+            const errors = job.error_count ? `, ${job.error_count} skipped` : '';
+            showToast(`Sync complete. Added ${job.added}, updated ${job.updated}, removed ${job.removed}${errors}.`, "success");
+            fetchAssets();
+            fetchProjects();
+        } else if (job.status === 'Failed') {
+            showToast("Sync failed: " + (job.errors?.[job.errors.length - 1] || "unknown error"), "error");
+        }
+    };
+
+    // Latest handler, so the socket listener sees current filters
+    const syncProgressRef = useRef(handleSyncProgress);
+    syncProgressRef.current = handleSyncProgress;
+
+    // Progress is pushed over the chat socket; poll only when it isn't connected
+    useEffect(() => {
+        if (!socket) return;
+        const onProgress = (job) => syncProgressRef.current(job);
+        socket.on('media_sync_progress', onProgress);
+        return () => socket.off('media_sync_progress', onProgress);
+    }, [socket]);
+
+    useEffect(() => {
+        if (!syncRunning || socket?.connected) return;
+        const timer = setInterval(async () => {
+            const res = await fetch(`/api/media/sync/${syncJob.id}`, {
+                headers: { 'Authorization': `Bearer ${localStorage.getItem('access_token')}` }
+            });
+            if (res.ok) {
+                const job = await res.json();
+                if (job.status !== syncJob.status || job.pages_fetched !== syncJob.pages_fetched) {
+                    handleSyncProgress(job);
+                }
+            }
+        }, 2000);
+        return () => clearInterval(timer);
+    }, [syncJob, socket]);
 
     useEffect(() => {
         fetchAssets();
@@ -54,38 +105,64 @@ const MediaDashboard = () => {
         }
     }, [selectedVideo]);
 
-    useEffect(() => {
-        // Calculate script counts
-        const counts = {};
-        SCRIPT_TYPES.forEach(type => {
-            counts[type.id] = 0;
-        });
-        counts['Unassigned'] = 0;
-
-        assets.forEach(asset => {
-            const scriptType = asset.script_type === 'Unassigned' || !asset.script_type ? 'Unassigned' : asset.script_type;
-            counts[scriptType] = (counts[scriptType] || 0) + 1;
-        });
-
-        setScriptCounts(counts);
-    }, [assets]);
+    const fetchScriptCounts = async () => {
+        try {
+            const token = localStorage.getItem('access_token');
+            const { script_type, ...rest } = filters;
+            const res = await fetch(`/api/media/assets/counts?${new URLSearchParams(rest)}`, {
+                headers: { 'Authorization': `Bearer ${token}` }
+            });
+            if (res.ok) {
+                const data = await res.json();
+                setScriptCounts(data.script_types);
+            }
+        } catch (err) {
+            console.error("Error fetching script counts:", err);
+        }
+    };
 
+    // First page for the current filters; loadMoreAssets appends the rest on demand
     const fetchAssets = async () => {
+        const request = ++assetsRequest.current;
+        fetchScriptCounts();
         try {
             setLoading(true);
             const token = localStorage.getItem('access_token');
-            const params = new URLSearchParams(filters).toString();
+            const params = new URLSearchParams({ ...filters, limit: ASSET_PAGE_SIZE });
             const res = await fetch(`/api/media/assets?${params}`, {
                 headers: { 'Authorization': `Bearer ${token}` }
             });
-            if (res.ok) {
+            if (res.ok && request === assetsRequest.current) {
                 const data = await res.json();
-                setAssets(data);
+                setAssets(data.items);
+                setNextCursor(data.nextCursor);
             }
         } catch (err) {
             console.error("Error fetching assets:", err);
         } finally {
-            setLoading(false);
+            if (request === assetsRequest.current) setLoading(false);
+        }
+    };
+
+    const loadMoreAssets = async () => {
+        const request = assetsRequest.current;
+        try {
+            setLoadingMore(true);
+            const token = localStorage.getItem('access_token');
+            const params = new URLSearchParams({ ...filters, limit: ASSET_PAGE_SIZE, cursor: nextCursor });
+            const res = await fetch(`/api/media/assets?${params}`, {
+                headers: { 'Authorization': `Bearer ${token}` }
+            });
+            // Filters changed meanwhile: this page belongs to the old listing
+            if (res.ok && request === assetsRequest.current) {
+                const data = await res.json();
+                setAssets(prev => prev.concat(data.items));
+                setNextCursor(data.nextCursor);
+            }
+        } catch (err) {
+            console.error("Error loading more assets:", err);
+        } finally {
+            setLoadingMore(false);
         }
     };
 
@@ -222,10 +299,16 @@ const MediaDashboard = () => {
                 return;
             }
 
-            if (res.ok) {
+            if (res.ok || res.status === 409) {
                 const result = await res.json();
-                showToast(result.msg, "success");
-                fetchAssets();
+                if (result.job) {
+                    // Socket progress may already have arrived for this job
+                    setSyncJob(prev => (prev && prev.id === result.job.id ? prev : result.job));
+                } else if (result.job_id) {
+                    // Already running: follow the existing job
+                    setSyncJob({ id: result.job_id, status: 'Running', pages_fetched: 0, files_received: 0 });
+                }
+                showToast(result.msg, "info");
             } else {
                 const error = await res.json();
                 showToast("Sync failed: " + error.msg, "error");
@@ -308,8 +391,15 @@ const MediaDashboard = () => {
                         📹 Media Production Hub
                     </h1>
                     <div style={{ display: 'flex', gap: '15px', alignItems: 'center' }}>
+                        {syncRunning && (
+                            <span style={{ color: '#555', fontSize: '14px' }}>
+                                Syncing… {syncJob.pages_fetched || 0} page(s), {syncJob.files_received || 0} file(s)
+                                {syncJob.error_count ? `, ${syncJob.error_count} error(s)` : ''}
+                            </span>
+                        )}
                         <button
                             onClick={handleSync}
+                            disabled={syncRunning}
                             style={{
                                 background: 'linear-gradient(135deg, #667eea 0%, #764ba2 100%)',
                                 color: 'white',
@@ -327,7 +417,7 @@ const MediaDashboard = () => {
                             onMouseEnter={(e) => e.target.style.transform = 'translateY(-2px)'}
                             onMouseLeave={(e) => e.target.style.transform = 'translateY(0)'}
                         >
-                            <Clock size={18} /> Sync with Google Drive
+                            <Clock size={18} /> {syncRunning ? 'Syncing…' : 'Sync with Google Drive'}
                         </button>
                     </div>
                 </div>
@@ -483,6 +573,27 @@ const MediaDashboard = () => {
                                 ))
                             )}
                         </div>
+
+                        {!loading && nextCursor && (
+                            <div style={{ textAlign: 'center', marginTop: '20px' }}>
+                                <button
+                                    onClick={loadMoreAssets}
+                                    disabled={loadingMore}
+                                    style={{
+                                        padding: '10px 24px',
+                                        background: 'white',
+                                        border: '2px solid #e5e7eb',
+                                        borderRadius: '10px',
+                                        cursor: loadingMore ? 'default' : 'pointer',
+                                        fontSize: '14px',
+                                        fontWeight: '600',
+                                        color: '#374151'
+                                    }}
+                                >
+                                    {loadingMore ? 'Loading...' : 'Load more'}
+                                </button>
+                            </div>
+                        )}
                     </div>
 
                     {/* Script Category Panels */}
@@ -587,8 +698,10 @@ const MediaCard = ({ asset, canDrag, isDragging, onPreview, getStatusColor }) =>
             {/* Thumbnail */}
             <div style={{ position: 'relative', height: '180px', background: '#000', overflow: 'hidden' }}>
                 <img
-                    src={asset.thumbnail_url}
+                    src={asset.thumb_url || asset.thumbnail_url}
                     alt={asset.filename}
+                    loading="lazy"
+                    decoding="async"
                     style={{
                         width: '100%',
                         height: '100%',
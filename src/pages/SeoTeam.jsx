@@ -75,6 +75,26 @@ const SeoTeam = () => {
     }
   };
 
+  // The board lists summaries only; a group's task rows load when it is opened
+  const openGroup = async (group) => {
+    setSelectedGroup(group);
+    try {
+      const token = localStorage.getItem('access_token');
+      const res = await fetch(`/api/seo/tasks/client/${encodeURIComponent(group.clientID)}`, {
+        headers: {
+          'Authorization': `Bearer ${token}`
+        }
+      });
+      if (res.ok) {
+        const tasks = await res.json();
+        setGroups(prev => prev.map(g => (g.clientID === group.clientID ? { ...g, tasks } : g)));
+        setSelectedGroup(prev => (prev && prev.clientID === group.clientID ? { ...prev, tasks } : prev));
+      }
+    } catch (e) {
+      console.error("Error fetching group tasks:", e);
+    }
+  };
+
   const updateTaskInState = (taskId, updateFn) => {
     const newGroups = groups.map(g => {
       const taskIndex = g.tasks.findIndex(t => t.id === taskId);
@@ -260,7 +280,7 @@ const SeoTeam = () => {
                   </td>
                   <td>
                     <button
-                      onClick={() => setSelectedGroup(group)}
+                      onClick={() => openGroup(group)}
                       style={{
                         padding: '5px 15px',
                         background: '#007bff',